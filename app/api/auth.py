@@ -4,7 +4,7 @@ from fastapi.security import OAuth2PasswordRequestForm
 from app.configs.db_config import get_db
 from app.models.user import User
 from app.schemas.user import UserCreate, UserResponse
-from app.core.security import get_password_hash, verify_password
+from app.core.security import get_password_hash, verify_and_update_password
 from app.core.jwt import create_access_token
 
 auth_router = APIRouter(tags=["Authentication"])
@@ -28,12 +28,20 @@ def signup(user: UserCreate, db: Session = Depends(get_db)):
 @auth_router.post("/auth/login")
 def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
     user = db.query(User).filter(User.email == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    verified, new_hash = (False, None)
+    if user:
+        verified, new_hash = verify_and_update_password(form_data.password, user.hashed_password)
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+
+    # Transparently upgrade hashes created with an older BCRYPT_ROUNDS
+    if new_hash:
+        user.hashed_password = new_hash
+        db.commit()
     
     access_token = create_access_token(subject=user.email)
     return {"access_token": access_token, "token_type": "bearer"}
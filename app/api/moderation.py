@@ -1,27 +1,28 @@
+import json
+import random
+import uuid
 from fastapi import APIRouter, Depends, HTTPException, Request
-from dotenv import load_dotenv
-from app.configs.log_config import setup_logger
 from app.schemas.moderation import ModerationRequest, ModerationResponse, ModerationResultResponse
 from app.tasks.celery_task import moderate_text_task
-from slowapi import Limiter
-from slowapi.util import get_remote_address
+from app.dependencies.rate_limit import RateLimiter
 from app.models.moderation import ModerationResult
 from app.configs.db_config import get_async_db
 from sqlalchemy.ext.asyncio import AsyncSession
 from loguru import logger
+from app.configs.log_config import redact_text, sampled_logger
 from app.repo.moderation import save_moderation_result
 from celery.result import AsyncResult
-from app.repo.moderation import get_moderation_result_by_text, get_moderation_result_by_id
-setup_logger()
-load_dotenv()
+from app.repo.moderation import get_moderation_result_by_text, get_moderation_result_by_task_id
+from app.configs.celery_config import PRIORITY_HIGH, PRIORITY_LOW, QUEUE_MODERATION_BULK, celery
+from app.core.prescreen import PRESCREEN_ENABLED, PRESCREEN_SHADOW_RATE, get_prescreener
+from app.monitoring.prometheus import PRESCREEN_DECISIONS
 moderation_router = APIRouter()
 
-# Initialize the rate limiter
-limiter = Limiter(key_func=get_remote_address)
 
-
-@moderation_router.post("/moderate/text")
-@limiter.limit("5/minute")  # Limit to 5 requests per minute per IP
+@moderation_router.post(
+    "/moderate/text",
+    dependencies=[Depends(RateLimiter("5/minute", scope="moderate_text"))]  # 5 requests per minute per client
+)
 async def moderate_text(
     request: Request,  
     moderation_request: ModerationRequest,  
@@ -32,50 +33,84 @@ async def moderate_text(
     """
     try:
         text = moderation_request.text
-        logger.info(f"Received text for moderation: {text}")
+        sampled_logger.info(f"Received text for moderation: {redact_text(text)}")
 
         mod_result: ModerationResult = await get_moderation_result_by_text(text, db)
         if mod_result:
-            logger.info(f"Moderation result: {mod_result} found in database for text: {text}")
+            sampled_logger.info(f"Moderation result {mod_result.task_id} found in database for text: {redact_text(text)}")
             return ModerationResponse(task_id=mod_result.task_id)
-        
+
+        if PRESCREEN_ENABLED:
+            verdict = get_prescreener().screen(text)
+            PRESCREEN_DECISIONS.labels(decision=verdict.decision).inc()
+            if verdict.short_circuited:
+                return await _store_prescreen_verdict(text, verdict, db)
+
         # Run Celery task asynchronously
-        task = moderate_text_task.delay(text)
+        task = moderate_text_task.apply_async(args=[text], priority=PRIORITY_HIGH)
 
         # Store the task in the database asynchronously
         moderation_result = ModerationResult(task_id=task.id, text=text, status=task.state)
-        logger.info(f"Save moderation result for task {task.id} in database")
+        sampled_logger.info(f"Save moderation result for task {task.id} in database")
         await save_moderation_result(moderation_result, db)
-        logger.info(f"Task {task.id} enqueued for moderation")
+        sampled_logger.info(f"Task {task.id} enqueued for moderation")
         return ModerationResponse(task_id=task.id)
     
     except Exception as e:
         logger.error(f"Error while enqueuing moderation task: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@moderation_router.get("/moderate/result/{task_id}", response_model=ModerationResultResponse)
-@limiter.limit("10/minute")  
-async def get_moderation_result(request: Request, task_id: str):
+
+async def _store_prescreen_verdict(text: str, verdict, db: AsyncSession) -> ModerationResponse:
+    """
+    Record a short-circuited verdict as a finished task so it is served by the result endpoint.
+    """
+    task_id = str(uuid.uuid4())
+    result = verdict.to_result()
+    celery.backend.store_result(task_id, result, "SUCCESS")
+    moderation_result = ModerationResult(task_id=task_id, text=text, status="SUCCESS", results=result)
+    await save_moderation_result(moderation_result, db)
+    sampled_logger.info(f"Task {task_id} short-circuited by pre-screen: {verdict.decision} ({verdict.reason})")
+
+    # Send a sample of short-circuited texts to the model so disagreements are measured
+    if random.random() < PRESCREEN_SHADOW_RATE:
+        moderate_text_task.apply_async(
+            args=[text], kwargs={"prescreen_decision": verdict.decision},
+            queue=QUEUE_MODERATION_BULK, priority=PRIORITY_LOW,
+        )
+    return ModerationResponse(task_id=task_id)
+
+@moderation_router.get(
+    "/moderate/result/{task_id}",
+    response_model=ModerationResultResponse,
+    dependencies=[Depends(RateLimiter("10/minute", scope="moderate_result"))]
+)
+async def get_moderation_result(request: Request, task_id: str, db: AsyncSession = Depends(get_async_db)):
     """
     Retrieve moderation result by task ID.
+
+    The result backend only keeps results for ``CELERY_RESULT_EXPIRES``
+    seconds; after that Celery reports the task as PENDING and the copy saved
+    in the database is served instead.
     """
-    logger.info(f"Fetching result for task ID: {task_id}")
+    sampled_logger.info(f"Fetching result for task ID: {task_id}")
     
     try:
-        task_result = AsyncResult(task_id)
-        if not task_result:
-            mod_result: ModerationResult = await get_moderation_result_by_id(task_id)
-            if not mod_result:
-                logger.error(f"Task {task_id} not found in database")
-                return {"status": "failed", "error": "Task not found"}
-            return ModerationResultResponse(task_id=task_id, result=mod_result.results, status=mod_result.status)
-        logger.info(f"Task {task_result} is still pending")
+        task_result = AsyncResult(task_id, app=celery)
+        sampled_logger.info(f"Task {task_id} state: {task_result.state}")
         if task_result.state == "PENDING":
-            logger.info(f"Task {task_id} is still pending")
+            mod_result: ModerationResult = await get_moderation_result_by_task_id(task_id, db)
+            if mod_result and mod_result.status in ("SUCCESS", "FAILED"):
+                sampled_logger.info(f"Task {task_id} served from the database")
+                results = mod_result.results
+                if isinstance(results, str):
+                    results = json.loads(results)
+                return ModerationResultResponse(task_id=task_id, result=results, status=mod_result.status)
+            sampled_logger.info(f"Task {task_id} is still pending")
             return ModerationResultResponse(task_id=task_id, result=None, status="PENDING")
 
         elif task_result.state == "SUCCESS":
-            logger.info(f"Task {task_id} completed successfully")
+            sampled_logger.info(f"Task {task_id} completed successfully")
             return ModerationResultResponse(task_id=task_id, result=task_result.result, status="SUCCESS")
 
         else:
@@ -1,5 +1,8 @@
 """Realty API endpoints for Contacts, Properties, and Property Images."""
-from fastapi import APIRouter, Depends, Query
+import os
+
+from fastapi import APIRouter, Depends, File, Form, Query, Request, Response, UploadFile
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 from typing import List, Optional
@@ -9,12 +12,92 @@ from app.schemas.realty import (
     ContactCreate, ContactUpdate, ContactResponse,
     PropertyCreate, PropertyUpdate, PropertyResponse,
     PropertyImageCreate, PropertyImageUpdate, PropertyImageResponse,
-    PropertyType, ListingType, ContactStatus
+    PropertyType, ListingType, ContactStatus, PropertyInclude, PropertySparseResponse,
+    LocationSuggestion, PriceGroupStats
 )
 from app.repo import realty as realty_repo
-from app.core.exceptions import NotFoundException, DatabaseError
+from app.core.exceptions import NotFoundException, DatabaseError, ServiceUnavailableError, ValidationError
+from app.core.idempotency import IdempotentRoute
+from app.core.analytics import price_analytics
+from app.core.catalog import CATALOG_COLUMNS, CATALOG_ENABLED, property_catalog
+from app.core.response_cache import cached_response
+from app.core.similar import similar_properties
+from app.core.storage import content_hash, get_storage
+from app.core.suggest import location_suggest
+from app.monitoring.prometheus import CATALOG_QUERIES
+
+# POST routes honour Idempotency-Key (app/core/idempotency.py)
+realty_router = APIRouter(tags=["Realty"], route_class=IdempotentRoute)
+
+_property_list_adapter = TypeAdapter(List[PropertyResponse])
+_property_adapter = TypeAdapter(PropertyResponse)
+_sparse_list_adapter = TypeAdapter(List[PropertySparseResponse])
+
+IMAGE_UPLOAD_MAX_BYTES = int(os.getenv("IMAGE_UPLOAD_MAX_BYTES", str(10 * 1024 * 1024)))
+# Magic numbers of the formats accepted for upload
+_IMAGE_SIGNATURES = {b"\xff\xd8\xff": "jpg", b"\x89PNG\r\n\x1a\n": "png"}
+
+# Columns selectable with ?fields=; groups expand to several columns. "card" is
+# everything a listing card needs and, with include=none, never reads property_images
+_PROPERTY_FIELDS = [name for name in PropertySparseResponse.model_fields if name not in ("images", "primary_image")]
+_PRICE_FIELDS = ["private_price", "single_price", "double_price", "triple_price"]
+_FIELD_GROUPS = {
+    "prices": _PRICE_FIELDS,
+    "card": ["property_name", "location", "property_type", *_PRICE_FIELDS, "primary_image_url", "image_count"],
+}
+
+
+def _parse_property_fields(spec: Optional[str]) -> Optional[List[str]]:
+    """Turn ``?fields=`` into a list of Property columns (None means all of them)."""
+    if spec is None:
+        return None
+    fields = []
+    for name in filter(None, (part.strip() for part in spec.split(","))):
+        for field in _FIELD_GROUPS.get(name, [name]):
+            if field not in _PROPERTY_FIELDS:
+                allowed = ", ".join(_PROPERTY_FIELDS + list(_FIELD_GROUPS))
+                raise ValidationError(f"Unknown field '{name}'. Allowed: {allowed}")
+            if field not in fields:
+                fields.append(field)
+    return fields
+
+
+def _sparse_property(property_obj, fields: Optional[List[str]], include: PropertyInclude) -> PropertySparseResponse:
+    """Build a response from the loaded columns only; touching others would lazy-load them."""
+    data = {field: getattr(property_obj, field) for field in (fields or _PROPERTY_FIELDS)}
+    data["id"] = property_obj.id
+    if include == PropertyInclude.images:
+        data["images"] = property_obj.images
+    elif include == PropertyInclude.primary_image:
+        data["primary_image"] = property_obj.images[0] if property_obj.images else None
+    return PropertySparseResponse.model_validate(data, from_attributes=True)
+
+
+def _sparse_catalog_page(db: Session, rows: List[dict], fields: Optional[List[str]]) -> List[PropertySparseResponse]:
+    """
+    Build responses from catalog rows, which hold ``CATALOG_COLUMNS`` only.
 
-realty_router = APIRouter(tags=["Realty"])
+    Any other requested column is read from SQL for just these ids; a row
+    deleted in the meantime is left out, as the SQL path would.
+    """
+    fields = fields or _PROPERTY_FIELDS
+    missing = [field for field in fields if field not in CATALOG_COLUMNS]
+    extra = {}
+    if missing and rows:
+        extra = {
+            property_obj.id: property_obj
+            for property_obj in realty_repo.get_properties_by_ids(
+                db, [row["id"] for row in rows], fields=missing, include="none"
+            )
+        }
+    page = []
+    for row in rows:
+        if missing and row["id"] not in extra:
+            continue
+        data = {field: row[field] if field in CATALOG_COLUMNS else getattr(extra[row["id"]], field) for field in fields}
+        data["id"] = row["id"]
+        page.append(PropertySparseResponse.model_validate(data))
+    return page
 
 
 # ==================== CONTACT ENDPOINTS ====================
@@ -117,11 +200,16 @@ def delete_contact(contact_id: int, db: Session = Depends(get_mysql_db)):
 
 @realty_router.get("/realty/properties", response_model=List[PropertyResponse])
 def list_properties(
+    request: Request,
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=100, description="Maximum number of records to return"),
     property_type: Optional[PropertyType] = Query(None, description="Filter by property type"),
     listing_type: Optional[ListingType] = Query(None, description="Filter by listing type"),
     is_available: Optional[bool] = Query(None, description="Filter by availability"),
+    min_price: Optional[float] = Query(None, ge=0, description="Lowest price; matches if any price column is within range"),
+    max_price: Optional[float] = Query(None, ge=0, description="Highest price; matches if any price column is within range"),
+    fields: Optional[str] = Query(None, description="Comma separated fields to return, e.g. property_name,location,prices"),
+    include: PropertyInclude = Query(PropertyInclude.images, description="Images to embed: images, primary_image or none"),
     db: Session = Depends(get_mysql_db)
 ):
     """
@@ -132,27 +220,109 @@ def list_properties(
     - **property_type**: Filter by type (PG, 1RK, 1BHK, 2BHK)
     - **listing_type**: Filter by listing (buy, rent)
     - **is_available**: Filter by availability (true/false)
+    - **min_price** / **max_price**: Keep properties with any price in this range
+    - **fields**: Only select these columns (`id` is always returned)
+    - **include**: `images` (default), `primary_image` or `none`
+
+    Results are ordered by id. Pages are cached per worker and served
+    pre-compressed (see app/core/response_cache.py). With `include=none` they
+    come from the in-memory catalog when it is enabled (app/core/catalog.py).
     """
-    properties = realty_repo.get_properties(
-        db, skip=skip, limit=limit,
+    selected = _parse_property_fields(fields)
+    filters = dict(
         property_type=property_type.value if property_type else None,
         listing_type=listing_type.value if listing_type else None,
-        is_available=is_available
+        is_available=is_available,
+        min_price=min_price,
+        max_price=max_price,
     )
-    return properties
+
+    def render() -> bytes:
+        # The catalog always runs for analytics; only serve lists from it when enabled
+        if include == PropertyInclude.none and CATALOG_ENABLED:
+            rows = property_catalog.query(skip=skip, limit=limit, **filters)
+            if rows is not None:
+                CATALOG_QUERIES.labels(backend="catalog").inc()
+                sparse = _sparse_catalog_page(db, rows, selected)
+                return _sparse_list_adapter.dump_json(sparse, by_alias=True, exclude_unset=True)
+        CATALOG_QUERIES.labels(backend="sql").inc()
+        properties = realty_repo.get_properties(
+            db, skip=skip, limit=limit, fields=selected, include=include.value, **filters
+        )
+        if selected is None and include == PropertyInclude.images:
+            validated = _property_list_adapter.validate_python(properties, from_attributes=True)
+            return _property_list_adapter.dump_json(validated, by_alias=True)
+        sparse = [_sparse_property(property_obj, selected, include) for property_obj in properties]
+        return _sparse_list_adapter.dump_json(sparse, by_alias=True, exclude_unset=True)
+
+    return cached_response(request, render)
 
 
 @realty_router.get("/realty/properties/{property_id}", response_model=PropertyResponse)
-def get_property(property_id: int, db: Session = Depends(get_mysql_db)):
+def get_property(
+    property_id: int,
+    request: Request,
+    fields: Optional[str] = Query(None, description="Comma separated fields to return"),
+    include: PropertyInclude = Query(PropertyInclude.images, description="Images to embed: images, primary_image or none"),
+    db: Session = Depends(get_mysql_db)
+):
     """
     Get a specific property by ID with its images.
     
     - **property_id**: The unique identifier of the property
+    - **fields**: Only select these columns (`id` is always returned)
+    - **include**: `images` (default), `primary_image` or `none`
+
+    Archived listings are returned too, read from the archive tables.
     """
-    property_obj = realty_repo.get_property_by_id(db, property_id)
-    if not property_obj:
-        raise NotFoundException("Property", property_id)
-    return property_obj
+    selected = _parse_property_fields(fields)
+
+    def render() -> bytes:
+        property_obj = realty_repo.get_property_by_id(db, property_id, fields=selected, include=include.value)
+        if not property_obj:
+            # Old unavailable listings live in the archive tables
+            property_obj = realty_repo.get_archived_property(db, property_id, fields=selected, include=include.value)
+        if not property_obj:
+            raise NotFoundException("Property", property_id)
+        if selected is None and include == PropertyInclude.images:
+            validated = _property_adapter.validate_python(property_obj, from_attributes=True)
+            return _property_adapter.dump_json(validated, by_alias=True)
+        sparse = _sparse_property(property_obj, selected, include)
+        return sparse.model_dump_json(by_alias=True, exclude_unset=True).encode()
+
+    return cached_response(request, render)
+
+
+@realty_router.get("/realty/properties/{property_id}/similar", response_model=List[PropertySparseResponse])
+def get_similar_properties(
+    property_id: int,
+    k: int = Query(10, ge=1, le=50, description="Number of similar properties to return"),
+    fields: Optional[str] = Query("card", description="Comma separated fields to return (default: card)"),
+    db: Session = Depends(get_mysql_db)
+):
+    """
+    Properties most like this one, best match first, for a "similar nearby" rail.
+
+    Only available listings of the same listing type are considered. Scoring
+    weighs location, property type, furnishing and price, and runs over an
+    in-memory feature matrix (see app/core/similar.py).
+    """
+    selected = _parse_property_fields(fields)
+    similar_properties.ensure_loaded(db)
+    similar_ids = similar_properties.index.similar(property_id, k)
+    if similar_ids is None:
+        # Not indexed yet (created in another worker since the last rebuild)
+        property_obj = realty_repo.get_property_by_id(db, property_id, include="none")
+        if not property_obj:
+            raise NotFoundException("Property", property_id)
+        row = {column.key: getattr(property_obj, column.key) for column in property_obj.__table__.columns}
+        similar_ids = similar_properties.index.similar(property_id, k, row=row)
+    properties = realty_repo.get_properties_by_ids(db, similar_ids, fields=selected, include="none")
+    sparse = [_sparse_property(property_obj, selected, PropertyInclude.none) for property_obj in properties]
+    return Response(
+        content=_sparse_list_adapter.dump_json(sparse, by_alias=True, exclude_unset=True),
+        media_type="application/json",
+    )
 
 
 @realty_router.post("/realty/properties", response_model=PropertyResponse, status_code=201)
@@ -196,6 +366,25 @@ def update_property(
         raise DatabaseError(f"Failed to update property: {str(e)}")
 
 
+@realty_router.post("/realty/properties/{property_id}/restore", response_model=PropertyResponse)
+def restore_property(property_id: int, db: Session = Depends(get_mysql_db)):
+    """
+    Bring an archived property and its images back into the live listings.
+
+    - **property_id**: The unique identifier of the property
+
+    Restoring a property that is not archived returns it unchanged.
+    """
+    try:
+        realty_repo.restore_property(db, property_id)
+    except SQLAlchemyError as e:
+        raise DatabaseError(f"Failed to restore property: {str(e)}")
+    db_property = realty_repo.get_property_by_id(db, property_id)
+    if not db_property:
+        raise NotFoundException("Property", property_id)
+    return db_property
+
+
 @realty_router.delete("/realty/properties/{property_id}", status_code=204)
 def delete_property(property_id: int, db: Session = Depends(get_mysql_db)):
     """
@@ -214,6 +403,46 @@ def delete_property(property_id: int, db: Session = Depends(get_mysql_db)):
     return None
 
 
+# ==================== SEARCH ENDPOINTS ====================
+
+@realty_router.get("/realty/locations/suggest", response_model=List[LocationSuggestion])
+def suggest_locations(
+    prefix: str = Query(..., min_length=1, max_length=100, description="What the user has typed so far"),
+    limit: int = Query(10, ge=1, le=20, description="Maximum suggestions to return"),
+    db: Session = Depends(get_mysql_db)
+):
+    """
+    Typeahead for the search box: locations and property names starting with ``prefix``.
+
+    Matching ignores case, spacing and common misspellings, and can start at
+    any word ("layout" finds "HSR Layout"). Results are ranked by listing count
+    and served from an in-memory index (see app/core/suggest.py).
+    """
+    location_suggest.ensure_loaded(db)
+    return location_suggest.index.suggest(prefix, limit)
+
+
+# ==================== ANALYTICS ENDPOINTS ====================
+
+@realty_router.get("/realty/analytics/prices", response_model=List[PriceGroupStats])
+def price_analytics_by_location(
+    location: Optional[str] = Query(None, max_length=150, description="Only this location (exact match)"),
+    property_type: Optional[PropertyType] = Query(None, description="Only this property type"),
+):
+    """
+    Price distribution per location and property type.
+
+    For each price column set on at least one listing in the group: how many
+    listings set it, and its p25, median and p75. Computed from the in-memory
+    catalog and cached per group (see app/core/analytics.py), so it never runs
+    an aggregate query against the database. Answers 503 until the catalog's
+    first background load has finished.
+    """
+    if not price_analytics.loaded:
+        raise ServiceUnavailableError("Price analytics are still loading", retry_after=5)
+    return price_analytics.stats(location, property_type.value if property_type else None)
+
+
 # ==================== PROPERTY IMAGE ENDPOINTS ====================
 
 @realty_router.get("/realty/properties/{property_id}/images", response_model=List[PropertyImageResponse])
@@ -256,6 +485,64 @@ def add_property_image(
         raise DatabaseError(f"Failed to add property image: {str(e)}")
 
 
+def _image_extension(data: bytes) -> Optional[str]:
+    for signature, extension in _IMAGE_SIGNATURES.items():
+        if data.startswith(signature):
+            return extension
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "webp"
+    return None
+
+
+@realty_router.post(
+    "/realty/properties/{property_id}/images/upload", response_model=PropertyImageResponse, status_code=201
+)
+def upload_property_image(
+    property_id: int,
+    file: UploadFile = File(..., description="JPEG, PNG or WebP image"),
+    is_primary: bool = Form(False),
+    sort_order: int = Form(0, ge=0),
+    db: Session = Depends(get_mysql_db)
+):
+    """
+    Upload an image file for a property.
+
+    The original is stored under its content hash, so identical uploads share
+    one file. WebP/AVIF variants are generated in the background and appear
+    in `variants` once ready.
+    """
+    property_obj = realty_repo.get_property_by_id(db, property_id, fields=["id"], include="none")
+    if not property_obj:
+        raise NotFoundException("Property", property_id)
+
+    data = file.file.read(IMAGE_UPLOAD_MAX_BYTES + 1)
+    if len(data) > IMAGE_UPLOAD_MAX_BYTES:
+        raise ValidationError(f"Image exceeds {IMAGE_UPLOAD_MAX_BYTES} bytes")
+    extension = _image_extension(data)
+    if extension is None:
+        raise ValidationError("Unsupported image type. Upload a JPEG, PNG or WebP file")
+
+    storage = get_storage()
+    digest = content_hash(data)
+    key = storage.save(data, extension, digest)
+    try:
+        db_image = realty_repo.create_property_image(db, {
+            "image_url": storage.url(key),
+            "is_primary": is_primary,
+            "sort_order": sort_order,
+            "content_hash": digest,
+            "variants": realty_repo.get_variants_by_content_hash(db, digest),
+        }, property_id)
+    except SQLAlchemyError as e:
+        raise DatabaseError(f"Failed to add property image: {str(e)}")
+
+    if db_image.variants is None:
+        # Imported here so the API does not load Celery and Pillow at startup
+        from app.tasks.image_tasks import generate_image_variants
+        generate_image_variants.delay(db_image.id)
+    return db_image
+
+
 @realty_router.put("/realty/images/{image_id}", response_model=PropertyImageResponse)
 def update_property_image(
     image_id: int,
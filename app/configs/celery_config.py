@@ -1,25 +1,110 @@
 from celery import Celery
 from celery import signals
+from celery.schedules import crontab
 import os
 
+from app.configs.env_config import load_env
 from app.configs.log_config import setup_logger
+from app.core.result_codec import ZLIB_JSON, register_zlib_json
+
+load_env()
 
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
 
+register_zlib_json()
+
 celery = Celery(
     "tasks",
     broker=REDIS_URL,
     backend=REDIS_URL,
-    include=["app.tasks.celery_task"]
+    include=["app.tasks.celery_task", "app.tasks.image_tasks", "app.tasks.archive_tasks", "app.tasks.contact_tasks"]
 )
 
+# Results are also written to moderation_results, so the Redis copy only needs to outlive polling
+CELERY_RESULT_EXPIRES = int(os.getenv("CELERY_RESULT_EXPIRES", "86400"))
+CELERY_CONCURRENCY = int(os.getenv("CELERY_CONCURRENCY", "4"))
+# Redis hands an unacknowledged task to another worker after this long; must exceed the longest task
+CELERY_VISIBILITY_TIMEOUT = int(os.getenv("CELERY_VISIBILITY_TIMEOUT", "3600"))
+
+# One worker pool per queue, so bulk work can never occupy the slots interactive work needs
+QUEUE_MODERATION = "moderation"
+QUEUE_MODERATION_BULK = "moderation_bulk"
+QUEUE_IMAGES = "images"
+QUEUE_MAINTENANCE = "maintenance"
+CELERY_QUEUES = [QUEUE_MODERATION, QUEUE_MODERATION_BULK, QUEUE_IMAGES, QUEUE_MAINTENANCE]
+
+# Redis serves lower numbers first; within a queue, priorities round down to these steps
+PRIORITY_STEPS = [0, 3, 6, 9]
+PRIORITY_HIGH = 0
+PRIORITY_DEFAULT = 6
+PRIORITY_LOW = 9
+# Separates a queue name from its priority in the Redis list names ("moderation:6")
+PRIORITY_SEP = ":"
+
 celery.conf.update(
     task_serializer="json",
-    result_serializer="json",
+    result_serializer=ZLIB_JSON,
     accept_content=["json"],
-    worker_concurrency=4  # Adjust based on CPU cores
+    # json still reads results stored before the switch
+    result_accept_content=["json", ZLIB_JSON],
+    result_expires=CELERY_RESULT_EXPIRES,
+    worker_concurrency=CELERY_CONCURRENCY,
+    task_routes={
+        "moderate_text_task": {"queue": QUEUE_MODERATION},
+        "generate_image_variants": {"queue": QUEUE_IMAGES},
+        "backfill_image_summary": {"queue": QUEUE_MAINTENANCE},
+        "archive_stale_properties": {"queue": QUEUE_MAINTENANCE},
+        "close_stale_leads": {"queue": QUEUE_MAINTENANCE},
+        "anonymize_closed_leads": {"queue": QUEUE_MAINTENANCE},
+        "purge_closed_leads": {"queue": QUEUE_MAINTENANCE},
+    },
+    # Messages without a priority would land in the highest step
+    task_default_priority=PRIORITY_DEFAULT,
+    broker_transport_options={
+        "priority_steps": PRIORITY_STEPS,
+        "sep": PRIORITY_SEP,
+        "queue_order_strategy": "priority",
+        "visibility_timeout": CELERY_VISIBILITY_TIMEOUT,
+    },
+    # Tasks wait on the network for seconds: reserve one at a time so an idle
+    # worker is never stuck behind a busy one's prefetched backlog, and ack only
+    # after the task finishes so a crashed worker's task runs again
+    worker_prefetch_multiplier=1,
+    task_acks_late=True,
+    task_reject_on_worker_lost=True,
+    # Feed app.monitoring.celery_exporter
+    worker_send_task_events=True,
+    task_send_sent_event=True,
 )
 
+ARCHIVE_HOUR = int(os.getenv("ARCHIVE_HOUR", "3"))
+CONTACT_MAINTENANCE_HOUR = int(os.getenv("CONTACT_MAINTENANCE_HOUR", "4"))
+
+# Periodic jobs; they only run where `celery -A app.configs.celery_config beat` is running
+celery.conf.beat_schedule = {
+    "archive-stale-properties": {
+        "task": "archive_stale_properties",
+        "schedule": crontab(hour=ARCHIVE_HOUR, minute=0),
+    },
+    # Staggered so the contact jobs do not compete for the same rows
+    "close-stale-leads": {
+        "task": "close_stale_leads",
+        "schedule": crontab(hour=CONTACT_MAINTENANCE_HOUR, minute=0),
+    },
+    "anonymize-closed-leads": {
+        "task": "anonymize_closed_leads",
+        "schedule": crontab(hour=CONTACT_MAINTENANCE_HOUR, minute=20),
+    },
+    "purge-closed-leads": {
+        "task": "purge_closed_leads",
+        "schedule": crontab(hour=CONTACT_MAINTENANCE_HOUR, minute=40),
+    },
+}
+
+@signals.celeryd_init.connect
+def setup_logger_on_boot(**kwargs):
+    setup_logger()
+
 @signals.worker_process_init.connect
 def setup_logger_on_start(**kwargs):
-    setup_logger()  # Re-initialize logger for each worker
\ No newline at end of file
+    setup_logger(force=True)  # Re-initialize logger for each worker
\ No newline at end of file
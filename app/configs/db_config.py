@@ -1,17 +1,14 @@
 import os
-from typing import Annotated, AsyncIterator
-from dotenv import load_dotenv
-from fastapi import Depends
+import threading
+from typing import Optional
 from loguru import logger
-from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
-from app.configs.log_config import setup_logger
-from sqlalchemy.exc import SQLAlchemyError
+from app.configs.env_config import load_env
 from sqlalchemy.orm import declarative_base, sessionmaker
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
 
 
-setup_logger()
-load_dotenv()
+load_env()
 
 # PostgreSQL Configuration (Commented out - using MySQL only)
 # DATABASE_URL = os.getenv("DATABASE_URL")
@@ -59,23 +56,81 @@ DB_PASSWORD = os.getenv("DB_PASSWORD")
 DB_HOST = os.getenv("DB_HOST")
 DB_PORT = os.getenv("DB_PORT")
 DB_NAME = os.getenv("DB_NAME")
+# Echoing every statement is for local debugging only; it is costly under load
+DB_ECHO = os.getenv("DB_ECHO", "false").lower() == "true"
+# Per-worker connection pool; the API threadpool and route concurrency caps are sized from it
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_CAPACITY = DB_POOL_SIZE + DB_MAX_OVERFLOW
 
 # URL encode the password to handle special characters like @, #, etc.
 encoded_password = urllib.parse.quote_plus(DB_PASSWORD) if DB_PASSWORD else ""
 
-MYSQL_DATABASE_URL = f"mysql+pymysql://{DB_USER}:{encoded_password}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+# MYSQL_DATABASE_URL may be set directly, e.g. to a local SQLite stand-in for load tests
+MYSQL_DATABASE_URL = os.getenv("MYSQL_DATABASE_URL") or (
+    f"mysql+pymysql://{DB_USER}:{encoded_password}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+)
 
-logger.info(f"Creating MySQL engine for {DB_HOST}:{DB_PORT}/{DB_NAME}")
-mysql_engine = create_engine(MYSQL_DATABASE_URL, echo=True, pool_pre_ping=True)
+# Bound to the engine the first time it is needed (see get_mysql_engine)
+MySQLSessionLocal = sessionmaker(autocommit=False, autoflush=False)
+MySQLBase = declarative_base()
 
-logger.info("Creating MySQL session local")
-MySQLSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=mysql_engine)
+_mysql_engine: Optional[Engine] = None
+_engine_lock = threading.Lock()
+
+
+def get_mysql_engine() -> Engine:
+    """Build the MySQL engine on first use so importing this module stays cheap."""
+    global _mysql_engine
+    if _mysql_engine is None:
+        with _engine_lock:
+            if _mysql_engine is None:
+                # SQLite stand-ins are shared by the threadpool that runs sync routes
+                connect_args = (
+                    {"check_same_thread": False, "timeout": 30}
+                    if MYSQL_DATABASE_URL.startswith("sqlite") else {}
+                )
+                _mysql_engine = create_engine(
+                    MYSQL_DATABASE_URL,
+                    echo=DB_ECHO,
+                    pool_pre_ping=True,
+                    pool_size=DB_POOL_SIZE,
+                    max_overflow=DB_MAX_OVERFLOW,
+                    pool_timeout=DB_POOL_TIMEOUT,
+                    connect_args=connect_args,
+                )
+                logger.info(f"Created MySQL engine for {_mysql_engine.url!r}")
+                MySQLSessionLocal.configure(bind=_mysql_engine)
+    return _mysql_engine
+
+
+def dispose_mysql_engine(close: bool = True) -> None:
+    """
+    Drop pooled connections, e.g. on shutdown or in a freshly forked worker.
+
+    A forked child passes ``close=False``: the sockets still belong to the
+    parent, so the child only forgets them and opens its own.
+    """
+    if _mysql_engine is not None:
+        _mysql_engine.dispose(close=close)
+
+
+def new_mysql_session():
+    """Open a session outside of a request (Celery tasks, scripts)."""
+    get_mysql_engine()
+    return MySQLSessionLocal()
+
+
+def __getattr__(name: str):
+    # Keeps `from app.configs.db_config import mysql_engine` working without import-time setup
+    if name == "mysql_engine":
+        return get_mysql_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-logger.info("Creating MySQL declarative base")
-MySQLBase = declarative_base()
 
 def get_mysql_db():
-    db = MySQLSessionLocal()
+    db = new_mysql_session()
     try:
         yield db
     finally:
@@ -83,7 +138,7 @@ def get_mysql_db():
 
 
 # Make MySQL the default database for existing code compatibility
-SessionLocal = MySQLSessionLocal
+SessionLocal = new_mysql_session
 Base = MySQLBase
 get_db = get_mysql_db
 
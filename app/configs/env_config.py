@@ -0,0 +1,11 @@
+from dotenv import load_dotenv
+
+_loaded = False
+
+
+def load_env() -> None:
+    """Load the .env file once per process, however many modules ask for it."""
+    global _loaded
+    if not _loaded:
+        load_dotenv()
+        _loaded = True
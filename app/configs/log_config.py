@@ -1,26 +1,82 @@
+import hashlib
 import os
+import threading
+import time
 from loguru import logger
 
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_JSON = os.getenv("LOG_JSON", "true").lower() == "true"
+# Writes happen on a background thread so request handlers never wait on file I/O
+LOG_ENQUEUE = os.getenv("LOG_ENQUEUE", "true").lower() == "true"
+# Max records per second from any one call site logged through `sampled_logger`
+LOG_SAMPLE_PER_SECOND = int(os.getenv("LOG_SAMPLE_PER_SECOND", "5"))
+LOG_DISABLED = os.getenv("LOG_DISABLED", "false").lower() == "true"
+
+LOG_FORMAT = "{time:YYYY-MM-DD HH:mm:ss} | {level} | {message} | {extra}"
+
+# Chatty hot-path info logs go through this logger and are rate limited per call site
+sampled_logger = logger.bind(sampled=True)
+
+_configured = False
+_sample_windows = {}
+_sample_lock = threading.Lock()
+
+
+def _sampling_filter(record) -> bool:
+    """Let at most LOG_SAMPLE_PER_SECOND sampled records per call site through each second."""
+    if not record["extra"].get("sampled"):
+        return True
+    key = (record["file"].path, record["line"])
+    now = time.monotonic()
+    with _sample_lock:
+        window = _sample_windows.get(key)
+        if window is None or now - window[0] >= 1.0:
+            _sample_windows[key] = [now, 1]
+            return True
+        window[1] += 1
+        return window[1] <= LOG_SAMPLE_PER_SECOND
+
+
+def redact_text(text) -> str:
+    """Describe user text by length and digest instead of writing it to the logs."""
+    if text is None:
+        return "<none>"
+    digest = hashlib.sha256(str(text).encode()).hexdigest()[:12]
+    return f"<{len(str(text))} chars sha256:{digest}>"
+
 
 # Set up logging configuration
-def setup_logger():
+def setup_logger(force: bool = False):
+    """Install the file sinks once per process (pass ``force`` after a fork)."""
+    global _configured
+    if _configured and not force:
+        return
     logger.remove()  # Remove default logger
+    if LOG_DISABLED:
+        _configured = True
+        return
+    sink_options = {
+        "rotation": "1 day",  # Rotate log daily
+        "retention": "7 days",  # Keep logs for 7 days
+        "compression": "zip",  # Compress old logs
+        "enqueue": LOG_ENQUEUE,
+        "serialize": LOG_JSON,
+        "format": LOG_FORMAT,
+    }
     logger.add(
         "app/logs/app_{time:YYYY-MM-DD}.log", 
         level=LOG_LEVEL, 
-        rotation="1 day",  # Rotate log daily
-        retention="7 days",  # Keep logs for 7 days
-        compression="zip",  # Compress old logs
-        format="{time:YYYY-MM-DD HH:mm:ss} | {level} | {message} | {extra}"
+        filter=_sampling_filter,
+        **sink_options
     )
     logger.add(
         "app/logs/app_error_{time:YYYY-MM-DD}.log", 
         level="ERROR", 
-        rotation="1 day", 
-        retention="7 days", 
-        compression="zip",
-        format="{time:YYYY-MM-DD HH:mm:ss} | {level} | {message} | {extra}"
+        **sink_options
     )
+    _configured = True
+
 
-setup_logger()
\ No newline at end of file
+def flush_logger():
+    """Wait for queued records to be written, e.g. on shutdown."""
+    logger.complete()
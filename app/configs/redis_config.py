@@ -1,18 +1,80 @@
-import redis
-from dotenv import load_dotenv
 import os
+import threading
+from app.configs.env_config import load_env
 
-load_dotenv()
+load_env()
 
 REDIS_HOST = os.getenv("REDIS_HOST", "redis")
 REDIS_PORT = int(os.getenv("REDIS_PORT", 6379))
 REDIS_DB = int(os.getenv("REDIS_DB", 0))
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", 50))
+REDIS_SOCKET_TIMEOUT = float(os.getenv("REDIS_SOCKET_TIMEOUT", 0.5))
+# Sync clients serve jobs, the outbox relay and /metrics; must outlast the 5s stream consumer reads
+REDIS_SYNC_SOCKET_TIMEOUT = float(os.getenv("REDIS_SYNC_SOCKET_TIMEOUT", 10))
 
+_clients = {}
+_clients_lock = threading.Lock()
 
-# Set up Redis client
-redis_client = redis.Redis(
-    host=REDIS_HOST,
-    port=REDIS_PORT,
-    db=REDIS_DB,
-    decode_responses=True  # Ensures responses are returned as strings instead of bytes
-)
+
+def get_redis_client():
+    """Shared sync Redis client; its connection pool is created on first use."""
+    with _clients_lock:
+        if "sync" not in _clients:
+            import redis
+
+            pool = redis.ConnectionPool(
+                host=REDIS_HOST,
+                port=REDIS_PORT,
+                db=REDIS_DB,
+                max_connections=REDIS_MAX_CONNECTIONS,
+                socket_timeout=REDIS_SYNC_SOCKET_TIMEOUT,
+                socket_connect_timeout=REDIS_SOCKET_TIMEOUT,
+                decode_responses=True  # Ensures responses are returned as strings instead of bytes
+            )
+            _clients["sync"] = redis.Redis(connection_pool=pool)
+        return _clients["sync"]
+
+
+def get_async_redis_client():
+    """Shared asyncio Redis client; its connection pool is created on first use."""
+    with _clients_lock:
+        if "async" not in _clients:
+            import redis.asyncio
+
+            pool = redis.asyncio.ConnectionPool(
+                host=REDIS_HOST,
+                port=REDIS_PORT,
+                db=REDIS_DB,
+                max_connections=REDIS_MAX_CONNECTIONS,
+                socket_timeout=REDIS_SOCKET_TIMEOUT,
+                socket_connect_timeout=REDIS_SOCKET_TIMEOUT,
+                decode_responses=True
+            )
+            _clients["async"] = redis.asyncio.Redis(connection_pool=pool)
+        return _clients["async"]
+
+
+async def close_redis_clients() -> None:
+    """Release pooled connections on shutdown."""
+    with _clients_lock:
+        sync_client = _clients.pop("sync", None)
+        async_client = _clients.pop("async", None)
+    if sync_client is not None:
+        sync_client.close()
+    if async_client is not None:
+        await async_client.aclose()
+
+
+def reset_redis_clients() -> None:
+    """Forget clients inherited across a fork; the child builds its own pools."""
+    with _clients_lock:
+        _clients.clear()
+
+
+def __getattr__(name: str):
+    # Keeps `from app.configs.redis_config import redis_client` working lazily
+    if name == "redis_client":
+        return get_redis_client()
+    if name == "async_redis_client":
+        return get_async_redis_client()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,119 @@
+"""
+Price percentiles per location and property type, computed from the catalog.
+
+Groups are (location, property_type). For each price column a group gets the
+count of listings with that price set, p25, median and p75 (linear
+interpolation, as ``numpy.percentile``). A full pass sorts every price by
+group and value once and reads the percentiles off by index arithmetic; no
+``GROUP BY`` ever reaches the database.
+
+Results are cached per group. When a catalog refresh changes rows, only the
+groups those rows left or joined, or whose prices changed, are recomputed.
+Refreshes run in the catalog's background task; nothing here reads the table
+on a request, and ``loaded`` stays False until the first full load lands.
+"""
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.catalog import _PRICE_COLUMNS, _PROPERTY_TYPES, PropertyCatalog, _encode, property_catalog
+
+_QUANTILES = (("p25", 0.25), ("median", 0.5), ("p75", 0.75))
+# Group key is location_code * _TYPE_SLOTS + property_type_code
+_TYPE_SLOTS = len(_PROPERTY_TYPES) + 1
+_WATCHED = ("location", "property_type", *_PRICE_COLUMNS)
+
+
+def _percentiles(values: np.ndarray, starts: np.ndarray, counts: np.ndarray, q: float) -> np.ndarray:
+    # values is sorted within each group; interpolate between the neighbouring ranks
+    position = starts + (counts - 1) * q
+    lower = np.floor(position).astype(np.int64)
+    upper = np.minimum(lower + 1, starts + counts - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+def compute_groups(group: np.ndarray, prices: np.ndarray) -> Dict[int, dict]:
+    """
+    Stats per group key, given each row's key and its price columns (NaN when unset).
+
+    Returns ``{key: {"listings": n, "prices": {column: {"count", "p25", "median", "p75"}}}}``.
+    """
+    keys, listings = np.unique(group, return_counts=True)
+    results = {key: {"listings": count, "prices": {}} for key, count in zip(keys.tolist(), listings.tolist())}
+    for column_index, column in enumerate(_PRICE_COLUMNS):
+        values = prices[:, column_index]
+        present = ~np.isnan(values)
+        column_groups, values = group[present], values[present]
+        order = np.lexsort((values, column_groups))
+        column_groups, values = column_groups[order], values[order]
+        column_keys, starts, counts = np.unique(column_groups, return_index=True, return_counts=True)
+        stats = {name: _percentiles(values, starts, counts, q).tolist() for name, q in _QUANTILES}
+        for i, (key, count) in enumerate(zip(column_keys.tolist(), counts.tolist())):
+            results[key]["prices"][column] = {"count": count, **{name: stats[name][i] for name, _ in _QUANTILES}}
+    return results
+
+
+class PriceAnalytics:
+    """Cached price stats per (location, property_type), kept current by catalog refreshes."""
+
+    def __init__(self, catalog: PropertyCatalog):
+        self._catalog = catalog
+        self._groups: Dict[int, dict] = {}
+        self._lock = threading.Lock()
+        self.loaded = False
+        catalog.subscribe(self._on_change)
+
+    def _group_key(self, row: dict) -> int:
+        location = self._catalog.locations.code(row["location"]) if row["location"] is not None else 0
+        return location * _TYPE_SLOTS + int(_encode([row["property_type"]], _PROPERTY_TYPES)[0])
+
+    def _affected(self, changes: Iterable[Tuple[Optional[dict], Optional[dict]]]) -> List[int]:
+        keys = set()
+        for old, new in changes:
+            if old is not None and new is not None and all(old[name] == new[name] for name in _WATCHED):
+                continue
+            keys.update(self._group_key(row) for row in (old, new) if row is not None)
+        return sorted(keys)
+
+    def _recompute(self, snapshot, keys: Optional[List[int]]) -> None:
+        group = snapshot.location.astype(np.int64) * _TYPE_SLOTS + snapshot.property_type
+        if keys is None:
+            self._groups = compute_groups(group, snapshot.prices)
+            self.loaded = True
+            return
+        subset = np.isin(group, keys)
+        groups = dict(self._groups)
+        for key in keys:
+            groups.pop(key, None)
+        groups.update(compute_groups(group[subset], snapshot.prices[subset]))
+        # Swapped in whole, so readers never see a half-applied change
+        self._groups = groups
+
+    def _on_change(self, snapshot, changes) -> None:
+        with self._lock:
+            if changes is None or not self.loaded:
+                self._recompute(snapshot, None)
+            else:
+                keys = self._affected(changes)
+                if keys:
+                    self._recompute(snapshot, keys)
+
+    def stats(self, location: Optional[str] = None, property_type: Optional[str] = None) -> List[dict]:
+        """Cached groups, optionally narrowed to one location and/or type, ordered by location then type."""
+        names = self._catalog.locations.names
+        results = []
+        for key, group in list(self._groups.items()):
+            location_code, type_code = divmod(key, _TYPE_SLOTS)
+            group_location = names[location_code]
+            group_type = _PROPERTY_TYPES[type_code - 1] if type_code else None
+            if location is not None and group_location != location:
+                continue
+            if property_type is not None and group_type != property_type:
+                continue
+            results.append({"location": group_location, "property_type": group_type, **group})
+        results.sort(key=lambda item: (item["location"] or "", item["property_type"] or ""))
+        return results
+
+
+price_analytics = PriceAnalytics(property_catalog)
@@ -0,0 +1,179 @@
+"""
+Caches for decoded access tokens and the users they resolve to.
+
+Every worker keeps its own caches. When a user's credentials change, the
+committing worker publishes the email on ``AUTH_INVALIDATION_CHANNEL`` and
+every worker's ``AuthInvalidationListener`` drops its entries. A worker that
+has started the listener only trusts its caches while it is subscribed, and
+clears them on every (re)subscribe, since messages sent in between are lost.
+"""
+import asyncio
+import hashlib
+import os
+import time
+from typing import Iterable, Optional
+
+from loguru import logger
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from app.configs.redis_config import get_async_redis_client, get_redis_client
+from app.models.user import User
+from app.utils.cache import TTLCache
+
+AUTH_TOKEN_CACHE_SIZE = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "10000"))
+AUTH_TOKEN_CACHE_TTL = float(os.getenv("AUTH_TOKEN_CACHE_TTL", "300"))
+AUTH_USER_CACHE_SIZE = int(os.getenv("AUTH_USER_CACHE_SIZE", "5000"))
+AUTH_USER_CACHE_TTL = float(os.getenv("AUTH_USER_CACHE_TTL", "60"))
+AUTH_INVALIDATION_CHANNEL = os.getenv("AUTH_INVALIDATION_CHANNEL", "auth:invalidate")
+AUTH_INVALIDATION_RETRY = float(os.getenv("AUTH_INVALIDATION_RETRY", "1.0"))
+
+# Columns that change who a token is allowed to act as
+_CREDENTIAL_FIELDS = ("email", "hashed_password", "is_active")
+
+_token_cache = TTLCache(maxsize=AUTH_TOKEN_CACHE_SIZE, ttl=AUTH_TOKEN_CACHE_TTL)
+_user_cache = TTLCache(maxsize=AUTH_USER_CACHE_SIZE, ttl=AUTH_USER_CACHE_TTL)
+
+
+def token_digest(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def get_cached_payload(token: str) -> Optional[dict]:
+    """Return the verified payload of a token seen recently, if still cached."""
+    if not auth_invalidation.trusted:
+        return None
+    return _token_cache.get(token_digest(token))
+
+
+def cache_payload(token: str, payload: dict) -> None:
+    """Cache a verified payload, never beyond the token's own expiry."""
+    if not auth_invalidation.trusted:
+        return
+    ttl = AUTH_TOKEN_CACHE_TTL
+    if payload.get("exp") is not None:
+        ttl = min(ttl, float(payload["exp"]) - time.time())
+    _token_cache.set(token_digest(token), payload, ttl)
+
+
+def get_cached_user(db: Session, email: str) -> Optional[User]:
+    """Attach a cached user snapshot to ``db`` without emitting any SQL."""
+    if not auth_invalidation.trusted:
+        return None
+    snapshot = _user_cache.get(email)
+    if snapshot is None:
+        return None
+    return db.merge(snapshot, load=False)
+
+
+def cache_user(user: User) -> None:
+    """Keep a detached copy of ``user`` so later requests skip the lookup."""
+    if not auth_invalidation.trusted:
+        return
+    snapshot = User(**{attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs})
+    make_transient_to_detached(snapshot)
+    _user_cache.set(user.email, snapshot)
+
+
+def invalidate_user(email: str) -> None:
+    """Forget a user and every cached token issued to them."""
+    _user_cache.pop(email)
+    _token_cache.pop_where(lambda _, payload: payload.get("sub") == email)
+
+
+def clear_caches() -> None:
+    _user_cache.clear()
+    _token_cache.clear()
+
+
+def broadcast_invalidation(emails: Iterable[str]) -> None:
+    """Tell every worker to forget these users; their caches expire on their own if Redis is down."""
+    try:
+        client = get_redis_client()
+        for email in emails:
+            client.publish(AUTH_INVALIDATION_CHANNEL, email)
+    except Exception as e:
+        logger.warning(f"Could not broadcast auth cache invalidation: {e}")
+
+
+class AuthInvalidationListener:
+    """Applies invalidations published by other workers to this worker's caches."""
+
+    def __init__(self, retry: float = AUTH_INVALIDATION_RETRY):
+        self.retry = retry
+        self.subscribed = False
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def trusted(self) -> bool:
+        """Caches are usable unless the listener runs but has missed (or may miss) messages."""
+        return self._task is None or self.subscribed
+
+    async def _listen(self) -> None:
+        pubsub = get_async_redis_client().pubsub()
+        try:
+            await pubsub.subscribe(AUTH_INVALIDATION_CHANNEL)
+            clear_caches()
+            self.subscribed = True
+            while True:
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                if message is not None:
+                    invalidate_user(message["data"])
+        finally:
+            self.subscribed = False
+            await pubsub.aclose()
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await self._listen()
+            except Exception as e:
+                logger.warning(f"Auth invalidation listener disconnected, caches bypassed: {e}")
+            await asyncio.sleep(self.retry)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+auth_invalidation = AuthInvalidationListener()
+
+
+def _schedule_invalidation(target: User, emails: set) -> None:
+    for email in emails:
+        invalidate_user(email)
+    # Invalidate again once committed so a concurrent request cannot re-cache the old row
+    session = inspect(target).session
+    if session is not None:
+        session.info.setdefault("auth_invalidated_emails", set()).update(emails)
+
+
+@event.listens_for(User, "after_update")
+def _invalidate_on_credential_change(mapper, connection, target: User) -> None:
+    """Drop cached entries when a user is deactivated or changes password/email."""
+    attrs = inspect(target).attrs
+    if any(attrs[field].history.has_changes() for field in _CREDENTIAL_FIELDS):
+        _schedule_invalidation(target, {target.email, *attrs.email.history.deleted})
+
+
+@event.listens_for(User, "after_delete")
+def _invalidate_on_delete(mapper, connection, target: User) -> None:
+    _schedule_invalidation(target, {target.email})
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    emails = session.info.pop("auth_invalidated_emails", ())
+    for email in emails:
+        invalidate_user(email)
+    if emails:
+        broadcast_invalidation(sorted(emails))
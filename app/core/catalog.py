@@ -0,0 +1,393 @@
+"""
+In-process columnar copy of the properties table for list queries.
+
+Each worker keeps the filterable columns and the listing-card columns
+(``CATALOG_COLUMNS``) as NumPy arrays sorted by id. Enum columns and
+locations are dictionary-encoded to small integer codes. A filter is a
+handful of vectorized comparisons over those arrays, so a page of cards comes
+back without a DB round trip. Other columns, such as the description, are not
+kept; callers read them from SQL for the rows on the page.
+
+The copy follows the table by polling ``updated_at`` (with an overlap that
+catches transactions committing late) and the outbox's property ``deleted``,
+``archived`` and ``restored`` events. Snapshots are immutable and swapped in whole, so readers never lock.
+Listeners registered with ``subscribe`` hear about every change set, which is
+how derived views (app/core/analytics.py) stay current without their own polling.
+Callers fall back to SQL whenever ``query`` returns None: catalog disabled,
+not loaded yet, or not refreshed within ``CATALOG_MAX_STALENESS``.
+"""
+import asyncio
+import datetime
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from loguru import logger
+from sqlalchemy import func, select
+
+from app.configs.db_config import new_mysql_session
+from app.models.realty import OutboxEvent, Property
+from app.monitoring.prometheus import CATALOG_ROWS, CATALOG_STALENESS
+
+CATALOG_ENABLED = os.getenv("CATALOG_ENABLED", "false").lower() == "true"
+CATALOG_REFRESH_INTERVAL = float(os.getenv("CATALOG_REFRESH_INTERVAL", "1"))
+# Serve from SQL if the last successful refresh is older than this
+CATALOG_MAX_STALENESS = float(os.getenv("CATALOG_MAX_STALENESS", "10"))
+# Re-read rows updated this long before the watermark, for late commits
+CATALOG_POLL_OVERLAP = float(os.getenv("CATALOG_POLL_OVERLAP", "5"))
+
+# Deletes are re-read this many outbox ids back, for events committing out of id order
+_OUTBOX_OVERLAP = 1000
+# Events that take a property out of the table or bring it back
+_PRESENCE_EVENTS = ("deleted", "archived", "restored")
+_PRICE_COLUMNS = ["private_price", "single_price", "double_price", "triple_price"]
+_PROPERTY_TYPES = list(Property.__table__.c.property_type.type.enums)
+_LISTING_TYPES = list(Property.__table__.c.listing_type.type.enums)
+# Held per row; matches the "card" field group of the list endpoint plus the filter columns
+CATALOG_COLUMNS = (
+    "id", "property_name", "location", "property_type", "listing_type", "is_available",
+    *_PRICE_COLUMNS, "primary_image_url", "image_count",
+)
+
+
+def _encode(values: Sequence[Optional[str]], dictionary: List[str]) -> np.ndarray:
+    # 0 is NULL, so a code never matches a filter value by accident
+    codes = {value: code for code, value in enumerate(dictionary, start=1)}
+    return np.fromiter((codes.get(value, 0) for value in values), dtype=np.uint8, count=len(values))
+
+
+def _normalize(row) -> dict:
+    """A SQL row reduced to ``CATALOG_COLUMNS``, in the form the catalog hands back."""
+    values = {column: row[column] for column in CATALOG_COLUMNS}
+    for column in _PRICE_COLUMNS:
+        if values[column] is not None:
+            values[column] = float(values[column])
+    if values["is_available"] is not None:
+        values["is_available"] = bool(values["is_available"])
+    values["image_count"] = int(values["image_count"] or 0)
+    return values
+
+
+def _strings(values: Sequence[Optional[str]]) -> np.ndarray:
+    array = np.empty(len(values), dtype=object)
+    array[:] = values
+    return array
+
+
+class LocationCodes:
+    """Append-only dictionary encoding of locations; codes stay valid across snapshots."""
+
+    def __init__(self):
+        self.names: List[Optional[str]] = [None]  # code 0 is NULL
+        self._codes: Dict[str, int] = {}
+
+    def encode(self, values: Sequence[Optional[str]]) -> np.ndarray:
+        codes = np.empty(len(values), dtype=np.uint32)
+        for i, value in enumerate(values):
+            code = self._codes.get(value) if value is not None else 0
+            if code is None:
+                code = self._codes[value] = len(self.names)
+                self.names.append(value)
+            codes[i] = code
+        return codes
+
+    def code(self, value: str) -> int:
+        return self._codes.get(value, -1)
+
+
+class _Snapshot:
+    """One immutable version of the catalog: one array per held column, sorted by id."""
+    __slots__ = (
+        "ids", "location", "property_type", "listing_type", "is_available", "prices",
+        "property_name", "primary_image_url", "image_count", "locations",
+    )
+
+    def __init__(
+        self, ids, location, property_type, listing_type, is_available, prices,
+        property_name, primary_image_url, image_count, locations: LocationCodes,
+    ):
+        self.ids = ids
+        self.location = location
+        self.property_type = property_type
+        self.listing_type = listing_type
+        self.is_available = is_available
+        self.prices = prices
+        self.property_name = property_name
+        self.primary_image_url = primary_image_url
+        self.image_count = image_count
+        self.locations = locations
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def from_rows(cls, rows: List[dict], locations: LocationCodes) -> "_Snapshot":
+        """Encode rows already passed through ``_normalize``."""
+        n = len(rows)
+        return cls(
+            ids=np.fromiter((row["id"] for row in rows), dtype=np.int64, count=n),
+            location=locations.encode([row["location"] for row in rows]),
+            property_type=_encode([row["property_type"] for row in rows], _PROPERTY_TYPES),
+            listing_type=_encode([row["listing_type"] for row in rows], _LISTING_TYPES),
+            # -1 is NULL: SQL's is_available = true/false matches neither
+            is_available=np.fromiter(
+                (-1 if row["is_available"] is None else int(row["is_available"]) for row in rows),
+                dtype=np.int8, count=n,
+            ),
+            prices=np.array(
+                [[np.nan if row[column] is None else row[column] for column in _PRICE_COLUMNS] for row in rows],
+                dtype=np.float64,
+            ).reshape(n, len(_PRICE_COLUMNS)),
+            property_name=_strings([row["property_name"] for row in rows]),
+            primary_image_url=_strings([row["primary_image_url"] for row in rows]),
+            image_count=np.fromiter((row["image_count"] for row in rows), dtype=np.int32, count=n),
+            locations=locations,
+        )
+
+    def row(self, position: int) -> dict:
+        """Decode the row at ``position`` back into a dict of ``CATALOG_COLUMNS``."""
+        property_type = int(self.property_type[position])
+        listing_type = int(self.listing_type[position])
+        is_available = int(self.is_available[position])
+        prices = self.prices[position].tolist()
+        return {
+            "id": int(self.ids[position]),
+            "property_name": self.property_name[position],
+            "location": self.locations.names[int(self.location[position])],
+            "property_type": _PROPERTY_TYPES[property_type - 1] if property_type else None,
+            "listing_type": _LISTING_TYPES[listing_type - 1] if listing_type else None,
+            "is_available": None if is_available < 0 else bool(is_available),
+            **{column: None if np.isnan(price) else price for column, price in zip(_PRICE_COLUMNS, prices)},
+            "primary_image_url": self.primary_image_url[position],
+            "image_count": int(self.image_count[position]),
+        }
+
+    def get(self, property_id: int) -> Optional[dict]:
+        position = int(np.searchsorted(self.ids, property_id))
+        if position < len(self.ids) and self.ids[position] == property_id:
+            return self.row(position)
+        return None
+
+    def _arrays(self) -> tuple:
+        return (
+            self.ids, self.location, self.property_type, self.listing_type, self.is_available, self.prices,
+            self.property_name, self.primary_image_url, self.image_count,
+        )
+
+    def merge(self, changed: List[dict], deleted: Sequence[int], locations: LocationCodes) -> "_Snapshot":
+        """
+        New snapshot with ``changed`` rows upserted and ``deleted`` ids removed.
+
+        Only the changed rows are encoded; the rest is copied array-wise.
+        """
+        latest = {row["id"]: row for row in changed}
+        delta = _Snapshot.from_rows(list(latest.values()), locations)
+        positions = np.searchsorted(self.ids, delta.ids)
+        found = positions < len(self.ids)
+        found[found] = self.ids[positions[found]] == delta.ids[found]
+
+        arrays = [array.copy() for array in self._arrays()]
+        for array, changes in zip(arrays, delta._arrays()):
+            array[positions[found]] = changes[found]
+
+        deleted = np.setdiff1d(np.asarray(list(deleted), dtype=np.int64), delta.ids)
+        if len(deleted):
+            keep = ~np.isin(arrays[0], deleted)
+            arrays = [array[keep] for array in arrays]
+
+        added = ~found
+        if added.any():
+            arrays = [np.concatenate([array, changes[added]]) for array, changes in zip(arrays, delta._arrays())]
+            # New ids are usually the largest, so this is rarely needed
+            if len(arrays[0]) > 1 and (np.diff(arrays[0]) < 0).any():
+                order = np.argsort(arrays[0], kind="stable")
+                arrays = [array[order] for array in arrays]
+        return _Snapshot(*arrays, locations=locations)
+
+
+class PropertyCatalog:
+    """Columnar property catalog for one worker; see the module docstring."""
+
+    def __init__(self, interval: float = CATALOG_REFRESH_INTERVAL, max_staleness: float = CATALOG_MAX_STALENESS):
+        self.interval = interval
+        self.max_staleness = max_staleness
+        self._snapshot: Optional[_Snapshot] = None
+        self._updated_watermark: Optional[datetime.datetime] = None
+        self._outbox_watermark = 0
+        self._refreshed_at = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self._refresh_lock = threading.Lock()
+        self._listeners: List[Callable] = []
+        self.locations = LocationCodes()
+
+    def subscribe(self, listener: Callable) -> None:
+        """
+        Call ``listener(snapshot, changes)`` after every refresh that changed rows.
+
+        ``changes`` is a list of ``(old_row, new_row)`` pairs (None for an
+        insert's old row or a delete's new row), or None after a full load.
+        """
+        self._listeners.append(listener)
+
+    def _notify(self, snapshot: "_Snapshot", changes: Optional[List[Tuple[Optional[dict], Optional[dict]]]]) -> None:
+        for listener in self._listeners:
+            try:
+                listener(snapshot, changes)
+            except Exception as e:
+                logger.error(f"Property catalog listener {listener!r} failed: {e}")
+
+    # -------- loading --------
+
+    @staticmethod
+    def _select_rows(db, *criteria) -> list:
+        # updated_at only advances the poll watermark; it is not kept
+        columns = [Property.__table__.c[column] for column in (*CATALOG_COLUMNS, "updated_at")]
+        stmt = select(*columns).where(*criteria).order_by(Property.id)
+        return db.execute(stmt).mappings().all()
+
+    def load(self, db) -> None:
+        """Build the catalog from a full read of the table."""
+        outbox_watermark = db.execute(select(func.max(OutboxEvent.id))).scalar() or 0
+        rows = self._select_rows(db)
+        db.rollback()
+        snapshot = _Snapshot.from_rows([_normalize(row) for row in rows], self.locations)
+        self._install(snapshot, rows, outbox_watermark)
+        logger.info(f"Property catalog loaded {len(rows)} rows")
+        self._notify(snapshot, None)
+
+    def refresh(self, db) -> None:
+        """Apply rows updated since the last poll and properties deleted since then."""
+        with self._refresh_lock:
+            self._refresh(db)
+
+    def _refresh(self, db) -> None:
+        if self._snapshot is None:
+            self.load(db)
+            return
+        criteria = []
+        if self._updated_watermark is not None:
+            criteria.append(
+                Property.updated_at >= self._updated_watermark - datetime.timedelta(seconds=CATALOG_POLL_OVERLAP)
+            )
+        snapshot = self._snapshot
+        seen = self._select_rows(db, *criteria)
+        # The overlap re-reads recent rows every poll, and edits to columns the catalog
+        # does not hold look the same as no change; keep only real changes
+        changed = [row for row in map(_normalize, seen) if snapshot.get(row["id"]) != row]
+        presence_events = db.execute(
+            select(OutboxEvent.id, OutboxEvent.aggregate_id, OutboxEvent.event_type).where(
+                OutboxEvent.id > self._outbox_watermark - _OUTBOX_OVERLAP,
+                OutboxEvent.aggregate == "property",
+                OutboxEvent.event_type.in_(_PRESENCE_EVENTS),
+            ).order_by(OutboxEvent.id)
+        ).all()
+        db.rollback()
+        outbox_watermark = max([self._outbox_watermark, *(event.id for event in presence_events)])
+        # Only the latest event per property counts: a restore undoes an earlier archive
+        latest = {event.aggregate_id: event.event_type for event in presence_events}
+        deleted = [
+            property_id for property_id, event_type in latest.items()
+            if event_type != "restored" and snapshot.get(property_id) is not None
+        ]
+        if not changed and not deleted:
+            self._install(snapshot, seen, outbox_watermark)
+            return
+        changes = [(snapshot.get(row["id"]), row) for row in changed]
+        changes += [(snapshot.get(property_id), None) for property_id in deleted]
+        snapshot = snapshot.merge(changed, deleted, self.locations)
+        self._install(snapshot, seen, outbox_watermark)
+        self._notify(snapshot, changes)
+
+    def _install(self, snapshot: _Snapshot, seen_rows: list, outbox_watermark: int) -> None:
+        stamps = [row["updated_at"] for row in seen_rows if row["updated_at"] is not None]
+        if stamps:
+            self._updated_watermark = max([*stamps, self._updated_watermark or stamps[0]])
+        self._outbox_watermark = outbox_watermark
+        self._snapshot = snapshot
+        self._refreshed_at = time.monotonic()
+        CATALOG_ROWS.set(len(snapshot))
+
+    # -------- queries --------
+
+    @property
+    def snapshot(self) -> Optional[_Snapshot]:
+        return self._snapshot
+
+    @property
+    def ready(self) -> bool:
+        return self._snapshot is not None and time.monotonic() - self._refreshed_at <= self.max_staleness
+
+    def query(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        property_type: Optional[str] = None,
+        listing_type: Optional[str] = None,
+        is_available: Optional[bool] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+    ) -> Optional[List[dict]]:
+        """
+        Rows matching the filters, sorted by id, or None if SQL must answer.
+
+        Each row holds ``CATALOG_COLUMNS`` only. Filters mean the same as in
+        ``realty_repo.get_properties``: a price filter matches when any price
+        column lies within the bounds.
+        """
+        snapshot = self._snapshot
+        if snapshot is None or not self.ready:
+            return None
+        mask = np.ones(len(snapshot), dtype=bool)
+        if property_type is not None:
+            mask &= snapshot.property_type == _encode([property_type], _PROPERTY_TYPES)[0]
+        if listing_type is not None:
+            mask &= snapshot.listing_type == _encode([listing_type], _LISTING_TYPES)[0]
+        if is_available is not None:
+            mask &= snapshot.is_available == int(is_available)
+        if min_price is not None or max_price is not None:
+            # NaN (NULL) compares false, as in SQL
+            in_range = ~np.isnan(snapshot.prices)
+            if min_price is not None:
+                in_range &= snapshot.prices >= min_price
+            if max_price is not None:
+                in_range &= snapshot.prices <= max_price
+            mask &= in_range.any(axis=1)
+        positions = np.flatnonzero(mask)[skip:skip + limit]
+        return [snapshot.row(position) for position in positions.tolist()]
+
+    # -------- background refresh --------
+
+    def _refresh_once(self) -> None:
+        db = new_mysql_session()
+        try:
+            self.refresh(db)
+        finally:
+            db.close()
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await asyncio.to_thread(self._refresh_once)
+            except Exception as e:
+                logger.error(f"Property catalog refresh failed: {e}")
+            if self._snapshot is not None:
+                CATALOG_STALENESS.set(time.monotonic() - self._refreshed_at)
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+property_catalog = PropertyCatalog()
@@ -39,3 +39,58 @@ class ValidationError(HTTPException):
                 "message": message
             }
         )
+
+
+class RateLimitExceededError(HTTPException):
+    """Raised when a client exceeds its request quota."""
+    
+    def __init__(self, retry_after: int):
+        super().__init__(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail={
+                "error": "rate_limit_exceeded",
+                "message": f"Rate limit exceeded, retry in {retry_after} seconds"
+            },
+            headers={"Retry-After": str(retry_after)}
+        )
+
+
+class ServiceUnavailableError(HTTPException):
+    """Raised when the server sheds load instead of queueing more work."""
+    
+    def __init__(self, message: str = "Service temporarily overloaded", retry_after: int = 1):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail={
+                "error": "service_unavailable",
+                "message": message
+            },
+            headers={"Retry-After": str(retry_after)}
+        )
+
+
+class IdempotencyKeyReusedError(HTTPException):
+    """Raised when an Idempotency-Key is sent again with a different request."""
+    
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail={
+                "error": "idempotency_key_reused",
+                "message": "Idempotency-Key was already used for a different request"
+            }
+        )
+
+
+class IdempotencyKeyInUseError(HTTPException):
+    """Raised when a request with the same Idempotency-Key is still being processed."""
+    
+    def __init__(self, retry_after: int = 1):
+        super().__init__(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={
+                "error": "idempotency_key_in_use",
+                "message": "A request with this Idempotency-Key is still in progress"
+            },
+            headers={"Retry-After": str(retry_after)}
+        )
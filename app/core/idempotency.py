@@ -0,0 +1,176 @@
+"""
+``Idempotency-Key`` support for create endpoints, shared by every worker through Redis.
+
+The first request with a key claims it with a short-lived "pending" record,
+runs, and replaces the claim with its response for ``IDEMPOTENCY_TTL``
+seconds. A retry with the same key and the same request gets that response
+back, marked ``Idempotent-Replayed: true``, before any dependency runs, so it
+never opens a database session. A retry that arrives while the first request
+is still running waits up to ``IDEMPOTENCY_LOCK_WAIT`` seconds for it to
+finish, then gets a 409. Reusing a key for a different request is a 422.
+
+Errors are not stored, so a request that failed can be retried with the same
+key. If Redis is unavailable requests go through without the guarantee.
+"""
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import time
+import uuid
+from typing import Callable, Optional
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+from loguru import logger
+
+from app.configs.redis_config import get_async_redis_client
+from app.core.exceptions import IdempotencyKeyInUseError, IdempotencyKeyReusedError, ValidationError
+from app.monitoring.prometheus import IDEMPOTENT_REQUESTS
+
+IDEMPOTENCY_ENABLED = os.getenv("IDEMPOTENCY_ENABLED", "true").lower() == "true"
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+# How long a stored response is replayed for
+IDEMPOTENCY_TTL = int(os.getenv("IDEMPOTENCY_TTL", "86400"))
+# A claim left by a worker that died mid-request expires after this long
+IDEMPOTENCY_LOCK_TTL = float(os.getenv("IDEMPOTENCY_LOCK_TTL", "30"))
+# How long a concurrent duplicate waits for the first request before a 409
+IDEMPOTENCY_LOCK_WAIT = float(os.getenv("IDEMPOTENCY_LOCK_WAIT", "2"))
+
+_MAX_KEY_LENGTH = 255
+_POLL_INTERVAL = 0.05
+# Headers recomputed for the replayed response
+_SKIPPED_HEADERS = {"content-length", "date", "server", "x-request-id"}
+
+# Drops our claim only if it is still ours, so a late finisher cannot erase someone else's
+RELEASE_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+_release = None
+
+
+def _get_release_script():
+    """Register the script against the current client (clients are rebuilt after a fork)."""
+    global _release
+    client = get_async_redis_client()
+    if _release is None or _release.registered_client is not client:
+        _release = client.register_script(RELEASE_LUA)
+    return _release
+
+
+def request_fingerprint(request: Request, body: bytes) -> str:
+    """Digest of what makes two requests "the same": method, path, query and body."""
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("multipart/form-data") and "boundary=" in content_type:
+        # Clients pick a new boundary for every attempt
+        boundary = content_type.split("boundary=", 1)[1].split(";", 1)[0].strip('"')
+        body = body.replace(boundary.encode(), b"")
+    digest = hashlib.sha256()
+    for part in (request.method, request.url.path, str(request.url.query)):
+        digest.update(part.encode() + b"\0")
+    digest.update(body)
+    return digest.hexdigest()
+
+
+def _redis_key(key: str) -> str:
+    return f"idempotency:{hashlib.sha256(key.encode()).hexdigest()}"
+
+
+def _replay(record: dict) -> Response:
+    response = Response(content=base64.b64decode(record["body"]), status_code=record["status"])
+    for name, value in record["headers"]:
+        response.headers.append(name, value)
+    response.headers["Idempotent-Replayed"] = "true"
+    return response
+
+
+def _stored(fingerprint: str, response: Response) -> Optional[str]:
+    body = getattr(response, "body", None)
+    if body is None or response.status_code >= 400:
+        return None
+    headers = [(name, value) for name, value in response.headers.items() if name not in _SKIPPED_HEADERS]
+    return json.dumps({
+        "fingerprint": fingerprint,
+        "status": response.status_code,
+        "headers": headers,
+        "body": base64.b64encode(body).decode(),
+    })
+
+
+async def _claim(redis, redis_key: str, fingerprint: str, claim: str) -> Optional[Response]:
+    """Claim the key, or return the response to send instead of running the request."""
+    deadline = time.monotonic() + IDEMPOTENCY_LOCK_WAIT
+    while True:
+        if await redis.set(redis_key, claim, nx=True, px=int(IDEMPOTENCY_LOCK_TTL * 1000)):
+            return None
+        raw = await redis.get(redis_key)
+        if raw is not None:
+            record = json.loads(raw)
+            if record["fingerprint"] != fingerprint:
+                IDEMPOTENT_REQUESTS.labels(outcome="reused").inc()
+                raise IdempotencyKeyReusedError()
+            if "status" in record:
+                IDEMPOTENT_REQUESTS.labels(outcome="replayed").inc()
+                return _replay(record)
+            if time.monotonic() >= deadline:
+                IDEMPOTENT_REQUESTS.labels(outcome="in_progress").inc()
+                raise IdempotencyKeyInUseError()
+            await asyncio.sleep(_POLL_INTERVAL)
+
+
+class IdempotentRoute(APIRoute):
+    """
+    Route class that honours ``Idempotency-Key`` on POST routes.
+
+    Use it as a router's ``route_class``; other methods are left untouched.
+    """
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+        if "POST" not in self.methods:
+            return handler
+
+        async def idempotent_handler(request: Request) -> Response:
+            key = request.headers.get(IDEMPOTENCY_HEADER)
+            if not IDEMPOTENCY_ENABLED or key is None:
+                return await handler(request)
+            if not key or len(key) > _MAX_KEY_LENGTH:
+                raise ValidationError(f"{IDEMPOTENCY_HEADER} must be 1-{_MAX_KEY_LENGTH} characters")
+
+            from redis.exceptions import RedisError  # deferred: importing redis is slow at startup
+
+            # Reading the body here caches it for the handler
+            fingerprint = request_fingerprint(request, await request.body())
+            redis_key = _redis_key(key)
+            claim = json.dumps({"fingerprint": fingerprint, "claim": uuid.uuid4().hex})
+            redis = get_async_redis_client()
+            try:
+                replay = await _claim(redis, redis_key, fingerprint, claim)
+            except RedisError as e:
+                logger.warning(f"Idempotency store unavailable, processing without it: {e}")
+                IDEMPOTENT_REQUESTS.labels(outcome="unavailable").inc()
+                return await handler(request)
+            if replay is not None:
+                return replay
+
+            stored = None
+            try:
+                response = await handler(request)
+                stored = _stored(fingerprint, response)
+            finally:
+                try:
+                    if stored is not None:
+                        await redis.set(redis_key, stored, ex=IDEMPOTENCY_TTL)
+                        IDEMPOTENT_REQUESTS.labels(outcome="stored").inc()
+                    else:
+                        await _get_release_script()(keys=[redis_key], args=[claim])
+                except RedisError as e:
+                    logger.warning(f"Could not record idempotent response for retries: {e}")
+            return response
+
+        return idempotent_handler
@@ -2,9 +2,9 @@ import os
 from datetime import datetime, timedelta
 from typing import Optional, Any
 from jose import jwt, JWTError
-from dotenv import load_dotenv
+from app.configs.env_config import load_env
 
-load_dotenv()
+load_env()
 
 SECRET_KEY = os.getenv("SECRET_KEY", "09d25e094faa6ca2556c818166b7a9563b93f7099f6f0f4caa6cf63b88e8d3e7")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
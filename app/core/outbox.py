@@ -0,0 +1,306 @@
+"""
+Change stream for realty writes.
+
+The repo layer writes an ``realty_outbox`` row in the same transaction as each
+create, update and delete. The relay below copies unpublished rows to a Redis
+stream and only then marks them published, so every change reaches the stream
+at least once; a relay that dies between the two steps republishes the batch.
+Consumers read through consumer groups, acknowledge after handling, and must
+tolerate duplicates (``event_id`` is unique per change).
+
+    python -m app.core.outbox relay --metrics-port 9809
+    python -m app.core.outbox tail --group search-index
+    python -m app.core.outbox scrub-contacts
+"""
+import argparse
+import datetime
+import json
+import os
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from loguru import logger
+from prometheus_client import start_http_server
+
+from app.configs.db_config import new_mysql_session
+from app.configs.redis_config import get_redis_client
+from app.monitoring.prometheus import OUTBOX_PUBLISHED, OUTBOX_RELAY_LAG
+from app.repo import realty as realty_repo
+
+OUTBOX_STREAM = os.getenv("OUTBOX_STREAM", "realty:changes")
+# Approximate cap on stream length; older changes stay readable from the outbox table
+OUTBOX_STREAM_MAXLEN = int(os.getenv("OUTBOX_STREAM_MAXLEN", "1000000"))
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "500"))
+# Relay sleep when the outbox is empty
+OUTBOX_POLL_INTERVAL = float(os.getenv("OUTBOX_POLL_INTERVAL", "0.5"))
+# Published rows are purged from the table after this many days (0 keeps them)
+OUTBOX_RETENTION_DAYS = float(os.getenv("OUTBOX_RETENTION_DAYS", "7"))
+# Pending entries idle this long are reclaimed from a consumer that died
+OUTBOX_CLAIM_IDLE_MS = int(os.getenv("OUTBOX_CLAIM_IDLE_MS", "60000"))
+# The relay serves its own /metrics here (0 disables)
+OUTBOX_METRICS_PORT = int(os.getenv("OUTBOX_METRICS_PORT", "9809"))
+
+Message = Tuple[str, Dict[str, str]]
+
+
+def _stream_fields(event) -> Dict[str, str]:
+    return {
+        "event_id": str(event.id),
+        "aggregate": event.aggregate,
+        "aggregate_id": str(event.aggregate_id),
+        "event_type": event.event_type,
+        "payload": json.dumps(event.payload or {}, separators=(",", ":")),
+        "created_at": event.created_at.isoformat() if event.created_at else "",
+    }
+
+
+def decode_event(fields: Dict[str, str]) -> dict:
+    """Stream entry fields back into an event dict."""
+    return {
+        "event_id": int(fields["event_id"]),
+        "aggregate": fields["aggregate"],
+        "aggregate_id": int(fields["aggregate_id"]),
+        "event_type": fields["event_type"],
+        "payload": json.loads(fields["payload"]),
+        "created_at": fields["created_at"] or None,
+    }
+
+
+# ==================== RELAY ====================
+
+def relay_once(db, redis, batch_size: int = OUTBOX_BATCH_SIZE) -> int:
+    """Publish one batch of unpublished outbox rows; returns how many were sent."""
+    try:
+        events = realty_repo.get_unpublished_events(db, batch_size)
+        if not events:
+            db.rollback()
+            OUTBOX_RELAY_LAG.set(0)
+            return 0
+        pipe = redis.pipeline(transaction=False)
+        for event in events:
+            pipe.xadd(OUTBOX_STREAM, _stream_fields(event), maxlen=OUTBOX_STREAM_MAXLEN, approximate=True)
+        pipe.execute()
+        realty_repo.mark_events_published(db, [event.id for event in events])
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    OUTBOX_PUBLISHED.inc(len(events))
+    if events[0].created_at is not None:
+        OUTBOX_RELAY_LAG.set(max(0.0, (datetime.datetime.now() - events[0].created_at).total_seconds()))
+    return len(events)
+
+
+def purge_published(db, retention_days: float = OUTBOX_RETENTION_DAYS, batch_size: int = 5000) -> int:
+    """Delete published rows older than the retention window, one batch per transaction."""
+    if retention_days <= 0:
+        return 0
+    before = datetime.datetime.now() - datetime.timedelta(days=retention_days)
+    total = 0
+    while True:
+        deleted = realty_repo.purge_published_events(db, before, batch_size)
+        db.commit()
+        total += deleted
+        if deleted < batch_size:
+            return total
+
+
+def run_relay(batch_size: int = OUTBOX_BATCH_SIZE, poll_interval: float = OUTBOX_POLL_INTERVAL) -> None:
+    """Relay forever: drain full batches back to back, sleep when idle, purge hourly."""
+    redis = get_redis_client()
+    db = new_mysql_session()
+    next_purge = 0.0
+    logger.info(f"Outbox relay publishing to stream {OUTBOX_STREAM!r}")
+    try:
+        while True:
+            try:
+                sent = relay_once(db, redis, batch_size)
+                if time.monotonic() >= next_purge:
+                    purged = purge_published(db)
+                    if purged:
+                        logger.info(f"Purged {purged} published outbox rows")
+                    next_purge = time.monotonic() + 3600
+            except Exception as exc:
+                logger.error(f"Outbox relay failed, retrying: {exc}")
+                sent = 0
+            if sent < batch_size:
+                time.sleep(poll_interval)
+    finally:
+        db.close()
+
+
+# ==================== CONSUMERS ====================
+
+def ensure_group(redis, group: str, start: str = "0") -> None:
+    """Create ``group`` on the stream (and the stream itself) if missing; ``start="$"`` skips history."""
+    import redis as redis_lib
+
+    try:
+        redis.xgroup_create(OUTBOX_STREAM, group, id=start, mkstream=True)
+    except redis_lib.ResponseError as exc:
+        if "BUSYGROUP" not in str(exc):
+            raise
+
+
+class StreamConsumer:
+    """
+    One member of a consumer group on the change stream.
+
+    ``handler`` receives a list of decoded events and must be idempotent.
+    Entries are acknowledged only after it returns, so a crash leaves them
+    pending; another member reclaims them once idle for ``claim_idle_ms``.
+    """
+
+    def __init__(
+        self,
+        redis,
+        group: str,
+        consumer: str,
+        handler: Callable[[List[dict]], None],
+        batch_size: int = OUTBOX_BATCH_SIZE,
+        claim_idle_ms: int = OUTBOX_CLAIM_IDLE_MS,
+    ):
+        self.redis = redis
+        self.group = group
+        self.consumer = consumer
+        self.handler = handler
+        self.batch_size = batch_size
+        self.claim_idle_ms = claim_idle_ms
+        ensure_group(redis, group)
+
+    def _handle(self, messages: List[Message]) -> int:
+        messages = [(entry_id, fields) for entry_id, fields in messages if fields]
+        if not messages:
+            return 0
+        self.handler([decode_event(fields) for _, fields in messages])
+        self.redis.xack(OUTBOX_STREAM, self.group, *[entry_id for entry_id, _ in messages])
+        return len(messages)
+
+    def reclaim(self) -> int:
+        """Take over entries another member read but never acknowledged."""
+        handled = 0
+        cursor = "0-0"
+        while True:
+            cursor, messages, *_ = self.redis.xautoclaim(
+                OUTBOX_STREAM, self.group, self.consumer, self.claim_idle_ms, cursor, count=self.batch_size
+            )
+            handled += self._handle(messages)
+            if cursor == "0-0":
+                return handled
+
+    def poll(self, block_ms: Optional[int] = 5000) -> int:
+        """Read and handle the next batch of new entries; returns how many were handled."""
+        response = self.redis.xreadgroup(
+            self.group, self.consumer, {OUTBOX_STREAM: ">"}, count=self.batch_size, block=block_ms
+        )
+        return sum(self._handle(messages) for _, messages in response or [])
+
+    def run(self, block_ms: int = 5000) -> None:
+        self.reclaim()
+        last_reclaim = time.monotonic()
+        while True:
+            self.poll(block_ms)
+            if time.monotonic() - last_reclaim >= self.claim_idle_ms / 1000:
+                self.reclaim()
+                last_reclaim = time.monotonic()
+
+
+def read_stream(redis, after: str = "0", batch_size: int = 5000) -> Iterator[List[Tuple[str, dict]]]:
+    """
+    Yield ``(entry_id, event)`` batches from the stream after entry ``after``.
+
+    For consumers outside a group that track their own offset.
+    """
+    while True:
+        messages = redis.xrange(OUTBOX_STREAM, min=f"({after}", count=batch_size)
+        if not messages:
+            return
+        yield [(entry_id, decode_event(fields)) for entry_id, fields in messages]
+        after = messages[-1][0]
+
+
+def catch_up(db, after_event_id: int = 0, batch_size: int = 5000) -> Iterator[List[dict]]:
+    """
+    Yield event batches after ``after_event_id`` straight from the outbox table.
+
+    Use this to rebuild from an offset older than the trimmed stream, then
+    switch to the stream.
+    """
+    while True:
+        events = realty_repo.get_events_after(db, after_event_id, batch_size)
+        if not events:
+            return
+        yield [decode_event(_stream_fields(event)) for event in events]
+        after_event_id = events[-1].id
+
+
+# ==================== CONTACT SCRUB ====================
+
+def scrub_contact_outbox(db, batch_size: int = 5000) -> int:
+    """Trim every contact outbox row that still carries personal data, one batch per transaction."""
+    after_id, total = 0, 0
+    while True:
+        try:
+            after_id, scrubbed = realty_repo.scrub_contact_events_after(db, after_id, batch_size)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        if after_id is None:
+            return total
+        total += scrubbed
+
+
+def scrub_contact_stream(redis, batch_size: int = 5000) -> int:
+    """
+    Delete stream entries of contact events that carry personal data.
+
+    Entries cannot be rewritten in place; consumers read contacts from the API
+    anyway, and ``catch_up`` serves the trimmed rows from the outbox table.
+    """
+    total = 0
+    for batch in read_stream(redis, batch_size=batch_size):
+        entry_ids = [
+            entry_id for entry_id, event in batch
+            if event["aggregate"] == "contact" and realty_repo.contact_payload_has_personal_data(event["payload"])
+        ]
+        if entry_ids:
+            total += redis.xdel(OUTBOX_STREAM, *entry_ids)
+    return total
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    relay = commands.add_parser("relay", help="Publish outbox rows to the change stream")
+    relay.add_argument("--batch-size", type=int, default=OUTBOX_BATCH_SIZE)
+    relay.add_argument("--metrics-port", type=int, default=OUTBOX_METRICS_PORT, help="0 disables /metrics")
+    tail = commands.add_parser("tail", help="Print changes as a consumer group member")
+    tail.add_argument("--group", default="tail")
+    tail.add_argument("--consumer", default=f"tail-{os.getpid()}")
+    commands.add_parser("scrub-contacts", help="Drop personal data from older contact events")
+    args = parser.parse_args()
+
+    if args.command == "relay":
+        if args.metrics_port:
+            start_http_server(args.metrics_port)
+            logger.info(f"Outbox relay serving metrics on :{args.metrics_port}")
+        run_relay(args.batch_size)
+    elif args.command == "scrub-contacts":
+        db = new_mysql_session()
+        try:
+            rows = scrub_contact_outbox(db)
+        finally:
+            db.close()
+        entries = scrub_contact_stream(get_redis_client())
+        logger.info(f"Scrubbed {rows} contact outbox rows and deleted {entries} contact stream entries")
+    else:
+        def show(events: List[dict]) -> None:
+            for event in events:
+                print(json.dumps(event))
+
+        StreamConsumer(get_redis_client(), args.group, args.consumer, show).run()
+
+
+if __name__ == "__main__":
+    main()
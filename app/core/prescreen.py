@@ -0,0 +1,219 @@
+"""In-process pre-screen that short-circuits clear moderation verdicts.
+
+Texts are matched against a configurable term list with an Aho-Corasick
+automaton before anything is sent to the external moderation model. Only
+phrases on an explicit allow-list are approved without the model; with no
+allow-list configured, everything that is not denied goes to the model.
+Screening never touches the network, so it can be exercised offline.
+"""
+import os
+import re
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+PRESCREEN_ENABLED = os.getenv("PRESCREEN_ENABLED", "true").lower() == "true"
+PRESCREEN_TERMS = os.getenv("PRESCREEN_TERMS", "")
+PRESCREEN_TERMS_FILE = os.getenv("PRESCREEN_TERMS_FILE")
+# Exact phrases (after normalization) approved without asking the model
+PRESCREEN_ALLOW_PHRASES = os.getenv("PRESCREEN_ALLOW_PHRASES", "")
+PRESCREEN_ALLOW_FILE = os.getenv("PRESCREEN_ALLOW_FILE")
+PRESCREEN_DENY_MIN_MATCHES = int(os.getenv("PRESCREEN_DENY_MIN_MATCHES", "1"))
+PRESCREEN_SHADOW_RATE = float(os.getenv("PRESCREEN_SHADOW_RATE", "0.05"))
+
+ALLOW = "allow"
+DENY = "deny"
+DEFER = "defer"
+
+# Shadow-check counts, written by Celery workers and exported by the API's /metrics
+PRESCREEN_SHADOW_KEY = "moderation:prescreen:shadow"
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_TRAILING_PUNCTUATION = ".!?"
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase and collapse whitespace so matching is case/spacing insensitive."""
+    return _WHITESPACE_RE.sub(" ", text.lower()).strip()
+
+
+class TermMatcher:
+    """Aho-Corasick automaton over a fixed list of terms.
+
+    Matches are only reported on word boundaries, so a banned term never
+    fires inside an unrelated longer word.
+    """
+
+    def __init__(self, terms: Iterable[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[str]] = [[]]
+        for term in terms:
+            term = normalize_text(term)
+            if term:
+                self._add(term)
+        self._build()
+
+    def __len__(self) -> int:
+        return sum(len(out) for out in self._output)
+
+    def _add(self, term: str) -> None:
+        node = 0
+        for char in term:
+            nxt = self._goto[node].get(char)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][char] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            node = nxt
+        if term not in self._output[node]:
+            self._output[node].append(term)
+
+    def _build(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def find(self, text: str) -> List[Tuple[int, str]]:
+        """Return ``(start, term)`` for every whole-word match in normalized text."""
+        matches = []
+        node = 0
+        for end, char in enumerate(text):
+            while node and char not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(char, 0)
+            for term in self._output[node]:
+                start = end - len(term) + 1
+                before = text[start - 1] if start > 0 else " "
+                after = text[end + 1] if end + 1 < len(text) else " "
+                if not before.isalnum() and not after.isalnum():
+                    matches.append((start, term))
+        return matches
+
+
+@dataclass
+class PrescreenVerdict:
+    """Outcome of the pre-screen for a single text."""
+    decision: str
+    matched_terms: List[str] = field(default_factory=list)
+    reason: str = ""
+
+    @property
+    def short_circuited(self) -> bool:
+        return self.decision != DEFER
+
+    @property
+    def flagged(self) -> Optional[bool]:
+        """Moderation flag implied by the verdict, or None when deferred."""
+        if self.decision == DEFER:
+            return None
+        return self.decision == DENY
+
+    def to_result(self) -> dict:
+        """Render the verdict in the same shape as a moderation model response."""
+        return {
+            "id": None,
+            "model": "prescreen",
+            "results": [{
+                "flagged": self.flagged,
+                "matched_terms": self.matched_terms,
+                "reason": self.reason,
+            }],
+        }
+
+
+def _allow_form(text: str) -> str:
+    return normalize_text(text).rstrip(_TRAILING_PUNCTUATION).rstrip()
+
+
+class Prescreener:
+    """Applies the configured allow/deny rules to a text."""
+
+    def __init__(
+        self,
+        terms: Iterable[str],
+        allow_phrases: Iterable[str] = (),
+        deny_min_matches: int = PRESCREEN_DENY_MIN_MATCHES,
+    ):
+        self.matcher = TermMatcher(terms)
+        self.allow_phrases = {_allow_form(phrase) for phrase in allow_phrases} - {""}
+        self.deny_min_matches = max(1, deny_min_matches)
+
+    def screen(self, text: str) -> PrescreenVerdict:
+        normalized = normalize_text(text)
+        terms = sorted({term for _, term in self.matcher.find(normalized)})
+        if len(terms) >= self.deny_min_matches:
+            return PrescreenVerdict(DENY, terms, "matched banned terms")
+        if terms:
+            return PrescreenVerdict(DEFER, terms, "below deny threshold")
+        if _allow_form(normalized) in self.allow_phrases:
+            return PrescreenVerdict(ALLOW, reason="allow-listed phrase")
+        return PrescreenVerdict(DEFER, reason="needs model")
+
+
+def load_terms(inline: str = PRESCREEN_TERMS, path: Optional[str] = PRESCREEN_TERMS_FILE) -> List[str]:
+    """Read terms (or allow phrases) from a comma separated env value and an optional file (one per line)."""
+    terms = [term.strip() for term in inline.split(",") if term.strip()]
+    if path:
+        with open(path, encoding="utf-8") as fh:
+            terms.extend(
+                line.strip() for line in fh
+                if line.strip() and not line.lstrip().startswith("#")
+            )
+    return terms
+
+
+_prescreener: Optional[Prescreener] = None
+
+
+def get_prescreener() -> Prescreener:
+    """Return the process-wide pre-screener, building the automaton on first use."""
+    global _prescreener
+    if _prescreener is None:
+        _prescreener = Prescreener(load_terms(), load_terms(PRESCREEN_ALLOW_PHRASES, PRESCREEN_ALLOW_FILE))
+    return _prescreener
+
+
+def is_disagreement(verdict_decision: str, model_result: dict) -> Optional[bool]:
+    """Compare a short-circuit decision with the model response.
+
+    Returns None when the model response carries no usable ``flagged`` value.
+    """
+    results = (model_result or {}).get("results") or []
+    if not results or "flagged" not in results[0]:
+        return None
+    return (verdict_decision == DENY) != bool(results[0]["flagged"])
+
+
+def record_shadow_check(redis, verdict_decision: str, model_result: dict) -> Optional[bool]:
+    """Count a shadow check, and whether the model disagreed, in Redis for the API to export."""
+    disagreed = is_disagreement(verdict_decision, model_result)
+    if disagreed is None:
+        return None
+    pipe = redis.pipeline()
+    pipe.hincrby(PRESCREEN_SHADOW_KEY, f"checked:{verdict_decision}", 1)
+    if disagreed:
+        pipe.hincrby(PRESCREEN_SHADOW_KEY, f"disagreed:{verdict_decision}", 1)
+    pipe.execute()
+    return disagreed
+
+
+def read_shadow_counts(redis) -> Dict[str, Dict[str, int]]:
+    """``{"checked": {decision: n}, "disagreed": {decision: n}}`` as recorded by the workers."""
+    counts: Dict[str, Dict[str, int]] = {"checked": {}, "disagreed": {}}
+    for field_name, value in redis.hgetall(PRESCREEN_SHADOW_KEY).items():
+        if isinstance(field_name, bytes):
+            field_name = field_name.decode()
+        kind, _, decision = field_name.partition(":")
+        if kind in counts:
+            counts[kind][decision] = int(value)
+    return counts
@@ -0,0 +1,123 @@
+"""
+Per-worker cache of rendered GET responses, kept with their compressed variants.
+
+Off unless ``RESPONSE_CACHE_TTL`` is set. Writes clear only the cache of the
+process that commits them, so with several workers, or with listings changed
+by Celery jobs, other workers serve a page for up to the TTL after a write.
+"""
+import os
+import threading
+from typing import Callable, Dict, Optional
+
+from fastapi import Request, Response
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.models.realty import Property, PropertyImage
+from app.utils.cache import TTLCache
+from app.utils.compression import COMPRESSION_MIN_SIZE, compress, negotiate_encoding
+
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "1000"))
+# Bounds staleness across workers; writes in this worker invalidate immediately. 0 disables the cache
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "0"))
+RESPONSE_CACHE_ENABLED = (
+    os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true" and RESPONSE_CACHE_TTL > 0
+)
+
+_cache = TTLCache(maxsize=RESPONSE_CACHE_SIZE, ttl=RESPONSE_CACHE_TTL)
+
+
+class CachedBody:
+    """A rendered body plus each encoding of it, compressed at most once."""
+    __slots__ = ("identity", "media_type", "_encoded", "_lock")
+
+    def __init__(self, identity: bytes, media_type: str):
+        self.identity = identity
+        self.media_type = media_type
+        self._encoded: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def encoded(self, encoding: Optional[str]) -> bytes:
+        if encoding is None:
+            return self.identity
+        body = self._encoded.get(encoding)
+        if body is None:
+            with self._lock:
+                body = self._encoded.get(encoding)
+                if body is None:
+                    body = self._encoded[encoding] = compress(self.identity, encoding)
+        return body
+
+
+def cache_key(request: Request) -> str:
+    """Path plus query parameters in a canonical order."""
+    query = "&".join(f"{key}={value}" for key, value in sorted(request.query_params.multi_items()))
+    return f"{request.url.path}?{query}"
+
+
+def cached_response(
+    request: Request,
+    render: Callable[[], bytes],
+    media_type: str = "application/json",
+) -> Response:
+    """
+    Serve ``render()`` from the cache, in the encoding the client negotiated.
+
+    The response carries its Content-Encoding, so CompressionMiddleware
+    passes it through instead of compressing it again on every hit.
+    """
+    if not RESPONSE_CACHE_ENABLED:
+        return Response(content=render(), media_type=media_type)
+
+    key = cache_key(request)
+    entry = _cache.get(key)
+    status = "HIT"
+    if entry is None:
+        entry = CachedBody(render(), media_type)
+        _cache.set(key, entry)
+        status = "MISS"
+
+    headers = {"Vary": "Accept-Encoding", "X-Cache": status}
+    encoding = None
+    if len(entry.identity) >= COMPRESSION_MIN_SIZE:
+        encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+    return Response(content=entry.encoded(encoding), media_type=entry.media_type, headers=headers)
+
+
+def invalidate_responses() -> None:
+    _cache.clear()
+
+
+# Any write to listings makes cached pages stale. Clear on flush and again
+# after commit, so a request racing the transaction cannot re-cache old rows.
+def _mark_session_dirty(session: Optional[Session]) -> None:
+    invalidate_responses()
+    if session is not None:
+        session.info["response_cache_dirty"] = True
+
+
+def _mark_dirty(mapper, connection, target) -> None:
+    _mark_session_dirty(Session.object_session(target))
+
+
+for _model in (Property, PropertyImage):
+    for _event in ("after_insert", "after_update", "after_delete"):
+        event.listen(_model, _event, _mark_dirty)
+
+_LISTING_TABLES = (Property.__table__, PropertyImage.__table__)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_dirty_on_bulk_write(orm_execute_state) -> None:
+    """Set-based writes (archive, restore, image summary refresh) skip the mapper events."""
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        if orm_execute_state.statement.table in _LISTING_TABLES:
+            _mark_session_dirty(orm_execute_state.session)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    if session.info.pop("response_cache_dirty", False):
+        invalidate_responses()
@@ -0,0 +1,66 @@
+"""
+Compact forms of moderation results for the Celery result backend and the database.
+
+``zlib-json`` is a lossless serializer: compact JSON, zlib-compressed. It is
+registered with kombu and used as the result serializer, so the copy the
+backend keeps in Redis shrinks without changing what readers get back.
+
+``compact_moderation_result`` is a lossy projection: per input it keeps the
+flag, the category flags and the category scores rounded to
+``MODERATION_SCORE_DIGITS`` decimals, and drops per-category input types and
+null fields, which nothing reads.
+"""
+import json
+import os
+import zlib
+from typing import Any
+
+from kombu.serialization import register
+
+from app.configs.env_config import load_env
+
+load_env()
+
+MODERATION_SCORE_DIGITS = int(os.getenv("MODERATION_SCORE_DIGITS", "4"))
+RESULT_ZLIB_LEVEL = int(os.getenv("RESULT_ZLIB_LEVEL", "6"))
+
+ZLIB_JSON = "zlib-json"
+_CONTENT_TYPE = "application/x-zlib-json"
+_DROPPED_FIELDS = {"category_applied_input_types"}
+
+
+def zlib_json_dumps(value: Any) -> bytes:
+    return zlib.compress(json.dumps(value, separators=(",", ":")).encode(), RESULT_ZLIB_LEVEL)
+
+
+def zlib_json_loads(data: bytes) -> Any:
+    if isinstance(data, str):
+        data = data.encode("latin-1")
+    return json.loads(zlib.decompress(data))
+
+
+def register_zlib_json() -> None:
+    """Make ``zlib-json`` available to kombu; safe to call more than once."""
+    register(ZLIB_JSON, zlib_json_dumps, zlib_json_loads, content_type=_CONTENT_TYPE, content_encoding="binary")
+
+
+def _without_nulls(mapping: dict) -> dict:
+    return {key: value for key, value in mapping.items() if value is not None}
+
+
+def compact_moderation_result(result: Any) -> Any:
+    """Trim a moderation response to the fields callers use; anything else is returned unchanged."""
+    if not isinstance(result, dict) or not isinstance(result.get("results"), list):
+        return result
+    items = []
+    for item in result["results"]:
+        compact = {key: value for key, value in _without_nulls(item).items() if key not in _DROPPED_FIELDS}
+        if isinstance(compact.get("categories"), dict):
+            compact["categories"] = _without_nulls(compact["categories"])
+        if isinstance(compact.get("category_scores"), dict):
+            compact["category_scores"] = {
+                category: round(score, MODERATION_SCORE_DIGITS)
+                for category, score in _without_nulls(compact["category_scores"]).items()
+            }
+        items.append(compact)
+    return {**_without_nulls({key: value for key, value in result.items() if key != "results"}), "results": items}
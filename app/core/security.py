@@ -1,9 +1,76 @@
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple
+
 from passlib.context import CryptContext
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.core.exceptions import ServiceUnavailableError
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# 0 hashes inline on the calling thread (useful for tests and one-off scripts)
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", max(1, (os.cpu_count() or 2) // 2)))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "32"))
+PASSWORD_HASH_QUEUE_TIMEOUT = float(os.getenv("PASSWORD_HASH_QUEUE_TIMEOUT", "2.0"))
+
+# Hashes made with a different cost are reported as needing an update
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+_pending = threading.BoundedSemaphore(PASSWORD_HASH_MAX_PENDING)
+
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
+
+def _verify_and_update(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    """Start the hashing pool on first use; spawned so it never inherits server threads."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=PASSWORD_HASH_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            atexit.register(_executor.shutdown, wait=False, cancel_futures=True)
+        return _executor
+
+
+def _run(fn, *args):
+    """
+    Run a bcrypt call in the hashing pool, off this process's GIL.
+
+    At most PASSWORD_HASH_MAX_PENDING calls are queued; callers that cannot
+    get a slot in time are rejected instead of piling up behind the pool.
+    """
+    if PASSWORD_HASH_WORKERS <= 0:
+        return fn(*args)
+    if not _pending.acquire(timeout=PASSWORD_HASH_QUEUE_TIMEOUT):
+        raise ServiceUnavailableError("Too many concurrent password operations", retry_after=1)
+    try:
+        return _get_executor().submit(fn, *args).result()
+    finally:
+        _pending.release()
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return _run(_verify, plain_password, hashed_password)
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify a password and return a new hash when the stored one uses an outdated cost."""
+    return _run(_verify_and_update, plain_password, hashed_password)
+
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return _run(_hash, password)
@@ -0,0 +1,324 @@
+"""
+"Similar properties" scoring over an in-memory feature matrix.
+
+Each property becomes one float32 row: weighted one-hot property type and
+furnishing, plus its log price scaled to unit spread. Similarity is the
+negative squared distance between rows, computed for every candidate at once
+as ``2 F.f - |F|^2``. Location is kept as an integer code and adds a fixed
+penalty when it differs, so there is no one-hot column per locality.
+Candidates must share the listing type and be available; ``argpartition``
+then picks the top k without sorting the whole table.
+
+Rows are stored in id order with spare capacity, so a new listing is an
+append and an edit rewrites one row. This worker's inserts, updates and
+deletes are applied when their transaction commits; a full rebuild every
+``SIMILAR_REBUILD_INTERVAL`` seconds picks up other workers' writes.
+"""
+import asyncio
+import math
+import os
+import threading
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from loguru import logger
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+
+from app.configs.db_config import new_mysql_session
+from app.models.realty import Property
+
+SIMILAR_REBUILD_INTERVAL = float(os.getenv("SIMILAR_REBUILD_INTERVAL", "300"))
+# Relative weight of each feature in the distance
+SIMILAR_WEIGHTS = os.getenv("SIMILAR_WEIGHTS", "location=3,property_type=2,furnishing=1,price=2")
+
+_PROPERTY_TYPES = list(Property.__table__.c.property_type.type.enums)
+_FURNISHINGS = list(Property.__table__.c.furnishing.type.enums)
+_LISTING_TYPES = list(Property.__table__.c.listing_type.type.enums)
+_PRICE_COLUMNS = ["private_price", "single_price", "double_price", "triple_price"]
+_FEATURE_COLUMNS = ["id", "location", "property_type", "furnishing", "listing_type", "is_available", *_PRICE_COLUMNS]
+_DIMENSIONS = len(_PROPERTY_TYPES) + len(_FURNISHINGS) + 1
+# Each stored row carries its squared norm in an extra last column
+_NORM = _DIMENSIONS
+
+
+def parse_weights(spec: str) -> Dict[str, float]:
+    weights = {"location": 3.0, "property_type": 2.0, "furnishing": 1.0, "price": 2.0}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, value = item.partition("=")
+        weights[name.strip()] = float(value)
+    return weights
+
+
+def _price(row: dict) -> float:
+    # The cheapest way to live there; NaN when no price is set
+    prices = [float(row[column]) for column in _PRICE_COLUMNS if row.get(column) is not None]
+    return math.log1p(min(prices)) if prices else math.nan
+
+
+_ARRAYS = ("ids", "features", "location", "listing_type", "active")
+
+
+def _listing_code(row: dict) -> int:
+    listing_type = row.get("listing_type")
+    return _LISTING_TYPES.index(listing_type) if listing_type in _LISTING_TYPES else -1
+
+
+class SimilarityIndex:
+    """Feature matrix of every property, queried for the k nearest listings."""
+
+    def __init__(self, weights: Optional[Dict[str, float]] = None):
+        self.weights = weights or parse_weights(SIMILAR_WEIGHTS)
+        self._locations: Dict[str, int] = {}
+        self._price_center = 0.0
+        self._price_scale = 1.0
+        self._lock = threading.Lock()
+        self._allocate(0)
+        self.loaded = False
+
+    def _allocate(self, capacity: int) -> None:
+        self.size = 0
+        self.ids = np.zeros(capacity, dtype=np.int64)
+        self.features = np.zeros((capacity, _DIMENSIONS + 1), dtype=np.float32)
+        self.location = np.zeros(capacity, dtype=np.int32)
+        self.listing_type = np.zeros(capacity, dtype=np.int8)
+        self.active = np.zeros(capacity, dtype=bool)
+
+    def _grow(self, needed: int) -> None:
+        capacity = max(needed, 2 * len(self.ids), 1024)
+        for name in _ARRAYS:
+            old = getattr(self, name)
+            new = np.zeros((capacity, *old.shape[1:]), dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, name, new)
+
+    def _location_code(self, location: Optional[str]) -> int:
+        key = (location or "").strip().lower()
+        return self._locations.setdefault(key, len(self._locations))
+
+    def _encode(self, row: dict) -> np.ndarray:
+        vector = np.zeros(_DIMENSIONS, dtype=np.float32)
+        offset = 0
+        for column, values in (("property_type", _PROPERTY_TYPES), ("furnishing", _FURNISHINGS)):
+            if row.get(column) in values:
+                vector[offset + values.index(row[column])] = math.sqrt(self.weights[column] / 2)
+            offset += len(values)
+        price = _price(row)
+        if not math.isnan(price):
+            vector[offset] = math.sqrt(self.weights["price"]) * (price - self._price_center) / self._price_scale
+        return vector
+
+    def _write(self, position: int, row: dict) -> None:
+        self.ids[position] = row["id"]
+        vector = self._encode(row)
+        self.features[position, :_NORM] = vector
+        self.features[position, _NORM] = vector @ vector
+        self.location[position] = self._location_code(row.get("location"))
+        self.listing_type[position] = _listing_code(row)
+        self.active[position] = row.get("is_available") is not False
+
+    def _position(self, property_id: int) -> Optional[int]:
+        position = int(np.searchsorted(self.ids[:self.size], property_id))
+        if position < self.size and self.ids[position] == property_id:
+            return position
+        return None
+
+    def rebuild(self, rows: Sequence[dict]) -> None:
+        """Replace the index with ``rows``, re-centering the price scale on them (vectorized per column)."""
+        rows = sorted(rows, key=lambda row: row["id"])
+        n = len(rows)
+        prices = np.array(
+            [[np.inf if row.get(column) is None else float(row[column]) for column in _PRICE_COLUMNS] for row in rows],
+            dtype=np.float64,
+        ).reshape(n, len(_PRICE_COLUMNS)).min(axis=1)
+        prices = np.where(np.isinf(prices), np.nan, np.log1p(np.where(np.isinf(prices), 0, prices)))
+        known = prices[~np.isnan(prices)]
+        locations: Dict[str, int] = {}
+        location_codes = [locations.setdefault((row.get("location") or "").strip().lower(), len(locations)) for row in rows]
+
+        with self._lock:
+            self._price_center = float(np.median(known)) if len(known) else 0.0
+            self._price_scale = (float(known.std()) if len(known) else 0.0) or 1.0
+            self._locations = locations
+            self._allocate(n)
+            positions = np.arange(n)
+            offset = 0
+            for column, values in (("property_type", _PROPERTY_TYPES), ("furnishing", _FURNISHINGS)):
+                codes = np.array([values.index(row[column]) if row.get(column) in values else -1 for row in rows])
+                known_code = codes >= 0
+                self.features[positions[known_code], offset + codes[known_code]] = math.sqrt(self.weights[column] / 2)
+                offset += len(values)
+            scaled = math.sqrt(self.weights["price"]) * (prices - self._price_center) / self._price_scale
+            self.features[:, offset] = np.nan_to_num(scaled, nan=0.0)
+            vectors = self.features[:, :_NORM]
+            self.features[:, _NORM] = np.einsum("ij,ij->i", vectors, vectors)
+            self.ids[:] = [row["id"] for row in rows]
+            self.location[:] = location_codes
+            self.listing_type[:] = [_listing_code(row) for row in rows]
+            self.active[:] = [row.get("is_available") is not False for row in rows]
+            self.size = n
+            self.loaded = True
+
+    def upsert(self, row: dict) -> None:
+        """Add or rewrite one property's row."""
+        with self._lock:
+            position = self._position(row["id"])
+            if position is None:
+                if self.size == len(self.ids):
+                    self._grow(self.size + 1)
+                position = self.size
+                self.size += 1
+                self._write(position, row)
+                # Ids normally only grow; keep the arrays sorted if one does not
+                if position and self.ids[position - 1] > row["id"]:
+                    order = np.argsort(self.ids[:self.size], kind="stable")
+                    for name in _ARRAYS:
+                        # New arrays, so queries holding views of the old ones stay consistent
+                        array = getattr(self, name)
+                        reordered = np.zeros_like(array)
+                        reordered[:self.size] = array[:self.size][order]
+                        setattr(self, name, reordered)
+            else:
+                self._write(position, row)
+
+    def remove(self, property_id: int) -> None:
+        with self._lock:
+            position = self._position(property_id)
+            if position is not None:
+                self.active[position] = False
+
+    def similar(self, property_id: int, k: int = 10, row: Optional[dict] = None) -> Optional[List[int]]:
+        """
+        Ids of the ``k`` properties most like ``property_id``, best first.
+
+        ``row`` describes the property when it is not in the index; returns
+        None if neither is available.
+        """
+        with self._lock:
+            size = self.size
+            position = self._position(property_id)
+            if position is not None:
+                vector = self.features[position, :_NORM].copy()
+                location, listing_type = self.location[position], self.listing_type[position]
+            elif row is not None:
+                vector = self._encode(row)
+                location = self._locations.get((row.get("location") or "").strip().lower(), -1)
+                listing_type = _listing_code(row)
+            else:
+                return None
+            # Views of the live arrays; upserts only rewrite single rows or swap in new arrays
+            features, locations, ids = self.features[:size], self.location[:size], self.ids[:size]
+            eligible = self.active[:size] & (self.listing_type[:size] == listing_type)
+
+        # Negative squared distance without the constant |f|^2: one product
+        # with [2f, -1] against rows stored as [F, |F|^2] gives 2 F.f - |F|^2
+        query = np.append(2 * vector, np.float32(-1))
+        if position is not None:
+            eligible[position] = False
+        candidates = np.flatnonzero(eligible)
+        k = min(k, len(candidates))
+        if k == 0:
+            return []
+        # Score every row, then gather: gathering the rows first costs more than the product
+        scores = (features @ query)[candidates]
+        scores -= np.float32(self.weights["location"]) * (locations[candidates] != location)
+        top = np.argpartition(scores, len(scores) - k)[len(scores) - k:]
+        # Best first, equal scores by id
+        top = top[np.lexsort((candidates[top], -scores[top]))]
+        return ids[candidates[top]].tolist()
+
+    def __len__(self) -> int:
+        return int(self.active[:self.size].sum())
+
+
+def load_rows(db) -> List[dict]:
+    columns = [getattr(Property, column) for column in _FEATURE_COLUMNS]
+    return [dict(row) for row in db.execute(select(*columns)).mappings()]
+
+
+class SimilarService:
+    """The worker's index, its periodic rebuild, and ORM hooks that keep it current between rebuilds."""
+
+    def __init__(self, interval: float = SIMILAR_REBUILD_INTERVAL):
+        self.index = SimilarityIndex()
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def rebuild(self, db) -> None:
+        rows = load_rows(db)
+        db.rollback()
+        self.index.rebuild(rows)
+        logger.info(f"Similarity index rebuilt with {len(rows)} properties")
+
+    def ensure_loaded(self, db) -> None:
+        if not self.index.loaded:
+            self.rebuild(db)
+
+    def _rebuild_once(self) -> None:
+        db = new_mysql_session()
+        try:
+            self.rebuild(db)
+        finally:
+            db.close()
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await asyncio.to_thread(self._rebuild_once)
+            except Exception as e:
+                logger.error(f"Similarity index rebuild failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+similar_properties = SimilarService()
+
+
+# Rows are captured at flush, while the attributes are loaded, and applied on commit
+def _stage(mapper, connection, target) -> None:
+    session = Session.object_session(target)
+    if session is not None:
+        # Only what is loaded: touching an expired attribute here would query mid-flush
+        loaded = inspect(target).dict
+        row = {column: loaded.get(column) for column in _FEATURE_COLUMNS}
+        session.info.setdefault("similar_upserts", {})[target.id] = row
+
+
+def _stage_delete(mapper, connection, target) -> None:
+    session = Session.object_session(target)
+    if session is not None:
+        session.info.setdefault("similar_upserts", {})[target.id] = None
+
+
+event.listen(Property, "after_insert", _stage)
+event.listen(Property, "after_update", _stage)
+event.listen(Property, "after_delete", _stage_delete)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_after_commit(session: Session) -> None:
+    staged = session.info.pop("similar_upserts", None)
+    if not staged or not similar_properties.index.loaded:
+        return
+    for property_id, row in staged.items():
+        if row is None:
+            similar_properties.index.remove(property_id)
+        else:
+            similar_properties.index.upsert(row)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session) -> None:
+    session.info.pop("similar_upserts", None)
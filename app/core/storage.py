@@ -0,0 +1,102 @@
+"""Content-addressed storage for uploaded property images and their variants."""
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+from starlette.staticfiles import StaticFiles
+
+MEDIA_ROOT = os.getenv("MEDIA_ROOT", "media")
+MEDIA_URL = os.getenv("MEDIA_URL", "/media").rstrip("/")
+# Serve MEDIA_ROOT from the API; turn off when a CDN or web server serves it
+MEDIA_SERVE = os.getenv("MEDIA_SERVE", "true").lower() == "true"
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class Storage:
+    """
+    Blob store addressed by content hash.
+
+    Keys look like ``ab/cd/abcd...ef.webp``: the same bytes always map to the
+    same key, so re-uploading an image stores nothing new. An object-storage
+    backend only has to implement these methods.
+    """
+
+    def save(self, data: bytes, extension: str, digest: Optional[str] = None) -> str:
+        raise NotImplementedError
+
+    def open(self, key: str) -> bytes:
+        raise NotImplementedError
+
+    def exists(self, key: str) -> bool:
+        raise NotImplementedError
+
+    def url(self, key: str) -> str:
+        raise NotImplementedError
+
+    @staticmethod
+    def key_for(digest: str, extension: str) -> str:
+        return f"{digest[:2]}/{digest[2:4]}/{digest}.{extension.lstrip('.').lower()}"
+
+
+class LocalStorage(Storage):
+    """Stores blobs under a local directory served at ``base_url``."""
+
+    def __init__(self, root: str = MEDIA_ROOT, base_url: str = MEDIA_URL):
+        self.root = Path(root)
+        self.base_url = base_url.rstrip("/")
+
+    def save(self, data: bytes, extension: str, digest: Optional[str] = None) -> str:
+        key = self.key_for(digest or content_hash(data), extension)
+        path = self.root / key
+        if path.exists():
+            return key
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temp file and rename so readers never see a partial blob
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".upload-")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        return key
+
+    def open(self, key: str) -> bytes:
+        return (self.root / key).read_bytes()
+
+    def exists(self, key: str) -> bool:
+        return (self.root / key).exists()
+
+    def url(self, key: str) -> str:
+        return f"{self.base_url}/{key}"
+
+    def key_from_url(self, url: str) -> Optional[str]:
+        prefix = f"{self.base_url}/"
+        return url[len(prefix):] if url.startswith(prefix) else None
+
+
+_storage: Optional[LocalStorage] = None
+
+
+def get_storage() -> LocalStorage:
+    global _storage
+    if _storage is None:
+        _storage = LocalStorage()
+    return _storage
+
+
+class ImmutableStaticFiles(StaticFiles):
+    """Static files whose names are content hashes, so browsers may cache them forever."""
+
+    async def get_response(self, path, scope):
+        response = await super().get_response(path, scope)
+        if response.status_code == 200:
+            response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        return response
@@ -0,0 +1,326 @@
+"""
+Typeahead over property locations and names, served from memory.
+
+Every location and property name is normalized into one or more search keys
+(the whole text, then each later word onward, so "layout" finds "HSR Layout")
+kept in sorted arrays. A keystroke is a binary search for the prefix plus a
+ranking of the matching terms by listing count.
+
+Normalization lowercases, strips accents and punctuation, drops spaces, and
+folds common transliteration variants (doubled letters, "ee"/"i", "oo"/"u",
+aspirated consonants, "w"/"v", "y"/"i", "ie"/"ei") the same way on both sides,
+so "Munne" finds "Munnekollal" and "whitefeild" finds "Whitefield". Whole-word
+misspellings that no rule covers go in ``SUGGEST_ALIASES``.
+
+Writes made through the ORM in this worker adjust the counts when their
+transaction commits; a full rebuild every ``SUGGEST_REBUILD_INTERVAL`` seconds
+picks up writes made by other workers.
+"""
+import asyncio
+import bisect
+import functools
+import heapq
+import os
+import re
+import threading
+import unicodedata
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from loguru import logger
+from sqlalchemy import event, func, inspect, select
+from sqlalchemy.orm import Session
+
+from app.configs.db_config import new_mysql_session
+from app.models.realty import Property
+
+SUGGEST_REBUILD_INTERVAL = float(os.getenv("SUGGEST_REBUILD_INTERVAL", "300"))
+# Extra whole-word corrections, "kormangala=koramangala;ecity=electronic city"
+SUGGEST_ALIASES = os.getenv("SUGGEST_ALIASES", "")
+# Distinct (prefix, limit) results kept between index changes
+SUGGEST_CACHE_SIZE = int(os.getenv("SUGGEST_CACHE_SIZE", "10000"))
+
+_DEFAULT_ALIASES = {
+    "kormangala": "koramangala",
+    "koramangla": "koramangala",
+    "marathalli": "marathahalli",
+    "marthahalli": "marathahalli",
+    "bellendur": "bellandur",
+    "ecity": "electronic city",
+    "bannerghata": "bannerghatta",
+    "jp": "jayaprakash",
+}
+
+# Applied in order, to indexed text and typed prefixes alike
+_FOLDS = [
+    (re.compile(r"ee"), "i"),
+    (re.compile(r"oo"), "u"),
+    (re.compile(r"([bcdgkpt])h"), r"\1"),
+    (re.compile(r"ie|ei"), "i"),
+    (re.compile(r"w"), "v"),
+    (re.compile(r"y"), "i"),
+    (re.compile(r"(.)\1+"), r"\1"),
+]
+
+Term = Tuple[str, str]  # (kind, display text)
+
+
+def _parse_aliases(spec: str) -> Dict[str, str]:
+    aliases = dict(_DEFAULT_ALIASES)
+    for item in filter(None, (part.strip() for part in spec.split(";"))):
+        wrong, _, right = item.partition("=")
+        aliases[wrong.strip().lower()] = right.strip().lower()
+    return aliases
+
+
+_aliases = _parse_aliases(SUGGEST_ALIASES)
+
+
+def _words(text: str) -> List[str]:
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode().lower()
+    words = []
+    for word in re.sub(r"[^a-z0-9]+", " ", text).split():
+        words.extend(_aliases.get(word, word).split())
+    return words
+
+
+@functools.lru_cache(maxsize=65536)
+def _fold(word: str) -> str:
+    for pattern, replacement in _FOLDS:
+        word = pattern.sub(replacement, word)
+    return word
+
+
+def normalize(text: str) -> str:
+    """Search form of ``text``: folded words with the spaces removed."""
+    return "".join(_fold(word) for word in _words(text))
+
+
+def search_keys(text: str) -> List[str]:
+    """Keys ``text`` is found under: the whole text and every suffix starting at a word."""
+    folded = [_fold(word) for word in _words(text)]
+    return list(dict.fromkeys("".join(folded[i:]) for i in range(len(folded)) if folded[i]))
+
+
+class _SortedKeys:
+    """Parallel sorted arrays of search keys and the terms they belong to."""
+    __slots__ = ("keys", "terms")
+
+    def __init__(self, entries: List[Tuple[str, Term]] = ()):
+        self.keys = [key for key, _ in entries]
+        self.terms = [term for _, term in entries]
+
+    def insert(self, term: Term) -> None:
+        for key in search_keys(term[1]):
+            position = bisect.bisect_right(self.keys, key)
+            self.keys.insert(position, key)
+            self.terms.insert(position, term)
+
+    def remove(self, term: Term) -> None:
+        for key in search_keys(term[1]):
+            position = bisect.bisect_left(self.keys, key)
+            while self.terms[position] != term:
+                position += 1
+            del self.keys[position], self.terms[position]
+
+    def span(self, prefix: str) -> Tuple[int, int]:
+        start = bisect.bisect_left(self.keys, prefix)
+        return start, bisect.bisect_left(self.keys, prefix + "\x7f", start)
+
+
+class SuggestIndex:
+    """
+    Sorted-array prefix index of terms, ranked by listing count, then alphabetically.
+
+    Terms used by one listing (most property names) are kept apart from the
+    rest. They rank in key order, so the first matches in their array are the
+    answer and a one-letter prefix never has to rank all of them.
+    """
+
+    def __init__(self):
+        self._counts: Counter = Counter()
+        self._popular = _SortedKeys()
+        self._single = _SortedKeys()
+        self._cache: Dict[Tuple[str, int], List[dict]] = {}
+        self._lock = threading.Lock()
+        self.loaded = False
+
+    def rebuild(self, counts: Dict[Term, int]) -> None:
+        """Replace the whole index with ``counts``."""
+        counts = Counter({term: count for term, count in counts.items() if count > 0})
+        popular = sorted((key, term) for term, count in counts.items() if count > 1 for key in search_keys(term[1]))
+        single = sorted((key, term) for term, count in counts.items() if count == 1 for key in search_keys(term[1]))
+        with self._lock:
+            self._counts = counts
+            self._popular = _SortedKeys(popular)
+            self._single = _SortedKeys(single)
+            self._cache.clear()
+            self.loaded = True
+
+    def _tier(self, count: int) -> Optional[_SortedKeys]:
+        if count <= 0:
+            return None
+        return self._single if count == 1 else self._popular
+
+    def apply(self, deltas: Dict[Term, int]) -> None:
+        """Adjust listing counts, moving terms between arrays when they enter, leave or change tier."""
+        with self._lock:
+            for term, delta in deltas.items():
+                if not delta:
+                    continue
+                before = self._counts[term]
+                after = max(0, before + delta)
+                if after:
+                    self._counts[term] = after
+                else:
+                    self._counts.pop(term, None)
+                old_tier, new_tier = self._tier(before), self._tier(after)
+                if old_tier is not new_tier:
+                    if old_tier is not None:
+                        old_tier.remove(term)
+                    if new_tier is not None:
+                        new_tier.insert(term)
+            self._cache.clear()
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[dict]:
+        """Terms with a key starting with ``prefix`` (normalized), most listings first."""
+        key = normalize(prefix)
+        if not key:
+            return []
+        with self._lock:
+            cached = self._cache.get((key, limit))
+            if cached is not None:
+                return cached
+            start, end = self._popular.span(key)
+            best = heapq.nsmallest(
+                limit, set(self._popular.terms[start:end]),
+                key=lambda term: (-self._counts[term], normalize(term[1]), term),
+            )
+            if len(best) < limit:
+                start, end = self._single.span(key)
+                # Index walk rather than a slice: the span may hold every property
+                for position in range(start, end):
+                    term = self._single.terms[position]
+                    if term not in best:
+                        best.append(term)
+                        if len(best) == limit:
+                            break
+            results = [{"text": text, "kind": kind, "listing_count": self._counts[(kind, text)]} for kind, text in best]
+            if len(self._cache) >= SUGGEST_CACHE_SIZE:
+                self._cache.clear()
+            self._cache[(key, limit)] = results
+            return results
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+
+def load_counts(db) -> Dict[Term, int]:
+    """Listing count per location and per property name."""
+    counts: Dict[Term, int] = {}
+    for kind, column in (("location", Property.location), ("property", Property.property_name)):
+        for text, count in db.execute(select(column, func.count()).group_by(column)):
+            if text:
+                counts[(kind, text)] = count
+    return counts
+
+
+def _terms_of(location: Optional[str], name: Optional[str]) -> Iterable[Term]:
+    if location:
+        yield ("location", location)
+    if name:
+        yield ("property", name)
+
+
+class SuggestService:
+    """The worker's index, its periodic rebuild, and ORM hooks that keep it current between rebuilds."""
+
+    def __init__(self, interval: float = SUGGEST_REBUILD_INTERVAL):
+        self.index = SuggestIndex()
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def rebuild(self, db) -> None:
+        counts = load_counts(db)
+        self.index.rebuild(counts)
+        logger.info(f"Suggest index rebuilt with {len(counts)} terms")
+
+    def ensure_loaded(self, db) -> None:
+        if not self.index.loaded:
+            self.rebuild(db)
+
+    def _rebuild_once(self) -> None:
+        db = new_mysql_session()
+        try:
+            self.rebuild(db)
+        finally:
+            db.close()
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await asyncio.to_thread(self._rebuild_once)
+            except Exception as e:
+                logger.error(f"Suggest index rebuild failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+location_suggest = SuggestService()
+
+
+# Count changes are staged per session at flush and applied only on commit
+def _stage(session: Optional[Session], deltas: Iterable[Tuple[Term, int]]) -> None:
+    if session is None:
+        return
+    staged = session.info.setdefault("suggest_deltas", Counter())
+    for term, delta in deltas:
+        staged[term] += delta
+
+
+def _after_insert(mapper, connection, target) -> None:
+    _stage(Session.object_session(target), ((term, 1) for term in _terms_of(target.location, target.property_name)))
+
+
+def _after_delete(mapper, connection, target) -> None:
+    _stage(Session.object_session(target), ((term, -1) for term in _terms_of(target.location, target.property_name)))
+
+
+def _after_update(mapper, connection, target) -> None:
+    state = inspect(target)
+    deltas = []
+    for kind, attr in (("location", "location"), ("property", "property_name")):
+        history = state.attrs[attr].history
+        if history.has_changes():
+            deltas += [((kind, old), -1) for old in history.deleted if old]
+            deltas += [((kind, new), 1) for new in history.added if new]
+    _stage(Session.object_session(target), deltas)
+
+
+event.listen(Property, "after_insert", _after_insert)
+event.listen(Property, "after_delete", _after_delete)
+event.listen(Property, "after_update", _after_update)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_after_commit(session: Session) -> None:
+    deltas = session.info.pop("suggest_deltas", None)
+    if deltas and location_suggest.index.loaded:
+        location_suggest.index.apply(deltas)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session) -> None:
+    session.info.pop("suggest_deltas", None)
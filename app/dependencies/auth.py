@@ -3,6 +3,7 @@ from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError
 from sqlalchemy.orm import Session
 from app.configs.db_config import get_db
+from app.core.auth_cache import cache_payload, cache_user, get_cached_payload, get_cached_user
 from app.core.jwt import decode_access_token
 from app.models.user import User
 
@@ -15,16 +16,27 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
         headers={"WWW-Authenticate": "Bearer"},
     )
     
-    payload = decode_access_token(token)
+    # Tokens verified recently skip signature verification
+    payload = get_cached_payload(token)
     if payload is None:
-        raise credentials_exception
+        payload = decode_access_token(token)
+        if payload is None:
+            raise credentials_exception
+        cache_payload(token, payload)
     
     email: str = payload.get("sub")
     if email is None:
         raise credentials_exception
         
-    user = db.query(User).filter(User.email == email).first()
+    # The session only checks out a connection if the user is not cached
+    user = get_cached_user(db, email)
     if user is None:
+        user = db.query(User).filter(User.email == email).first()
+        if user is None:
+            raise credentials_exception
+        cache_user(user)
+
+    if not user.is_active:
         raise credentials_exception
         
     return user
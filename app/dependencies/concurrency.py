@@ -0,0 +1,151 @@
+"""Per-route concurrency caps and admission control for the sync API routes."""
+import asyncio
+import math
+import os
+import time
+from typing import Dict, Optional
+
+import anyio.to_thread
+from fastapi import Request
+from loguru import logger
+
+from app.configs.db_config import DB_POOL_CAPACITY
+from app.core.exceptions import ServiceUnavailableError
+from app.monitoring.prometheus import (
+    ADMISSION_IN_FLIGHT, ADMISSION_QUEUE_DEPTH, ADMISSION_QUEUE_WAIT, ADMISSION_REJECTED
+)
+
+ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "true").lower() == "true"
+# Threads for sync routes; more threads than DB connections only queue on the pool
+THREADPOOL_SIZE = int(os.getenv("THREADPOOL_SIZE", "0")) or DB_POOL_CAPACITY + 5
+# Concurrent requests per route unless overridden in ROUTE_CONCURRENCY_LIMITS
+ROUTE_CONCURRENCY_DEFAULT = int(os.getenv("ROUTE_CONCURRENCY_DEFAULT", "0")) or DB_POOL_CAPACITY
+# "GET /api/v1/realty/properties=10;POST /api/v1/realty/contacts=2"
+ROUTE_CONCURRENCY_LIMITS = os.getenv("ROUTE_CONCURRENCY_LIMITS", "")
+# Concurrent requests across all routes, so admitted work never queues inside the threadpool
+ADMISSION_GLOBAL_LIMIT = int(os.getenv("ADMISSION_GLOBAL_LIMIT", "0")) or THREADPOOL_SIZE
+# Longest a request may wait for a slot before it is shed with a 503
+ADMISSION_DEADLINE = float(os.getenv("ADMISSION_DEADLINE", "0.5"))
+# Waiters beyond this are shed immediately
+ADMISSION_QUEUE_MAX = int(os.getenv("ADMISSION_QUEUE_MAX", "100"))
+
+
+def parse_limits(spec: str) -> Dict[str, int]:
+    """Parse ``"METHOD /path=N;..."`` into a per-route limit mapping."""
+    limits = {}
+    for item in filter(None, (part.strip() for part in spec.split(";"))):
+        route_id, _, limit = item.rpartition("=")
+        limits[route_id.strip()] = int(limit)
+    return limits
+
+
+_route_limits = parse_limits(ROUTE_CONCURRENCY_LIMITS)
+
+
+def configure_threadpool(size: int = THREADPOOL_SIZE) -> None:
+    """Resize the anyio threadpool that runs sync endpoints (call from the running loop)."""
+    anyio.to_thread.current_default_thread_limiter().total_tokens = size
+    logger.info(f"Threadpool limited to {size} threads (DB pool capacity {DB_POOL_CAPACITY})")
+
+
+class _Gate:
+    """Semaphore and waiter count for one route (or all of them), bound to the loop that created it."""
+    __slots__ = ("semaphore", "waiting", "loop", "scope")
+
+    def __init__(self, limit: int, scope: str = "route"):
+        self.semaphore = asyncio.Semaphore(limit)
+        self.waiting = 0
+        self.loop = asyncio.get_running_loop()
+        self.scope = scope
+
+    async def acquire(self, timeout: float) -> None:
+        self.waiting += 1
+        try:
+            if not self.semaphore.locked():
+                await self.semaphore.acquire()
+            else:
+                await asyncio.wait_for(self.semaphore.acquire(), timeout=max(0.0, timeout))
+        finally:
+            self.waiting -= 1
+
+
+_global_gate: Optional[_Gate] = None
+
+
+def _get_global_gate() -> _Gate:
+    """The gate every route shares; one per worker process and event loop."""
+    global _global_gate
+    if _global_gate is None or _global_gate.loop is not asyncio.get_running_loop():
+        _global_gate = _Gate(ADMISSION_GLOBAL_LIMIT, scope="global")
+    return _global_gate
+
+
+class ConcurrencyLimiter:
+    """
+    FastAPI dependency capping how many requests per route run at once.
+
+    Requests beyond the cap wait up to ``deadline`` seconds for a slot and are
+    then rejected with 503 and Retry-After, so an overloaded worker answers
+    quickly instead of letting every request's latency climb. On top of its
+    route's cap, every request needs one of ``ADMISSION_GLOBAL_LIMIT`` slots
+    shared by all routes (``THREADPOOL_SIZE`` by default). The threadpool
+    itself therefore never queues, and the wait measured here is the whole
+    queueing delay.
+    """
+
+    def __init__(self, limit: Optional[int] = None, deadline: float = ADMISSION_DEADLINE):
+        self.limit = limit
+        self.deadline = deadline
+        self._gates: Dict[str, _Gate] = {}
+
+    async def __call__(self, request: Request):
+        if not ADMISSION_ENABLED:
+            yield
+            return
+        route = request.scope.get("route")
+        route_id = f"{request.method} {getattr(route, 'path', request.url.path)}"
+        # Always taken in this order, so two requests never hold each other's next slot
+        gates = (self._gate(route_id), _get_global_gate())
+
+        for gate in gates:
+            if gate.waiting >= ADMISSION_QUEUE_MAX:
+                ADMISSION_REJECTED.labels(route=route_id, reason=self._reason(gate, "queue_full")).inc()
+                raise ServiceUnavailableError(retry_after=self._retry_after())
+
+        ADMISSION_QUEUE_DEPTH.labels(route=route_id).inc()
+        start = time.perf_counter()
+        held = []
+        try:
+            for gate in gates:
+                await gate.acquire(self.deadline - (time.perf_counter() - start))
+                held.append(gate)
+        except asyncio.TimeoutError:
+            for gate in held:
+                gate.semaphore.release()
+            ADMISSION_REJECTED.labels(route=route_id, reason=self._reason(gate, "deadline")).inc()
+            raise ServiceUnavailableError(retry_after=self._retry_after())
+        finally:
+            ADMISSION_QUEUE_DEPTH.labels(route=route_id).dec()
+            ADMISSION_QUEUE_WAIT.labels(route=route_id).observe(time.perf_counter() - start)
+
+        ADMISSION_IN_FLIGHT.labels(route=route_id).inc()
+        try:
+            yield
+        finally:
+            for gate in gates:
+                gate.semaphore.release()
+            ADMISSION_IN_FLIGHT.labels(route=route_id).dec()
+
+    def _gate(self, route_id: str) -> _Gate:
+        gate = self._gates.get(route_id)
+        if gate is None or gate.loop is not asyncio.get_running_loop():
+            limit = self.limit or _route_limits.get(route_id) or ROUTE_CONCURRENCY_DEFAULT
+            gate = self._gates[route_id] = _Gate(limit)
+        return gate
+
+    @staticmethod
+    def _reason(gate: _Gate, reason: str) -> str:
+        return reason if gate.scope == "route" else f"{gate.scope}_{reason}"
+
+    def _retry_after(self) -> int:
+        return max(1, math.ceil(self.deadline))
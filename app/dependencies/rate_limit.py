@@ -0,0 +1,187 @@
+"""Redis-backed token-bucket rate limiting shared by every API worker."""
+import hashlib
+import math
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from fastapi import Request
+from loguru import logger
+
+from app.configs.redis_config import get_async_redis_client
+from app.core.exceptions import RateLimitExceededError
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+RATE_LIMIT_DEFAULT = os.getenv("RATE_LIMIT_DEFAULT", "120/minute")
+# "GET /api/v1/realty/properties=300/minute;POST /api/v1/realty/contacts=10/minute"
+RATE_LIMIT_ROUTE_QUOTAS = os.getenv("RATE_LIMIT_ROUTE_QUOTAS", "")
+# "partner-key-1=6000/minute;partner-key-2=600/minute"
+RATE_LIMIT_API_KEY_QUOTAS = os.getenv("RATE_LIMIT_API_KEY_QUOTAS", "")
+RATE_LIMIT_API_KEY_HEADER = os.getenv("RATE_LIMIT_API_KEY_HEADER", "X-API-Key")
+# Keys seeing at least this many requests per second in one worker lease tokens in batches
+RATE_LIMIT_HOT_THRESHOLD = int(os.getenv("RATE_LIMIT_HOT_THRESHOLD", "5"))
+RATE_LIMIT_LEASE_SIZE = int(os.getenv("RATE_LIMIT_LEASE_SIZE", "10"))
+RATE_LIMIT_LEASE_TTL = float(os.getenv("RATE_LIMIT_LEASE_TTL", "1.0"))
+RATE_LIMIT_LOCAL_KEYS = int(os.getenv("RATE_LIMIT_LOCAL_KEYS", "10000"))
+RATE_LIMIT_REDIS_BACKOFF = float(os.getenv("RATE_LIMIT_REDIS_BACKOFF", "5.0"))
+
+_PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+# Takes up to ARGV[3] tokens from the bucket in a single round trip. Uses the
+# Redis clock so workers with skewed clocks still share one refill timeline.
+TOKEN_BUCKET_LUA = """
+local capacity = tonumber(ARGV[1])
+local refill_per_ms = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) * 1000 + math.floor(tonumber(clock[2]) / 1000)
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * refill_per_ms)
+local granted = 0
+if tokens >= 1 then
+    granted = math.min(requested, math.floor(tokens))
+    tokens = tokens - granted
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / refill_per_ms) + 1000)
+local retry_ms = 0
+if granted == 0 then
+    retry_ms = math.ceil((1 - tokens) / refill_per_ms)
+end
+return {granted, retry_ms}
+"""
+
+_token_bucket = None
+
+
+def _get_token_bucket_script():
+    """Register the script against the current client (clients are rebuilt after a fork)."""
+    global _token_bucket
+    client = get_async_redis_client()
+    if _token_bucket is None or _token_bucket.registered_client is not client:
+        _token_bucket = client.register_script(TOKEN_BUCKET_LUA)
+    return _token_bucket
+
+
+def parse_rate(rate: str) -> Tuple[int, int]:
+    """Parse ``"<count>/<second|minute|hour|day>"`` into ``(count, period_seconds)``."""
+    count, _, period = rate.strip().partition("/")
+    period = period.strip().rstrip("s")
+    if period not in _PERIODS or not count.strip().isdigit():
+        raise ValueError(f"Invalid rate limit '{rate}'")
+    return int(count), _PERIODS[period]
+
+
+def parse_quotas(spec: str) -> Dict[str, Tuple[int, int]]:
+    """Parse ``"name=rate;name=rate"`` into a quota mapping."""
+    quotas = {}
+    for item in filter(None, (part.strip() for part in spec.split(";"))):
+        name, _, rate = item.rpartition("=")
+        quotas[name.strip()] = parse_rate(rate)
+    return quotas
+
+
+_route_quotas = parse_quotas(RATE_LIMIT_ROUTE_QUOTAS)
+_api_key_quotas = parse_quotas(RATE_LIMIT_API_KEY_QUOTAS)
+
+
+class _LocalLease:
+    """Tokens taken from Redis in advance for a hot key, plus its recent hit rate."""
+    __slots__ = ("tokens", "expires_at", "window_start", "hits")
+
+    def __init__(self):
+        self.tokens = 0
+        self.expires_at = 0.0
+        self.window_start = 0.0
+        self.hits = 0
+
+
+class RateLimiter:
+    """
+    FastAPI dependency enforcing a shared token bucket per client and route.
+
+    Clients sending a configured API key are limited by that key's quota,
+    everyone else by remote address. Without an explicit ``rate`` the quota
+    is looked up per route in ``RATE_LIMIT_ROUTE_QUOTAS`` and falls back to
+    ``RATE_LIMIT_DEFAULT``, so one instance can guard a whole router.
+    """
+
+    def __init__(self, rate: Optional[str] = None, scope: Optional[str] = None):
+        self.quota = parse_rate(rate) if rate else None
+        self.scope = scope
+        self._leases: "OrderedDict[str, _LocalLease]" = OrderedDict()
+        self._redis_down_until = 0.0
+
+    async def __call__(self, request: Request) -> None:
+        if not RATE_LIMIT_ENABLED:
+            return
+        scope, route_quota = self._resolve_route(request)
+        identity, quota = self._resolve_identity(request, route_quota)
+        key = f"ratelimit:{scope}:{identity}"
+
+        retry_after = await self._acquire(key, quota)
+        if retry_after:
+            raise RateLimitExceededError(retry_after)
+
+    def _resolve_route(self, request: Request) -> Tuple[str, Tuple[int, int]]:
+        route = request.scope.get("route")
+        route_id = f"{request.method} {getattr(route, 'path', request.url.path)}"
+        quota = self.quota or _route_quotas.get(route_id) or parse_rate(RATE_LIMIT_DEFAULT)
+        return self.scope or route_id, quota
+
+    def _resolve_identity(self, request: Request, route_quota: Tuple[int, int]) -> Tuple[str, Tuple[int, int]]:
+        api_key = request.headers.get(RATE_LIMIT_API_KEY_HEADER)
+        if api_key and api_key in _api_key_quotas:
+            digest = hashlib.sha256(api_key.encode()).hexdigest()[:16]
+            return f"key:{digest}", _api_key_quotas[api_key]
+        client_host = request.client.host if request.client else "unknown"
+        return f"ip:{client_host}", route_quota
+
+    async def _acquire(self, key: str, quota: Tuple[int, int]) -> int:
+        """Take one token for ``key``; return 0 when admitted, else seconds to wait."""
+        now = time.monotonic()
+        lease = self._lease_for(key, now)
+        if lease.tokens > 0 and lease.expires_at > now:
+            lease.tokens -= 1
+            return 0
+
+        if now < self._redis_down_until:
+            return 0
+
+        from redis.exceptions import RedisError  # deferred: importing redis is slow at startup
+
+        count, period = quota
+        hot = lease.hits >= RATE_LIMIT_HOT_THRESHOLD
+        requested = min(RATE_LIMIT_LEASE_SIZE, count) if hot else 1
+        try:
+            granted, retry_ms = await _get_token_bucket_script()(
+                keys=[key], args=[count, count / (period * 1000), requested]
+            )
+        except RedisError as e:
+            # Fail open: an unavailable limiter must not take the API down with it
+            logger.warning(f"Rate limiter unavailable, admitting requests: {e}")
+            self._redis_down_until = now + RATE_LIMIT_REDIS_BACKOFF
+            return 0
+
+        if not granted:
+            return max(1, math.ceil(int(retry_ms) / 1000))
+        lease.tokens = int(granted) - 1
+        lease.expires_at = now + RATE_LIMIT_LEASE_TTL
+        return 0
+
+    def _lease_for(self, key: str, now: float) -> _LocalLease:
+        lease = self._leases.get(key)
+        if lease is None:
+            lease = self._leases[key] = _LocalLease()
+            if len(self._leases) > RATE_LIMIT_LOCAL_KEYS:
+                self._leases.popitem(last=False)
+        else:
+            self._leases.move_to_end(key)
+        if now - lease.window_start >= 1.0:
+            lease.window_start = now
+            lease.hits = 0
+        lease.hits += 1
+        return lease
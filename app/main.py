@@ -1,56 +1,58 @@
 """FastAPI application for Realty API."""
-from fastapi import FastAPI, Request
+from contextlib import asynccontextmanager
+
+from fastapi import Depends, FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from loguru import logger
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
-from slowapi.errors import RateLimitExceeded
 
 from app.api.realty import realty_router
+from app.configs.db_config import DB_HOST, DB_NAME, DB_PORT, DB_USER, dispose_mysql_engine
+from app.configs.env_config import load_env
+from app.configs.log_config import flush_logger, setup_logger
+from app.configs.redis_config import close_redis_clients
+from app.core.auth_cache import auth_invalidation
+from app.core.catalog import property_catalog
+from app.core.similar import similar_properties
+from app.core.storage import MEDIA_ROOT, MEDIA_SERVE, MEDIA_URL, ImmutableStaticFiles
+from app.core.suggest import location_suggest
+from app.dependencies.concurrency import ConcurrencyLimiter, configure_threadpool
+from app.dependencies.rate_limit import RateLimiter
+from app.middleware.compression import CompressionMiddleware
 from app.middleware.monitoring import PrometheusMiddleware
+from app.middleware.request_id import RequestIDMiddleware
+from app.monitoring.health import health_prober
 from app.monitoring.prometheus import metrics_router
 import os
-import logging
-
-logging.basicConfig(level=logging.INFO)
-
-logging.info("ENV=%s", os.getenv("ENV"))
-logging.info("DB_HOST=%s", os.getenv("DB_HOST"))
-logging.info("DB_PORT=%s", os.getenv("DB_PORT"))
-logging.info("DB_USER=%s", os.getenv("DB_USER"))
-logging.info("DB_NAME=%s", os.getenv("DB_NAME"))
-
-# Initialize rate limiter
-limiter = Limiter(key_func=get_remote_address)
-
-app = FastAPI(
-    title="Realty API",
-    description="API for managing property listings and contacts",
-    version="1.0.0"
-)
-
-app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
-
-# Configure CORS for frontend connection
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=[
-        "http://localhost:3000", 
-        "http://localhost:5173",
-        "https://makemystay.ai",
-        "https://www.makemystay.ai",
-        ],  # In production, replace with specific origins
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-app.add_middleware(PrometheusMiddleware)
-
-
-@app.exception_handler(Exception)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Start background work and release shared clients on shutdown.
+
+    The MySQL engine and Redis pools are not built here: they are created
+    once, on first use, by their accessors in app/configs.
+    """
+    logger.info(f"Starting Realty API (ENV={os.getenv('ENV')}, DB={DB_USER}@{DB_HOST}:{DB_PORT}/{DB_NAME})")
+    configure_threadpool()
+    health_prober.start()
+    auth_invalidation.start()
+    # Price analytics read the catalog even when lists are served from SQL
+    property_catalog.start()
+    location_suggest.start()
+    similar_properties.start()
+    yield
+    await similar_properties.stop()
+    await location_suggest.stop()
+    await property_catalog.stop()
+    await auth_invalidation.stop()
+    await health_prober.stop()
+    await close_redis_clients()
+    dispose_mysql_engine()
+    flush_logger()
+
+
 async def global_exception_handler(request: Request, exc: Exception):
     """Global exception handler for unhandled errors."""
     logger.error(f"Unhandled exception: {exc}")
@@ -63,27 +65,65 @@ async def global_exception_handler(request: Request, exc: Exception):
     )
 
 
-@app.get("/", tags=["Health"])
 async def root():
     """Health check endpoint."""
     return {"status": "healthy", "service": "Realty API"}
 
 
-@app.get("/health", tags=["Health"])
-async def health_check():
-    """Detailed health check endpoint."""
-    return {
-        "status": "healthy",
-        "service": "Realty API",
-        "version": "1.0.0"
-    }
+def create_app() -> FastAPI:
+    """Build the Realty API application."""
+    load_env()
+    setup_logger()
+
+    app = FastAPI(
+        title="Realty API",
+        description="API for managing property listings and contacts",
+        version="1.0.0",
+        lifespan=lifespan
+    )
+
+    # Configure CORS for frontend connection
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=[
+            "http://localhost:3000",
+            "http://localhost:5173",
+            "https://makemystay.ai",
+            "https://www.makemystay.ai",
+            ],  # In production, replace with specific origins
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    app.add_middleware(PrometheusMiddleware)
+    app.add_middleware(CompressionMiddleware)
+    # Added last so it is outermost and every log line of a request carries its ID
+    app.add_middleware(RequestIDMiddleware)
+
+    app.add_exception_handler(Exception, global_exception_handler)
+    app.add_api_route("/", root, methods=["GET"], tags=["Health"])
+
+    # Include routers
+    # Quotas are resolved per route (RATE_LIMIT_ROUTE_QUOTAS) and shared across workers via Redis;
+    # admitted requests then wait for a per-route concurrency slot (ROUTE_CONCURRENCY_LIMITS)
+    app.include_router(
+        realty_router,
+        prefix="/api/v1",
+        dependencies=[Depends(RateLimiter()), Depends(ConcurrencyLimiter())],
+    )
+    app.include_router(metrics_router)
+    if MEDIA_SERVE:
+        # Uploaded images and their variants; file names are content hashes
+        app.mount(MEDIA_URL, ImmutableStaticFiles(directory=MEDIA_ROOT, check_dir=False), name="media")
+
+    return app
 
 
-# Include routers
-app.include_router(realty_router, prefix="/api/v1")
-app.include_router(metrics_router)
+# Module-level instance for `uvicorn app.main:app`; `uvicorn --factory app.main:create_app` also works
+app = create_app()
 
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    uvicorn.run(app, host="0.0.0.0", port=8000)
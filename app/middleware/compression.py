@@ -0,0 +1,62 @@
+import os
+
+from fastapi import Request
+from starlette.datastructures import MutableHeaders
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import Response
+
+from app.utils.compression import COMPRESSION_MIN_SIZE, compress, is_compressible, negotiate_encoding
+
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+# Comma separated path prefixes that are never compressed, e.g. "/api/v1/realty/contacts,/metrics"
+COMPRESSION_EXCLUDED_PATHS = tuple(
+    path.strip() for path in os.getenv("COMPRESSION_EXCLUDED_PATHS", "").split(",") if path.strip()
+)
+
+
+def skip_compression(request: Request) -> None:
+    """Route dependency opting a single endpoint out of response compression."""
+    request.state.skip_compression = True
+
+
+class CompressionMiddleware(BaseHTTPMiddleware):
+    """
+    Compress text responses with brotli or gzip, as negotiated with the client.
+
+    Bodies below ``minimum_size`` are sent as is, and responses that already
+    carry a Content-Encoding or vary on Accept-Encoding (pre-compressed
+    cached pages) pass through untouched.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE, excluded_paths=COMPRESSION_EXCLUDED_PATHS):
+        super().__init__(app)
+        self.minimum_size = minimum_size
+        self.excluded_paths = tuple(excluded_paths)
+
+    async def dispatch(self, request, call_next):
+        response = await call_next(request)
+        if not COMPRESSION_ENABLED or request.method == "HEAD":
+            return response
+        if "content-encoding" in response.headers or not is_compressible(response.headers.get("content-type")):
+            return response
+        # Already negotiated upstream (e.g. a cached page sent uncompressed on purpose)
+        if "accept-encoding" in response.headers.get("vary", "").lower():
+            return response
+        if request.url.path.startswith(self.excluded_paths) or getattr(request.state, "skip_compression", False):
+            return response
+        content_length = response.headers.get("content-length")
+        if content_length is not None and int(content_length) < self.minimum_size:
+            return response
+
+        headers = MutableHeaders(raw=list(response.raw_headers))
+        headers.add_vary_header("Accept-Encoding")
+        encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        if encoding is not None and len(body) >= self.minimum_size:
+            body = compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+        headers["Content-Length"] = str(len(body))
+        compressed = Response(content=body, status_code=response.status_code, background=response.background)
+        # Raw headers keep repeated fields such as Set-Cookie intact
+        compressed.raw_headers = headers.raw
+        return compressed
@@ -0,0 +1,21 @@
+import re
+import uuid
+from loguru import logger
+from starlette.middleware.base import BaseHTTPMiddleware
+
+REQUEST_ID_HEADER = "X-Request-ID"
+_VALID_REQUEST_ID = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+class RequestIDMiddleware(BaseHTTPMiddleware):
+    """Tag every log record emitted while handling a request with its request ID."""
+
+    async def dispatch(self, request, call_next):
+        request_id = request.headers.get(REQUEST_ID_HEADER, "")
+        if not _VALID_REQUEST_ID.match(request_id):
+            request_id = uuid.uuid4().hex
+
+        with logger.contextualize(request_id=request_id):
+            response = await call_next(request)
+
+        response.headers[REQUEST_ID_HEADER] = request_id
+        return response
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, func, Enum, DECIMAL
+from sqlalchemy import BigInteger, Column, Integer, String, Text, DateTime, Boolean, ForeignKey, func, Enum, DECIMAL, Index, JSON
 from sqlalchemy.orm import relationship
 from app.configs.db_config import MySQLBase
 
@@ -6,6 +6,7 @@ from app.configs.db_config import MySQLBase
 class Contact(MySQLBase):
     """Model for contacts table"""
     __tablename__ = "contacts"
+    __table_args__ = (Index("ix_contacts_status", "status"),)
     
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     name_ = Column("name_", String(100), nullable=False)  # Column is 'name_' in DB
@@ -19,12 +20,12 @@ class Contact(MySQLBase):
     )
     created_at = Column(DateTime, server_default=func.now(), nullable=True)
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=True)
+    # Set once maintenance has overwritten the personal data
+    anonymized_at = Column(DateTime, nullable=True)
 
 
-class Property(MySQLBase):
-    """Model for properties table"""
-    __tablename__ = "properties"
-    
+class PropertyColumns:
+    """Columns shared by properties and properties_archive"""
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     property_name = Column(String(150), nullable=False)
     location = Column(String(150), nullable=False)
@@ -48,23 +49,93 @@ class Property(MySQLBase):
         nullable=False
     )
     is_available = Column(Boolean, default=True, nullable=True)
+    # Denormalized from property_images by the image repo functions, so lists can skip that table
+    primary_image_url = Column(String(500), nullable=True)
+    image_count = Column(Integer, default=0, server_default="0", nullable=False)
     created_at = Column(DateTime, server_default=func.now(), nullable=True)
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=True)
+
+
+class Property(PropertyColumns, MySQLBase):
+    """Model for properties table"""
+    __tablename__ = "properties"
+    # Matches the filters of the property list/search endpoint; updated_at serves catalog polling,
+    # (is_available, updated_at) finds archival candidates
+    __table_args__ = (
+        Index("ix_properties_type_listing_available", "property_type", "listing_type", "is_available"),
+        Index("ix_properties_updated_at", "updated_at"),
+        Index("ix_properties_available_updated", "is_available", "updated_at"),
+    )
     
     # Relationship to property images
     images = relationship("PropertyImage", back_populates="property", cascade="all, delete-orphan")
 
 
-class PropertyImage(MySQLBase):
-    """Model for property_images table"""
-    __tablename__ = "property_images"
-    
+class PropertyImageColumns:
+    """Columns shared by property_images and property_images_archive, except the property link"""
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
-    property_id = Column(Integer, ForeignKey('properties.id', ondelete='CASCADE'), nullable=False)
     image_url = Column(String(500), nullable=False)
     is_primary = Column(Boolean, default=False, nullable=False)
     sort_order = Column(Integer, default=0, nullable=False)
+    # Set for uploaded images: sha256 of the original, and {"webp": {"320": url, ...}, ...}
+    content_hash = Column(String(64), nullable=True, index=True)
+    variants = Column(JSON, nullable=True)
     created_at = Column(DateTime, server_default=func.now(), nullable=False)
+
+
+class PropertyImage(PropertyImageColumns, MySQLBase):
+    """Model for property_images table"""
+    __tablename__ = "property_images"
+    # Serves "images of a property in display order" without a filesort
+    __table_args__ = (Index("ix_property_images_property_sort", "property_id", "sort_order"),)
+    
+    property_id = Column(Integer, ForeignKey('properties.id', ondelete='CASCADE'), nullable=False)
     
     # Relationship to property
     property = relationship("Property", back_populates="images")
+
+
+class ArchivedProperty(PropertyColumns, MySQLBase):
+    """
+    Model for properties_archive table: unavailable listings moved out of the hot table.
+
+    Rows keep their original id, so lookups and restores need no mapping.
+    """
+    __tablename__ = "properties_archive"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    archived_at = Column(DateTime, server_default=func.now(), nullable=False)
+
+    images = relationship(
+        "ArchivedPropertyImage",
+        primaryjoin="ArchivedProperty.id == foreign(ArchivedPropertyImage.property_id)",
+        viewonly=True,
+    )
+
+
+class ArchivedPropertyImage(PropertyImageColumns, MySQLBase):
+    """Model for property_images_archive table: images of archived properties"""
+    __tablename__ = "property_images_archive"
+    __table_args__ = (Index("ix_property_images_archive_property_sort", "property_id", "sort_order"),)
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    property_id = Column(Integer, nullable=False)
+
+
+class OutboxEvent(MySQLBase):
+    """Model for realty_outbox table: one row per realty write, relayed to the change stream"""
+    __tablename__ = "realty_outbox"
+    # The relay polls for unpublished rows in id order; contact jobs look rows up by contact
+    __table_args__ = (
+        Index("ix_realty_outbox_published_id", "published_at", "id"),
+        Index("ix_realty_outbox_aggregate", "aggregate", "aggregate_id"),
+    )
+
+    # BigInteger on MySQL; SQLite only autoincrements INTEGER primary keys
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    aggregate = Column(String(32), nullable=False)  # contact, property or property_image
+    aggregate_id = Column(Integer, nullable=False)
+    event_type = Column(String(16), nullable=False)  # created, updated, deleted, archived or restored
+    payload = Column(JSON, nullable=True)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+    published_at = Column(DateTime, nullable=True)
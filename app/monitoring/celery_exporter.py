@@ -0,0 +1,135 @@
+"""
+Prometheus exporter for the Celery queues, fed from Celery task events.
+
+Workers publish task events (``worker_send_task_events``) and producers
+publish ``task-sent`` (``task_send_sent_event``); this process turns them into
+wait time, run time, outcome and retry metrics, and polls the Redis broker for
+the depth of every queue and priority step.
+
+    python -m app.monitoring.celery_exporter --port 9808
+"""
+import argparse
+import threading
+import time
+
+from loguru import logger
+from prometheus_client import start_http_server
+
+from app.configs.celery_config import CELERY_QUEUES, PRIORITY_SEP, PRIORITY_STEPS, celery
+from app.monitoring.prometheus import (
+    CELERY_QUEUE_DEPTH, CELERY_TASK_RETRIES, CELERY_TASK_RUNTIME, CELERY_TASK_WAIT, CELERY_TASKS
+)
+
+# Tasks seen but not yet finished are dropped beyond this, oldest first
+_MAX_TRACKED_TASKS = 100000
+
+
+def queue_keys(queue: str):
+    """Redis list holding each priority step of ``queue`` (step 0 uses the bare name)."""
+    return [(step, f"{queue}{PRIORITY_SEP}{step}" if step else queue) for step in PRIORITY_STEPS]
+
+
+def poll_queue_depths(redis, queues=CELERY_QUEUES) -> None:
+    pipe = redis.pipeline(transaction=False)
+    keys = [(queue, step, key) for queue in queues for step, key in queue_keys(queue)]
+    for _, _, key in keys:
+        pipe.llen(key)
+    for (queue, step, _), depth in zip(keys, pipe.execute()):
+        CELERY_QUEUE_DEPTH.labels(queue=queue, priority=str(step)).set(depth)
+
+
+class TaskEventMetrics:
+    """Event handlers that record one observation per task transition."""
+
+    def __init__(self):
+        # uuid -> (name, queue, sent timestamp); started/succeeded events carry neither name nor queue
+        self._tasks = {}
+
+    def _remember(self, event: dict) -> None:
+        name, queue, sent = self._tasks.pop(event["uuid"], (None, None, None))
+        self._tasks[event["uuid"]] = (
+            event.get("name") or name,
+            event.get("queue") or event.get("routing_key") or queue,
+            sent if sent is not None else event["timestamp"],
+        )
+        if len(self._tasks) > _MAX_TRACKED_TASKS:
+            del self._tasks[next(iter(self._tasks))]
+
+    def _name(self, event: dict) -> str:
+        return self._tasks.get(event["uuid"], (None,))[0] or "unknown"
+
+    def on_sent(self, event: dict) -> None:
+        self._remember(event)
+
+    def on_received(self, event: dict) -> None:
+        self._remember(event)
+
+    def on_started(self, event: dict) -> None:
+        name, queue, sent = self._tasks.get(event["uuid"], (None, None, None))
+        if sent is not None:
+            CELERY_TASK_WAIT.labels(task=name or "unknown", queue=queue or "unknown").observe(
+                max(0.0, event["timestamp"] - sent)
+            )
+
+    def on_succeeded(self, event: dict) -> None:
+        name = self._name(event)
+        if event.get("runtime") is not None:
+            CELERY_TASK_RUNTIME.labels(task=name).observe(event["runtime"])
+        CELERY_TASKS.labels(task=name, state="succeeded").inc()
+        self._tasks.pop(event["uuid"], None)
+
+    def on_failed(self, event: dict) -> None:
+        CELERY_TASKS.labels(task=self._name(event), state="failed").inc()
+        self._tasks.pop(event["uuid"], None)
+
+    def on_retried(self, event: dict) -> None:
+        CELERY_TASK_RETRIES.labels(task=self._name(event)).inc()
+        # The retry is sent again with the same id; measure its wait from now
+        name, queue, _ = self._tasks.pop(event["uuid"], (None, None, None))
+        self._tasks[event["uuid"]] = (name, queue, event["timestamp"])
+
+    def handlers(self) -> dict:
+        return {
+            "task-sent": self.on_sent,
+            "task-received": self.on_received,
+            "task-started": self.on_started,
+            "task-succeeded": self.on_succeeded,
+            "task-failed": self.on_failed,
+            "task-retried": self.on_retried,
+        }
+
+
+def _poll_depths_forever(interval: float) -> None:
+    import redis
+
+    client = redis.Redis.from_url(celery.conf.broker_url)
+    while True:
+        try:
+            poll_queue_depths(client)
+        except redis.RedisError as e:
+            logger.warning(f"Could not read Celery queue depths: {e}")
+        time.sleep(interval)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=9808)
+    parser.add_argument("--depth-interval", type=float, default=5.0, help="Seconds between queue depth polls")
+    args = parser.parse_args()
+
+    start_http_server(args.port)
+    threading.Thread(target=_poll_depths_forever, args=(args.depth_interval,), daemon=True).start()
+    metrics = TaskEventMetrics()
+    logger.info(f"Celery exporter serving metrics on :{args.port}")
+    while True:
+        try:
+            with celery.connection() as connection:
+                receiver = celery.events.Receiver(connection, handlers=metrics.handlers())
+                receiver.capture(limit=None, timeout=None, wakeup=True)
+        except Exception as e:
+            logger.error(f"Celery event stream lost, reconnecting: {e}")
+            time.sleep(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""Background dependency prober backing the /health endpoint."""
+import asyncio
+import os
+import time
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, Optional
+
+from loguru import logger
+from prometheus_client import Gauge
+from sqlalchemy import text
+
+from app.configs.db_config import get_mysql_engine
+from app.configs.redis_config import get_async_redis_client
+from app.schemas.health import DependencyHealth, HealthCheckResponse
+
+HEALTH_PROBE_INTERVAL = float(os.getenv("HEALTH_PROBE_INTERVAL", "10"))
+HEALTH_PROBE_TIMEOUT = float(os.getenv("HEALTH_PROBE_TIMEOUT", "2"))
+HEALTH_CELERY_PING_TIMEOUT = float(os.getenv("HEALTH_CELERY_PING_TIMEOUT", "1"))
+
+DEPENDENCY_UP = Gauge(
+    "dependency_up", "Whether the last health probe of a dependency succeeded (1) or not (0)", ["dependency"]
+)
+DEPENDENCY_LATENCY = Gauge(
+    "dependency_probe_latency_seconds", "Latency of the last health probe of a dependency", ["dependency"]
+)
+
+
+def _ping_database() -> None:
+    with get_mysql_engine().connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+
+def _ping_celery() -> None:
+    # Imported here: Celery is heavy and the API only needs it for this probe
+    from app.configs.celery_config import celery
+
+    replies = celery.control.ping(timeout=HEALTH_CELERY_PING_TIMEOUT)
+    if not replies:
+        raise RuntimeError("no workers responded")
+
+
+async def check_database() -> None:
+    await asyncio.to_thread(_ping_database)
+
+
+async def check_redis() -> None:
+    await get_async_redis_client().ping()
+
+
+async def check_celery() -> None:
+    await asyncio.to_thread(_ping_celery)
+
+
+class HealthProber:
+    """
+    Probes every dependency concurrently on an interval and keeps the last snapshot.
+
+    Blocking clients run on the default executor, so a slow dependency never
+    stalls the event loop and each check is bounded by its own timeout.
+    """
+
+    def __init__(
+        self,
+        checks: Dict[str, Callable[[], Awaitable[None]]],
+        interval: float = HEALTH_PROBE_INTERVAL,
+        timeout: float = HEALTH_PROBE_TIMEOUT,
+    ):
+        self.checks = checks
+        self.interval = interval
+        self.timeout = timeout
+        self.results: Dict[str, DependencyHealth] = {
+            name: DependencyHealth(status="unknown") for name in checks
+        }
+        self._task: Optional[asyncio.Task] = None
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    async def _run_check(self, name: str, check: Callable[[], Awaitable[None]]) -> DependencyHealth:
+        start = time.perf_counter()
+        # A check still stuck in its thread from an earlier round is awaited
+        # again rather than started twice, so hung clients cannot pile up threads
+        inflight = self._inflight.get(name)
+        if inflight is None or inflight.done() or inflight.get_loop() is not asyncio.get_running_loop():
+            inflight = self._inflight[name] = asyncio.ensure_future(check())
+        try:
+            await asyncio.wait_for(asyncio.shield(inflight), timeout=self.timeout)
+            result = DependencyHealth(status="available")
+        except asyncio.TimeoutError:
+            result = DependencyHealth(status="unavailable", error=f"timed out after {self.timeout}s")
+        except Exception as e:
+            result = DependencyHealth(status="unavailable", error=str(e))
+        latency = time.perf_counter() - start
+        result.latency_ms = round(latency * 1000, 2)
+        result.checked_at = datetime.now(timezone.utc)
+
+        DEPENDENCY_UP.labels(dependency=name).set(1 if result.status == "available" else 0)
+        DEPENDENCY_LATENCY.labels(dependency=name).set(latency)
+        if result.status != "available":
+            logger.error(f"{name} health check failed: {result.error}")
+        return result
+
+    async def probe(self) -> None:
+        """Run all checks once, concurrently, and publish the snapshot."""
+        names = list(self.checks)
+        results = await asyncio.gather(*(self._run_check(name, self.checks[name]) for name in names))
+        self.results = dict(zip(names, results))
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await self.probe()
+            except Exception as e:
+                logger.error(f"Health probe loop error: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def snapshot(self) -> HealthCheckResponse:
+        healthy = all(result.status == "available" for result in self.results.values())
+        return HealthCheckResponse(status="healthy" if healthy else "unhealthy", **self.results)
+
+
+health_prober = HealthProber({
+    "database": check_database,
+    "redis": check_redis,
+    "celery": check_celery,
+})
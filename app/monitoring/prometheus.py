@@ -1,16 +1,11 @@
-from prometheus_client import Counter, Histogram, generate_latest, CONTENT_TYPE_LATEST
-from fastapi import APIRouter, Depends
-from sqlalchemy import text
-from sqlalchemy.orm import Session
-from starlette.responses import Response
+from prometheus_client import REGISTRY, Counter, Gauge, Histogram, generate_latest, CONTENT_TYPE_LATEST
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily, SummaryMetricFamily
+from fastapi import APIRouter
 from loguru import logger
-from app.configs.log_config import setup_logger
-from app.configs.db_config import get_async_db
-from app.configs.redis_config import redis_client
-from app.configs.celery_config import celery
+from starlette.responses import Response
+from app.monitoring.health import health_prober
 from app.schemas.health import HealthCheckResponse
 
-setup_logger()
 metrics_router = APIRouter()
 
 # Define Prometheus Metrics
@@ -20,47 +15,165 @@ REQUEST_COUNT = Counter(
 REQUEST_LATENCY = Histogram(
     "request_latency_seconds", "Request latency in seconds", ["endpoint"]
 )
+PRESCREEN_DECISIONS = Counter(
+    "moderation_prescreen_decisions_total",
+    "Moderation pre-screen decisions (allow/deny short-circuit or defer to the model)",
+    ["decision"]
+)
+ADMISSION_QUEUE_DEPTH = Gauge(
+    "admission_queue_depth", "Requests waiting for a concurrency slot", ["route"]
+)
+ADMISSION_IN_FLIGHT = Gauge(
+    "admission_in_flight", "Requests holding a concurrency slot", ["route"]
+)
+ADMISSION_QUEUE_WAIT = Histogram(
+    "admission_queue_wait_seconds", "Time spent waiting for a concurrency slot", ["route"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+)
+ADMISSION_REJECTED = Counter(
+    "admission_rejected_total", "Requests shed with 503 instead of being queued", ["route", "reason"]
+)
+OUTBOX_PUBLISHED = Counter(
+    "outbox_published_total", "Realty outbox rows relayed to the change stream"
+)
+OUTBOX_RELAY_LAG = Gauge(
+    "outbox_relay_lag_seconds", "Age of the oldest row in the last relayed outbox batch"
+)
+CATALOG_ROWS = Gauge(
+    "property_catalog_rows", "Properties held by this worker's in-memory catalog"
+)
+CATALOG_STALENESS = Gauge(
+    "property_catalog_staleness_seconds", "Time since the in-memory catalog last refreshed"
+)
+CATALOG_QUERIES = Counter(
+    "property_catalog_queries_total", "Property list queries by the backend that answered", ["backend"]
+)
+IDEMPOTENT_REQUESTS = Counter(
+    "idempotent_requests_total", "Requests carrying an Idempotency-Key by outcome", ["outcome"]
+)
+CELERY_QUEUE_DEPTH = Gauge(
+    "celery_queue_depth", "Tasks waiting in a Celery queue, by priority step", ["queue", "priority"]
+)
+CELERY_TASK_WAIT = Histogram(
+    "celery_task_wait_seconds", "Time from a task being sent to a worker starting it", ["task", "queue"],
+    buckets=(0.01, 0.05, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 300, 900),
+)
+CELERY_TASK_RUNTIME = Histogram(
+    "celery_task_runtime_seconds", "Time a worker spent running a task", ["task"],
+    buckets=(0.05, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 300, 900, 3600),
+)
+CELERY_TASKS = Counter(
+    "celery_tasks_total", "Finished Celery tasks by outcome", ["task", "state"]
+)
+CELERY_TASK_RETRIES = Counter(
+    "celery_task_retries_total", "Celery task retries", ["task"]
+)
+
+
+class PrescreenShadowCollector:
+    """
+    Pre-screen shadow-check counts, read from Redis at scrape time.
+
+    The checks run in Celery workers, which serve no /metrics, so they count
+    into Redis instead. Every API worker reports the same shared totals.
+    """
+
+    def __init__(self, get_client=None):
+        self._get_client = get_client
+
+    def describe(self):
+        # Without this, registering calls collect() and reaches Redis at import time
+        return []
+
+    def collect(self):
+        from app.core.prescreen import read_shadow_counts
+
+        checked = CounterMetricFamily(
+            "moderation_prescreen_shadow_checks",
+            "Short-circuit verdicts re-checked against the moderation model", labels=["decision"]
+        )
+        disagreed = CounterMetricFamily(
+            "moderation_prescreen_disagreements",
+            "Shadow-checked short-circuit verdicts that the moderation model disagreed with", labels=["decision"]
+        )
+        try:
+            if self._get_client is None:
+                from app.configs.redis_config import get_redis_client
+                self._get_client = get_redis_client
+            counts = read_shadow_counts(self._get_client())
+        except Exception as e:
+            logger.warning(f"Could not read pre-screen shadow counts: {e}")
+            counts = {"checked": {}, "disagreed": {}}
+        for decision, value in counts["checked"].items():
+            checked.add_metric([decision], value)
+        for decision, value in counts["disagreed"].items():
+            disagreed.add_metric([decision], value)
+        yield checked
+        yield disagreed
+
+
+class ContactMaintenanceCollector:
+    """Contact maintenance progress, read from the jobs' Redis checkpoints at scrape time."""
+
+    def __init__(self, get_client=None):
+        self._get_client = get_client
+
+    def describe(self):
+        return []
+
+    def collect(self):
+        from app.tasks.contact_tasks import read_progress
+
+        rows = CounterMetricFamily(
+            "contact_maintenance_rows", "Contacts changed by maintenance jobs", labels=["job"]
+        )
+        chunks = SummaryMetricFamily(
+            "contact_maintenance_chunk_seconds", "Duration of one maintenance id-range transaction", labels=["job"]
+        )
+        position = GaugeMetricFamily(
+            "contact_maintenance_position", "Contact id a running maintenance job has processed up to", labels=["job"]
+        )
+        end_id = GaugeMetricFamily(
+            "contact_maintenance_end_id", "Contact id a running maintenance job stops at", labels=["job"]
+        )
+        try:
+            if self._get_client is None:
+                from app.configs.redis_config import get_redis_client
+                self._get_client = get_redis_client
+            progress = read_progress(self._get_client())
+        except Exception as e:
+            logger.warning(f"Could not read contact maintenance progress: {e}")
+            progress = {}
+        for job, state in progress.items():
+            rows.add_metric([job], state["rows"])
+            chunks.add_metric([job], state["chunks"], state["seconds"])
+            if state["running"]:
+                position.add_metric([job], state["position"])
+                end_id.add_metric([job], state["end_id"])
+        yield rows
+        yield chunks
+        yield position
+        yield end_id
+
+
+REGISTRY.register(PrescreenShadowCollector())
+REGISTRY.register(ContactMaintenanceCollector())
+
 
 @metrics_router.get("/metrics")
 def metrics():
     """Expose Prometheus metrics endpoint."""
     return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
 
+
 @metrics_router.get("/health", response_model=HealthCheckResponse)
-async def health_check(db: Session = Depends(get_async_db)):
-    """Health check endpoint for database, Redis, and Celery."""
-    status = {"status": "healthy"}
-
-    # Check Database Connection
-    try:
-        await db.execute(text('SELECT 1'))  # Executes a simple query to test DB connection
-        status["database"] = "available"
-    except Exception as e:
-        status["status"] = "unhealthy"
-        status["database"] = f"unavailable - {str(e)}"
-        logger.error(f"Database connection error: {e}")
-
-    # Check Redis Connection
-    try:
-        redis_client.ping()
-        status["redis"] = "available"
-    except Exception as e:
-        status["status"] = "unhealthy"
-        status["redis"] = f"unavailable - {str(e)}"
-        logger.error(f"Redis connection error: {e}")
-
-    # Check Celery Connection
-    try:
-        celery.control.ping(timeout=1)
-        status["celery"] = "available"
-    except Exception as e:
-        status["status"] = "unhealthy"
-        status["celery"] = f"unavailable - {str(e)}"
-        logger.error(f"Celery connection error: {e}")
-
-    return HealthCheckResponse(
-        status=status["status"],
-        database=status["database"],
-        redis=status["redis"],
-        celery=status["celery"]
-    )
\ No newline at end of file
+async def health_check():
+    """
+    Health of the database, Redis, and Celery workers.
+
+    Serves the latest snapshot from the background prober instead of probing
+    on every hit; probes inline only when the prober is not running.
+    """
+    if not health_prober.running:
+        await health_prober.probe()
+    return health_prober.snapshot()
@@ -1,15 +1,13 @@
 import json
 from loguru import logger
+from app.configs.log_config import redact_text, sampled_logger
 from sqlalchemy import update
 from sqlalchemy.future import select
 from sqlalchemy.ext.asyncio import AsyncSession 
 from app.configs.db_config import SessionLocal, get_async_db
 from sqlalchemy.orm import Session
-from app.configs.log_config import setup_logger
 from app.models.moderation import ModerationResult
 from sqlalchemy.ext.asyncio import async_sessionmaker
-from app.configs.redis_config import redis_client
-setup_logger()
 
 async def save_moderation_result(moderation_result: ModerationResult, db: AsyncSession) -> ModerationResult:
     """
@@ -22,11 +20,11 @@ async def save_moderation_result(moderation_result: ModerationResult, db: AsyncS
     """
       
     try:
-        logger.info("Moderation result saving...")
+        sampled_logger.info("Moderation result saving...")
         db.add(moderation_result)
         await db.commit()
         await db.refresh(moderation_result)
-        logger.info("Moderation result saved successfully")
+        sampled_logger.info("Moderation result saved successfully")
         return moderation_result
     except Exception as e:
         logger.error(f"An error occurred while saving the moderation result: {e}")
@@ -46,9 +44,9 @@ async def get_moderation_result_by_text(text: str, db: AsyncSession) -> Moderati
         moderation_result = result.scalars().first()  # Extract the actual record
         
         if moderation_result:
-            logger.info(f"Moderation result: {moderation_result.task_id} retrieved successfully for text: {text}")
+            sampled_logger.info(f"Moderation result: {moderation_result.task_id} retrieved successfully for text: {redact_text(text)}")
         else:
-            logger.info(f"No moderation result found for text: {text}")
+            sampled_logger.info(f"No moderation result found for text: {redact_text(text)}")
         
         return moderation_result
     except Exception as e:
@@ -69,15 +67,30 @@ async def get_moderation_result_by_id(id: int, db: AsyncSession) -> ModerationRe
         moderation_result = result.scalars().first()  # Extract the actual record
         
         if moderation_result:
-            logger.info(f"Moderation result: {moderation_result.task_id} retrieved successfully for text: {id}")
+            sampled_logger.info(f"Moderation result: {moderation_result.task_id} retrieved successfully for id: {id}")
         else:
-            logger.info(f"No moderation result found for text: {id}")
+            sampled_logger.info(f"No moderation result found for id: {id}")
         
         return moderation_result
     except Exception as e:
         logger.error(f"An error occurred while retrieving the moderation result: {e}")
         return None
     
+async def get_moderation_result_by_task_id(task_id: str, db: AsyncSession) -> ModerationResult:
+    """
+    Retrieve a moderation result from the database by Celery task ID.
+
+    :param task_id: The task ID the result was stored under.
+    :param db: The database session to use for querying the result.
+    :return: The moderation result object if found, else None.
+    """
+    try:
+        result = await db.execute(select(ModerationResult).filter(ModerationResult.task_id == task_id))
+        return result.scalars().first()
+    except Exception as e:
+        logger.error(f"An error occurred while retrieving the moderation result: {e}")
+        return None
+
 ### **2. Function to Store Result in PostgreSQL**
 #This function will be responsible for saving the Celery task result in PostgreSQL.
 
@@ -94,7 +107,7 @@ def update_moderation_result(task_id: str, new_result: dict, status: str = "COMP
     try:
         # Convert result dictionary to JSON string
         new_result_json = json.dumps(new_result)
-        logger.info(f"Moderation result: {new_result_json} saving...")
+        sampled_logger.info(f"Moderation result for task {task_id} saving ({len(new_result_json)} bytes)...")
         # Update query
         stmt = (
             update(ModerationResult)
@@ -105,7 +118,7 @@ def update_moderation_result(task_id: str, new_result: dict, status: str = "COMP
         # Execute the update statement
         db.execute(stmt)
         db.commit()  # Commit the transaction
-        logger.info(f"Moderation result: {new_result_json} saved successfully")
+        sampled_logger.info(f"Moderation result for task {task_id} saved successfully")
 
         return True
     except Exception as e:
@@ -1,8 +1,93 @@
-"""Repository layer for Realty models with transaction safety."""
-from sqlalchemy.orm import Session, joinedload, subqueryload
+"""
+Repository layer for Realty models with transaction safety.
+
+Every create, update and delete also writes an outbox row in the same
+transaction; app.core.outbox relays those rows to the change stream.
+"""
+import datetime
+import decimal
+import enum
+
+from sqlalchemy import and_, func, insert, inspect, or_, select, true, update
+from sqlalchemy.orm import Session, aliased, joinedload, load_only, noload, subqueryload
 from sqlalchemy.exc import SQLAlchemyError
-from typing import List, Optional
-from app.models.realty import Contact, Property, PropertyImage
+from typing import Any, Callable, Iterable, List, Optional, Sequence, Tuple
+from app.models.realty import (
+    ArchivedProperty, ArchivedPropertyImage, Contact, OutboxEvent, Property, PropertyImage
+)
+
+
+# ==================== OUTBOX ====================
+
+_AGGREGATES = {Contact: "contact", Property: "property", PropertyImage: "property_image"}
+
+
+def _jsonable(value: Any) -> Any:
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    if isinstance(value, enum.Enum):
+        return value.value
+    return value
+
+
+def _contact_payload(contact_id: int, changes: Optional[Iterable[str]] = None) -> dict:
+    # Contacts hold personal data; the outbox and the stream outlive the row, so only names travel
+    payload = {"id": contact_id}
+    if changes:
+        payload["changed"] = sorted(changes)
+    return payload
+
+
+def contact_payload_has_personal_data(payload: Optional[dict]) -> bool:
+    """True for contact event payloads written before events were trimmed to field names."""
+    return not set(payload or {}) <= {"id", "changed"}
+
+
+def _scrub_contact_events(events: Sequence[OutboxEvent]) -> int:
+    scrubbed = 0
+    for event in events:
+        if contact_payload_has_personal_data(event.payload):
+            # Legacy updates held the changed values; keep only their names
+            changed = [key for key in event.payload if key != "id"] if event.event_type == "updated" else None
+            event.payload = _contact_payload(event.aggregate_id, changed)
+            scrubbed += 1
+    return scrubbed
+
+
+def _record_event(db: Session, obj, event_type: str, changes: Optional[dict] = None) -> None:
+    """
+    Add an outbox row for ``obj`` to the current transaction.
+
+    ``created`` carries every loaded column, ``updated`` the changed fields and
+    ``deleted`` just the keys. Image events always name their property.
+    Contact events only carry the id and, for updates, the changed field names.
+    """
+    if isinstance(obj, Contact):
+        payload = _contact_payload(obj.id, changes if event_type == "updated" else None)
+        db.add(OutboxEvent(aggregate="contact", aggregate_id=obj.id, event_type=event_type, payload=payload))
+        return
+    if event_type == "created":
+        state = inspect(obj)
+        changes = {attr.key: state.dict[attr.key] for attr in state.mapper.column_attrs if attr.key in state.dict}
+    payload = {key: _jsonable(value) for key, value in (changes or {}).items()}
+    payload["id"] = obj.id
+    if isinstance(obj, PropertyImage):
+        payload["property_id"] = obj.property_id
+    db.add(OutboxEvent(aggregate=_AGGREGATES[type(obj)], aggregate_id=obj.id, event_type=event_type, payload=payload))
+
+
+def _record_bulk_events(
+    db: Session, model, ids: Sequence[int], event_type: str, changes: Optional[dict] = None
+) -> None:
+    """Outbox rows for a set-based write to ``ids``; every row carries the same ``changes``."""
+    payload = {key: _jsonable(value) for key, value in (changes or {}).items()}
+    db.add_all(
+        OutboxEvent(aggregate=_AGGREGATES[model], aggregate_id=row_id, event_type=event_type,
+                    payload=_contact_payload(row_id, changes) if model is Contact else {**payload, "id": row_id})
+        for row_id in ids
+    )
 
 
 # ==================== CONTACT REPO ====================
@@ -25,6 +110,8 @@ def create_contact(db: Session, contact_data: dict) -> Contact:
     try:
         db_contact = Contact(**contact_data)
         db.add(db_contact)
+        db.flush()
+        _record_event(db, db_contact, "created")
         db.commit()
         db.refresh(db_contact)
         return db_contact
@@ -38,6 +125,7 @@ def update_contact(db: Session, db_contact: Contact, update_data: dict) -> Conta
     try:
         for field, value in update_data.items():
             setattr(db_contact, field, value)
+        _record_event(db, db_contact, "updated", update_data)
         db.commit()
         db.refresh(db_contact)
         return db_contact
@@ -49,6 +137,7 @@ def update_contact(db: Session, db_contact: Contact, update_data: dict) -> Conta
 def delete_contact(db: Session, db_contact: Contact) -> None:
     """Delete a contact with transaction safety."""
     try:
+        _record_event(db, db_contact, "deleted")
         db.delete(db_contact)
         db.commit()
     except SQLAlchemyError:
@@ -56,30 +145,167 @@ def delete_contact(db: Session, db_contact: Contact) -> None:
         raise
 
 
+# Placeholders written over a contact's personal data
+ANONYMIZED_CONTACT = {"name_": "Anonymized", "phone": "0000000000", "email": "anonymized@example.com", "message": ""}
+
+
+def _lock_contact_ids(db: Session, start_id: int, end_id: int, *criteria) -> List[int]:
+    return db.execute(
+        select(Contact.id).where(Contact.id >= start_id, Contact.id < end_id, *criteria)
+        .order_by(Contact.id).with_for_update()
+    ).scalars().all()
+
+
+def _update_contact_ids(db: Session, contact_ids: Sequence[int], values: dict) -> None:
+    db.execute(
+        update(Contact).where(Contact.id.in_(contact_ids)).values(**values)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def get_max_contact_id(db: Session) -> int:
+    return db.execute(select(func.max(Contact.id))).scalar() or 0
+
+
+def close_stale_leads(db: Session, start_id: int, end_id: int, before: datetime.datetime) -> int:
+    """
+    Close ``new`` contacts created before ``before`` with ids in ``[start_id, end_id)``.
+
+    Maintenance functions work on one primary-key range so each transaction
+    locks a bounded set of rows; the caller commits. They return rows changed.
+    """
+    contact_ids = _lock_contact_ids(db, start_id, end_id, Contact.status == "new", Contact.created_at < before)
+    if contact_ids:
+        _update_contact_ids(db, contact_ids, {"status": "closed"})
+        _record_bulk_events(db, Contact, contact_ids, "updated", {"status": "closed"})
+    return len(contact_ids)
+
+
+def anonymize_closed_leads(db: Session, start_id: int, end_id: int, before: datetime.datetime) -> int:
+    """Overwrite the personal data of ``closed`` contacts last updated before ``before``."""
+    contact_ids = _lock_contact_ids(
+        db, start_id, end_id,
+        Contact.status == "closed", Contact.updated_at < before, Contact.anonymized_at.is_(None),
+    )
+    if contact_ids:
+        _update_contact_ids(db, contact_ids, {**ANONYMIZED_CONTACT, "anonymized_at": func.now()})
+        _record_bulk_events(db, Contact, contact_ids, "updated", {**ANONYMIZED_CONTACT, "anonymized_at": None})
+        scrub_contact_events(db, contact_ids)
+    return len(contact_ids)
+
+
+def purge_closed_leads(db: Session, start_id: int, end_id: int, before: datetime.datetime) -> int:
+    """Delete ``closed`` contacts last updated before ``before``."""
+    contact_ids = _lock_contact_ids(db, start_id, end_id, Contact.status == "closed", Contact.updated_at < before)
+    if contact_ids:
+        db.query(Contact).filter(Contact.id.in_(contact_ids)).delete(synchronize_session=False)
+        _record_bulk_events(db, Contact, contact_ids, "deleted")
+        scrub_contact_events(db, contact_ids)
+    return len(contact_ids)
+
+
 # ==================== PROPERTY REPO ====================
 
+def _primary_image_order(image_model) -> tuple:
+    return image_model.is_primary.desc(), image_model.sort_order, image_model.id
+
+
+def _property_load_options(
+    fields: Optional[Sequence[str]], include: str, eager: Callable, model=Property
+) -> list:
+    """
+    Push a sparse fieldset down into the query.
+
+    ``fields`` limits the selected columns (the primary key is always loaded);
+    ``include`` picks all images, only the primary image, or none at all.
+    ``model`` is Property or ArchivedProperty.
+    """
+    image_model = model.images.property.mapper.class_
+    options = []
+    if fields is not None:
+        options.append(load_only(*(getattr(model, field) for field in fields)))
+    if include == "images":
+        options.append(eager(model.images))
+    elif include == "primary_image":
+        # The same image primary_image_url names: the flagged one, else the first by sort_order
+        candidate = aliased(image_model)
+        first = select(candidate.id).where(
+            candidate.property_id == image_model.property_id
+        ).order_by(*_primary_image_order(candidate)).limit(1).scalar_subquery()
+        options.append(eager(model.images.and_(image_model.id == first)))
+    else:
+        options.append(noload(model.images))
+    return options
+
+
 def get_properties(
     db: Session,
     skip: int = 0,
     limit: int = 100,
     property_type: Optional[str] = None,
     listing_type: Optional[str] = None,
-    is_available: Optional[bool] = None
+    is_available: Optional[bool] = None,
+    fields: Optional[Sequence[str]] = None,
+    include: str = "images",
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None
 ) -> List[Property]:
-    """Retrieve properties with filters and eager-loaded images."""
-    query = db.query(Property).options(subqueryload(Property.images))
+    """
+    Retrieve properties with filters, ordered by id, loading only the requested columns and images.
+
+    A price filter matches when any of the price columns lies within the bounds.
+    """
+    query = db.query(Property).options(*_property_load_options(fields, include, subqueryload))
     if property_type:
         query = query.filter(Property.property_type == property_type)
     if listing_type:
         query = query.filter(Property.listing_type == listing_type)
     if is_available is not None:
         query = query.filter(Property.is_available == is_available)
-    return query.offset(skip).limit(limit).all()
+    if min_price is not None or max_price is not None:
+        query = query.filter(or_(*(
+            and_(
+                column.isnot(None),
+                column >= min_price if min_price is not None else true(),
+                column <= max_price if max_price is not None else true(),
+            )
+            for column in (Property.private_price, Property.single_price, Property.double_price, Property.triple_price)
+        )))
+    return query.order_by(Property.id).offset(skip).limit(limit).all()
+
+
+def get_property_by_id(
+    db: Session,
+    property_id: int,
+    fields: Optional[Sequence[str]] = None,
+    include: str = "images"
+) -> Optional[Property]:
+    """Retrieve a single property by ID, loading only the requested columns and images."""
+    return db.query(Property).options(
+        *_property_load_options(fields, include, joinedload)
+    ).filter(Property.id == property_id).first()
+
+
+def get_properties_by_ids(
+    db: Session,
+    property_ids: Sequence[int],
+    fields: Optional[Sequence[str]] = None,
+    include: str = "images"
+) -> List[Property]:
+    """Retrieve properties by ID in the order given, skipping IDs that no longer exist."""
+    if not property_ids:
+        return []
+    properties = db.query(Property).options(
+        *_property_load_options(fields, include, subqueryload)
+    ).filter(Property.id.in_(property_ids)).all()
+    by_id = {property_obj.id: property_obj for property_obj in properties}
+    return [by_id[property_id] for property_id in property_ids if property_id in by_id]
 
 
-def get_property_by_id(db: Session, property_id: int) -> Optional[Property]:
-    """Retrieve a single property by ID with eager-loaded images."""
-    return db.query(Property).options(joinedload(Property.images)).filter(Property.id == property_id).first()
+def get_property_ids_after(db: Session, last_id: int, limit: int) -> List[int]:
+    """Next ``limit`` property IDs above ``last_id``, for walking the table in key order."""
+    rows = db.query(Property.id).filter(Property.id > last_id).order_by(Property.id).limit(limit)
+    return [row.id for row in rows]
 
 
 def create_property(db: Session, property_data: dict) -> Property:
@@ -87,6 +313,8 @@ def create_property(db: Session, property_data: dict) -> Property:
     try:
         db_property = Property(**property_data)
         db.add(db_property)
+        db.flush()
+        _record_event(db, db_property, "created")
         db.commit()
         db.refresh(db_property)
         return db_property
@@ -100,6 +328,7 @@ def update_property(db: Session, db_property: Property, update_data: dict) -> Pr
     try:
         for field, value in update_data.items():
             setattr(db_property, field, value)
+        _record_event(db, db_property, "updated", update_data)
         db.commit()
         db.refresh(db_property)
         return db_property
@@ -111,6 +340,7 @@ def update_property(db: Session, db_property: Property, update_data: dict) -> Pr
 def delete_property(db: Session, db_property: Property) -> None:
     """Delete a property with transaction safety."""
     try:
+        _record_event(db, db_property, "deleted")
         db.delete(db_property)
         db.commit()
     except SQLAlchemyError:
@@ -132,11 +362,46 @@ def get_property_image_by_id(db: Session, image_id: int) -> Optional[PropertyIma
     return db.query(PropertyImage).filter(PropertyImage.id == image_id).first()
 
 
+def get_variants_by_content_hash(db: Session, digest: str) -> Optional[dict]:
+    """Return variants already generated for an identical upload, if any."""
+    image = db.query(PropertyImage).filter(
+        PropertyImage.content_hash == digest, PropertyImage.variants.isnot(None)
+    ).first()
+    return image.variants if image else None
+
+
+# Image columns that feed Property.primary_image_url
+_SUMMARY_FIELDS = {"image_url", "is_primary", "sort_order"}
+
+
+def refresh_image_summary(db, property_ids: Optional[Sequence[int]] = None) -> int:
+    """
+    Recompute ``image_count`` and ``primary_image_url`` from property_images.
+
+    Runs as one set-based UPDATE in the caller's transaction; ``db`` may be a
+    Session or a Connection. Without ``property_ids`` every property is updated.
+    """
+    image_count = select(func.count(PropertyImage.id)).where(
+        PropertyImage.property_id == Property.id
+    ).scalar_subquery()
+    primary_image_url = select(PropertyImage.image_url).where(
+        PropertyImage.property_id == Property.id
+    ).order_by(*_primary_image_order(PropertyImage)).limit(1).scalar_subquery()
+
+    stmt = update(Property).values(image_count=image_count, primary_image_url=primary_image_url)
+    if property_ids is not None:
+        stmt = stmt.where(Property.id.in_(property_ids))
+    return db.execute(stmt.execution_options(synchronize_session=False)).rowcount
+
+
 def create_property_image(db: Session, image_data: dict, property_id: int) -> PropertyImage:
-    """Create a new property image with transaction safety."""
+    """Create a new property image and update the property's image summary in the same transaction."""
     try:
         db_image = PropertyImage(**image_data, property_id=property_id)
         db.add(db_image)
+        db.flush()
+        refresh_image_summary(db, [property_id])
+        _record_event(db, db_image, "created")
         db.commit()
         db.refresh(db_image)
         return db_image
@@ -146,10 +411,14 @@ def create_property_image(db: Session, image_data: dict, property_id: int) -> Pr
 
 
 def update_property_image(db: Session, db_image: PropertyImage, update_data: dict) -> PropertyImage:
-    """Update an existing property image with transaction safety."""
+    """Update an existing property image (and, if needed, the property's image summary) with transaction safety."""
     try:
         for field, value in update_data.items():
             setattr(db_image, field, value)
+        _record_event(db, db_image, "updated", update_data)
+        if _SUMMARY_FIELDS.intersection(update_data):
+            db.flush()
+            refresh_image_summary(db, [db_image.property_id])
         db.commit()
         db.refresh(db_image)
         return db_image
@@ -159,10 +428,144 @@ def update_property_image(db: Session, db_image: PropertyImage, update_data: dic
 
 
 def delete_property_image(db: Session, db_image: PropertyImage) -> None:
-    """Delete a property image with transaction safety."""
+    """Delete a property image and update the property's image summary in the same transaction."""
     try:
+        property_id = db_image.property_id
+        _record_event(db, db_image, "deleted")
         db.delete(db_image)
+        db.flush()
+        refresh_image_summary(db, [property_id])
+        db.commit()
+    except SQLAlchemyError:
+        db.rollback()
+        raise
+
+
+# ==================== ARCHIVE REPO ====================
+
+def _copy_rows(db: Session, target, source, *criteria, **overrides) -> None:
+    """``INSERT INTO target SELECT ... FROM source``, over the columns both tables have."""
+    columns = [column.key for column in target.__table__.columns if column.key in source.__table__.columns]
+    values = [overrides.get(name, source.__table__.c[name]) for name in columns]
+    db.execute(insert(target).from_select(columns, select(*values).where(*criteria)))
+
+
+def archive_properties(db: Session, before: datetime.datetime, limit: int) -> List[int]:
+    """
+    Move up to ``limit`` unavailable properties last updated before ``before``, with their images,
+    to the archive tables; returns the moved IDs.
+
+    The caller commits. SKIP LOCKED leaves rows a live request holds for a later batch.
+    """
+    property_ids = db.execute(
+        select(Property.id).where(Property.is_available.is_(False), Property.updated_at < before)
+        .order_by(Property.updated_at, Property.id).limit(limit).with_for_update(skip_locked=True)
+    ).scalars().all()
+    if not property_ids:
+        return []
+    _copy_rows(db, ArchivedProperty, Property, Property.id.in_(property_ids))
+    _copy_rows(db, ArchivedPropertyImage, PropertyImage, PropertyImage.property_id.in_(property_ids))
+    db.query(PropertyImage).filter(PropertyImage.property_id.in_(property_ids)).delete(synchronize_session=False)
+    db.query(Property).filter(Property.id.in_(property_ids)).delete(synchronize_session=False)
+    _record_bulk_events(db, Property, property_ids, "archived")
+    return list(property_ids)
+
+
+def get_archived_property(
+    db: Session,
+    property_id: int,
+    fields: Optional[Sequence[str]] = None,
+    include: str = "images"
+) -> Optional[ArchivedProperty]:
+    """Retrieve an archived property by ID, shaped like ``get_property_by_id``."""
+    return db.query(ArchivedProperty).options(
+        *_property_load_options(fields, include, joinedload, model=ArchivedProperty)
+    ).filter(ArchivedProperty.id == property_id).first()
+
+
+def restore_property(db: Session, property_id: int) -> bool:
+    """
+    Move an archived property and its images back to the live tables with transaction safety.
+
+    ``updated_at`` is reset so pollers pick the row up and it is not archived
+    again straight away. Returns False if the property is not archived.
+    """
+    try:
+        archived = db.execute(
+            select(ArchivedProperty.id).where(ArchivedProperty.id == property_id).with_for_update()
+        ).scalar()
+        if archived is None:
+            db.rollback()
+            return False
+        _copy_rows(db, Property, ArchivedProperty, ArchivedProperty.id == property_id, updated_at=func.now())
+        _copy_rows(db, PropertyImage, ArchivedPropertyImage, ArchivedPropertyImage.property_id == property_id)
+        db.query(ArchivedPropertyImage).filter(
+            ArchivedPropertyImage.property_id == property_id
+        ).delete(synchronize_session=False)
+        db.query(ArchivedProperty).filter(ArchivedProperty.id == property_id).delete(synchronize_session=False)
+        _record_bulk_events(db, Property, [property_id], "restored")
         db.commit()
+        return True
     except SQLAlchemyError:
         db.rollback()
         raise
+
+
+# ==================== OUTBOX REPO ====================
+
+def get_unpublished_events(db: Session, limit: int) -> List[OutboxEvent]:
+    """
+    Lock and return the oldest unpublished outbox rows.
+
+    SKIP LOCKED lets several relays share the backlog without waiting on
+    each other (dialects without it, like SQLite, ignore the hint).
+    """
+    return db.query(OutboxEvent).filter(
+        OutboxEvent.published_at.is_(None)
+    ).order_by(OutboxEvent.id).limit(limit).with_for_update(skip_locked=True).all()
+
+
+def mark_events_published(db: Session, event_ids: Sequence[int]) -> None:
+    db.execute(
+        update(OutboxEvent).where(OutboxEvent.id.in_(event_ids))
+        .values(published_at=func.now()).execution_options(synchronize_session=False)
+    )
+
+
+def get_events_after(db: Session, after_id: int, limit: int) -> List[OutboxEvent]:
+    """Outbox rows with id above ``after_id``, oldest first, for catching up from an offset."""
+    return db.query(OutboxEvent).filter(OutboxEvent.id > after_id).order_by(OutboxEvent.id).limit(limit).all()
+
+
+def scrub_contact_events(db: Session, contact_ids: Sequence[int]) -> int:
+    """Trim outbox rows of ``contact_ids`` that still carry personal data down to field names."""
+    return _scrub_contact_events(db.query(OutboxEvent).filter(
+        OutboxEvent.aggregate == "contact", OutboxEvent.aggregate_id.in_(contact_ids)
+    ).all())
+
+
+def scrub_contact_events_after(db: Session, after_id: int, limit: int) -> Tuple[Optional[int], int]:
+    """
+    Trim up to ``limit`` contact outbox rows with id above ``after_id``.
+
+    Returns ``(last_id, scrubbed)``; ``last_id`` is None once no rows are left.
+    """
+    events = db.query(OutboxEvent).filter(
+        OutboxEvent.aggregate == "contact", OutboxEvent.id > after_id
+    ).order_by(OutboxEvent.id).limit(limit).all()
+    if not events:
+        return None, 0
+    return events[-1].id, _scrub_contact_events(events)
+
+
+def purge_published_events(db: Session, before: datetime.datetime, limit: int) -> int:
+    """Delete up to ``limit`` rows published before ``before``; returns how many went."""
+    ids = select(OutboxEvent.id).where(
+        OutboxEvent.published_at.is_not(None), OutboxEvent.published_at < before
+    ).order_by(OutboxEvent.id).limit(limit)
+    # MySQL cannot delete from a table it selects from in a subquery, so fetch the ids first
+    event_ids = db.execute(ids).scalars().all()
+    if not event_ids:
+        return 0
+    db.query(OutboxEvent).filter(OutboxEvent.id.in_(event_ids)).delete(synchronize_session=False)
+    return len(event_ids)
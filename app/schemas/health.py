@@ -1,8 +1,15 @@
+from datetime import datetime
 from pydantic import BaseModel
-from typing import Literal
+from typing import Literal, Optional
+
+class DependencyHealth(BaseModel):
+    status: Literal["available", "unavailable", "unknown"]
+    latency_ms: Optional[float] = None
+    error: Optional[str] = None
+    checked_at: Optional[datetime] = None
 
 class HealthCheckResponse(BaseModel):
     status: Literal["healthy", "unhealthy"]
-    database: str
-    redis: str
-    celery: str
+    database: DependencyHealth
+    redis: DependencyHealth
+    celery: DependencyHealth
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic import BaseModel
 from pydantic import BaseModel, Json
 
@@ -10,5 +12,5 @@ class ModerationResponse(BaseModel):
 
 class ModerationResultResponse(BaseModel):
     task_id: str
-    result: dict
+    result: Optional[dict] = None
     status: str
\ No newline at end of file
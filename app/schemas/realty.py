@@ -1,5 +1,5 @@
 """Pydantic schemas for Realty models with validation."""
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 from pydantic import BaseModel, Field, EmailStr, field_validator
 from enum import Enum
@@ -31,6 +31,12 @@ class ListingType(str, Enum):
     rent = "rent"
 
 
+class PropertyInclude(str, Enum):
+    images = "images"
+    primary_image = "primary_image"
+    none = "none"
+
+
 # ==================== CONTACT SCHEMAS ====================
 
 class ContactBase(BaseModel):
@@ -94,6 +100,8 @@ class PropertyImageResponse(PropertyImageBase):
     """Schema for property image response with ID and timestamps."""
     id: int
     property_id: int
+    # Resized copies of uploaded images by format and width, e.g. {"webp": {"320": "/media/..."}}
+    variants: Optional[Dict[str, Dict[str, str]]] = None
     created_at: datetime
 
     model_config = {"from_attributes": True}
@@ -159,8 +167,73 @@ class PropertyUpdate(BaseModel):
 class PropertyResponse(PropertyBase):
     """Schema for property response with ID, timestamps, and images."""
     id: int
+    primary_image_url: Optional[str] = None
+    image_count: int = 0
     created_at: datetime
     updated_at: datetime
     images: List[PropertyImageResponse] = []
 
     model_config = {"from_attributes": True}
+
+
+class PropertySparseResponse(BaseModel):
+    """
+    Property limited to the requested ``?fields=`` and ``?include=``.
+
+    Only the fields that were loaded are set, and unset fields are left out
+    of the JSON entirely.
+    """
+    id: int
+    property_name: Optional[str] = None
+    location: Optional[str] = None
+    phone: Optional[str] = None
+    map_link: Optional[str] = None
+    description: Optional[str] = None
+    property_type: Optional[PropertyType] = None
+    furnishing: Optional[Furnishing] = None
+    private_price: Optional[float] = None
+    single_price: Optional[float] = None
+    double_price: Optional[float] = None
+    triple_price: Optional[float] = None
+    listing_type: Optional[ListingType] = None
+    is_available: Optional[bool] = None
+    primary_image_url: Optional[str] = None
+    image_count: Optional[int] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    images: Optional[List[PropertyImageResponse]] = None
+    primary_image: Optional[PropertyImageResponse] = None
+
+    model_config = {"from_attributes": True}
+
+
+# ==================== SEARCH SCHEMAS ====================
+
+class SuggestionKind(str, Enum):
+    location = "location"
+    property = "property"
+
+
+class LocationSuggestion(BaseModel):
+    """One typeahead suggestion: a location or property name and how many listings use it."""
+    text: str
+    kind: SuggestionKind
+    listing_count: int
+
+
+# ==================== ANALYTICS SCHEMAS ====================
+
+class PriceStats(BaseModel):
+    """Distribution of one price column within a group."""
+    count: int
+    p25: float
+    median: float
+    p75: float
+
+
+class PriceGroupStats(BaseModel):
+    """Price stats for one (location, property_type) group, keyed by price column."""
+    location: str
+    property_type: Optional[PropertyType] = None
+    listings: int
+    prices: Dict[str, PriceStats]
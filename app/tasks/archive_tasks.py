@@ -0,0 +1,52 @@
+import datetime
+import os
+import time
+from typing import Optional
+
+from loguru import logger
+
+from app.configs.celery_config import celery
+from app.configs.db_config import new_mysql_session
+from app.repo import realty as realty_repo
+
+# Unavailable listings untouched for this long move to the archive tables
+ARCHIVE_AFTER_DAYS = float(os.getenv("ARCHIVE_AFTER_DAYS", "90"))
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "500"))
+# Pause between batches so replicas and live queries keep up
+ARCHIVE_BATCH_PAUSE = float(os.getenv("ARCHIVE_BATCH_PAUSE", "0.1"))
+
+
+@celery.task(name="archive_stale_properties")
+def archive_stale_properties(
+    older_than_days: float = ARCHIVE_AFTER_DAYS,
+    batch_size: int = ARCHIVE_BATCH_SIZE,
+    max_batches: Optional[int] = None,
+):
+    """
+    Move unavailable properties not updated for ``older_than_days`` to the archive, one batch per transaction.
+
+    Each batch deletes what it copied, so an interrupted run simply resumes on
+    the next one. Returns how many properties were archived.
+    """
+    before = datetime.datetime.now() - datetime.timedelta(days=older_than_days)
+    db = new_mysql_session()
+    archived = 0
+    batches = 0
+    try:
+        while max_batches is None or batches < max_batches:
+            property_ids = realty_repo.archive_properties(db, before, batch_size)
+            db.commit()
+            if not property_ids:
+                break
+            archived += len(property_ids)
+            batches += 1
+            logger.info(f"Archived {len(property_ids)} properties (up to id {max(property_ids)})")
+            if len(property_ids) < batch_size:
+                break
+            time.sleep(ARCHIVE_BATCH_PAUSE)
+        return archived
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
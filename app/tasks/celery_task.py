@@ -1,32 +1,49 @@
 import os
-from dotenv import load_dotenv
+from typing import Optional
+from app.configs.env_config import load_env
 from app.configs.celery_config import celery
 from openai import OpenAI, OpenAIError
 from loguru import logger
-from app.configs.log_config import setup_logger
+from app.configs.log_config import sampled_logger
 from app.repo.moderation import update_moderation_result
+from app.configs.redis_config import get_redis_client
+from app.core.prescreen import record_shadow_check
+from app.core.result_codec import compact_moderation_result
 
-# Ensure logger is set up
-load_dotenv()
-setup_logger()
+load_env()
 
 OPENAIKEY = os.getenv("OPENAI_API_KEY")
 MODERATION_MODEL = os.getenv("MODERATION_MODEL")
+# Keep only flags and rounded scores in the result backend and the database
+MODERATION_COMPACT_RESULTS = os.getenv("MODERATION_COMPACT_RESULTS", "false").lower() == "true"
 
 @celery.task(name="moderate_text_task", bind=True, max_retries=3, default_retry_delay=60)
-def moderate_text_task(self, text: str):
+def moderate_text_task(self, text: str, prescreen_decision: Optional[str] = None):
     """
     Background task for text moderation.
+
+    When ``prescreen_decision`` is set the text was already answered by the
+    pre-screen and this run only shadow-checks that verdict against the model.
     """
-    logger.info("Starting moderate_text_task")
+    sampled_logger.info("Starting moderate_text_task")
 
     try:
-        logger.info("calling OpenAI API")
+        sampled_logger.info("calling OpenAI API")
 
         # Call OpenAI Moderation API
         client = OpenAI(api_key=OPENAIKEY)
         response = client.moderations.create(model=MODERATION_MODEL, input=text)
         response_json = response.to_dict()
+        if MODERATION_COMPACT_RESULTS:
+            response_json = compact_moderation_result(response_json)
+
+        if prescreen_decision:
+            try:
+                if record_shadow_check(get_redis_client(), prescreen_decision, response_json):
+                    logger.warning(f"Pre-screen verdict '{prescreen_decision}' disagreed with the model")
+            except Exception as e:
+                logger.warning(f"Could not record pre-screen shadow check: {e}")
+            return response_json
 
         # Store the result in PostgreSQL
         update_moderation_result(self.request.id, response_json, "SUCCESS")
@@ -39,7 +56,7 @@ def moderate_text_task(self, text: str):
             self.retry(exc=e)
         except self.MaxRetriesExceededError:
             logger.error("Max retries exceeded for moderate_text_task")
-            update_moderation_result(self.request.id, text, None, "FAILED")
+            update_moderation_result(self.request.id, None, "FAILED")
             return {"error": "Service unavailable, please try again later."}
 
     except Exception as e:
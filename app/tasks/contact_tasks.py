@@ -0,0 +1,162 @@
+"""
+Maintenance jobs for the ``contacts`` table.
+
+Each job walks the table in primary-key ranges of ``CONTACT_MAINTENANCE_CHUNK``
+ids, one short transaction per range, and rests between ranges for at least as
+long as the range took (and at least ``CONTACT_MAINTENANCE_PAUSE``), so it
+never holds more than a chunk of row locks and leaves replicas time to apply
+each batch. Progress is checkpointed in Redis after every range; a job that
+dies resumes where it stopped on its next run.
+
+Celery workers serve no /metrics, so progress lives in Redis: the checkpoint
+hash of a running job, and running totals in ``maintenance:contacts:stats``.
+The API exports both at scrape time (``read_progress``).
+"""
+import datetime
+import os
+import time
+import uuid
+from typing import Callable, Dict, Optional
+
+from loguru import logger
+
+from app.configs.celery_config import celery
+from app.configs.db_config import new_mysql_session
+from app.configs.redis_config import get_redis_client
+from app.repo import realty as realty_repo
+
+# "new" leads untouched this long are closed
+CONTACT_STALE_DAYS = float(os.getenv("CONTACT_STALE_DAYS", "30"))
+# Closed leads untouched this long have their personal data overwritten
+CONTACT_ANONYMIZE_DAYS = float(os.getenv("CONTACT_ANONYMIZE_DAYS", "180"))
+# Closed leads untouched this long are deleted
+CONTACT_RETENTION_DAYS = float(os.getenv("CONTACT_RETENTION_DAYS", "730"))
+CONTACT_MAINTENANCE_CHUNK = int(os.getenv("CONTACT_MAINTENANCE_CHUNK", "1000"))
+CONTACT_MAINTENANCE_PAUSE = float(os.getenv("CONTACT_MAINTENANCE_PAUSE", "0.05"))
+
+JOBS = ("close_stale", "anonymize", "purge")
+STATS_KEY = "maintenance:contacts:stats"
+
+# Only one run of a job at a time. The lock is extended before every range and
+# outlives a crashed worker by this long
+_LOCK_TTL = 600
+
+# Both act only while the lock still holds our token, so a run whose lock
+# expired cannot extend or delete the lock of the run that took over
+EXTEND_LOCK_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+RELEASE_LOCK_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+ChunkFn = Callable[..., int]
+
+
+def _checkpoint_key(job: str) -> str:
+    return f"maintenance:contacts:{job}"
+
+
+def read_progress(redis) -> Dict[str, dict]:
+    """Per job: checkpoint ``position``/``end_id`` while running, and ``rows``/``chunks``/``seconds`` totals."""
+    pipe = redis.pipeline(transaction=False)
+    for job in JOBS:
+        pipe.hgetall(_checkpoint_key(job))
+    pipe.hgetall(STATS_KEY)
+    *checkpoints, stats = pipe.execute()
+    progress = {}
+    for job, checkpoint in zip(JOBS, checkpoints):
+        progress[job] = {
+            "running": bool(checkpoint),
+            "position": int(checkpoint.get("position", 0)),
+            "end_id": int(checkpoint.get("end_id", 0)),
+            "rows": int(stats.get(f"rows:{job}", 0)),
+            "chunks": int(stats.get(f"chunks:{job}", 0)),
+            "seconds": float(stats.get(f"seconds:{job}", 0)),
+        }
+    return progress
+
+
+def run_in_chunks(job: str, apply: ChunkFn, before: datetime.datetime, restart: bool = False) -> Optional[int]:
+    """
+    Run ``apply(db, start_id, end_id, before)`` over every id range, resuming from the checkpoint.
+
+    Returns rows changed by this run, or None if another run of ``job`` holds the lock.
+    """
+    redis = get_redis_client()
+    key = _checkpoint_key(job)
+    lock_key, token = f"{key}:lock", uuid.uuid4().hex
+    if not redis.set(lock_key, token, nx=True, ex=_LOCK_TTL):
+        logger.info(f"Contact maintenance {job} is already running")
+        return None
+    extend_lock = redis.register_script(EXTEND_LOCK_LUA)
+    release_lock = redis.register_script(RELEASE_LOCK_LUA)
+    db = new_mysql_session()
+    try:
+        checkpoint = {} if restart else redis.hgetall(key)
+        if checkpoint:
+            position, end_id = int(checkpoint["position"]), int(checkpoint["end_id"])
+            logger.info(f"Contact maintenance {job} resuming at id {position} of {end_id}")
+        else:
+            # Rows inserted after the run starts are left for the next run
+            position, end_id = 0, realty_repo.get_max_contact_id(db) + 1
+            db.rollback()
+            redis.hset(key, mapping={"position": position, "end_id": end_id, "changed": 0})
+        changed = 0
+        while position < end_id:
+            if not extend_lock(keys=[lock_key], args=[token, _LOCK_TTL]):
+                logger.warning(f"Contact maintenance {job} lost its lock at id {position}, stopping")
+                return changed
+            started = time.monotonic()
+            chunk_end = min(position + CONTACT_MAINTENANCE_CHUNK, end_id)
+            try:
+                rows = apply(db, position, chunk_end, before)
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+            elapsed = time.monotonic() - started
+            position = chunk_end
+            changed += rows
+            pipe = redis.pipeline(transaction=False)
+            pipe.hset(key, "position", position)
+            pipe.hincrby(key, "changed", rows)
+            pipe.hincrby(STATS_KEY, f"rows:{job}", rows)
+            pipe.hincrby(STATS_KEY, f"chunks:{job}", 1)
+            pipe.hincrbyfloat(STATS_KEY, f"seconds:{job}", elapsed)
+            pipe.execute()
+            time.sleep(max(CONTACT_MAINTENANCE_PAUSE, elapsed))
+        redis.delete(key)
+        logger.info(f"Contact maintenance {job} finished: {changed} contacts changed")
+        return changed
+    finally:
+        db.close()
+        release_lock(keys=[lock_key], args=[token])
+
+
+def _cutoff(days: float) -> datetime.datetime:
+    return datetime.datetime.now() - datetime.timedelta(days=days)
+
+
+@celery.task(name="close_stale_leads")
+def close_stale_leads(older_than_days: float = CONTACT_STALE_DAYS, restart: bool = False):
+    """Close ``new`` leads created more than ``older_than_days`` ago."""
+    return run_in_chunks("close_stale", realty_repo.close_stale_leads, _cutoff(older_than_days), restart)
+
+
+@celery.task(name="anonymize_closed_leads")
+def anonymize_closed_leads(older_than_days: float = CONTACT_ANONYMIZE_DAYS, restart: bool = False):
+    """Overwrite name, phone, email and message of closed leads untouched for ``older_than_days``."""
+    return run_in_chunks("anonymize", realty_repo.anonymize_closed_leads, _cutoff(older_than_days), restart)
+
+
+@celery.task(name="purge_closed_leads")
+def purge_closed_leads(older_than_days: float = CONTACT_RETENTION_DAYS, restart: bool = False):
+    """Delete closed leads untouched for ``older_than_days``."""
+    return run_in_chunks("purge", realty_repo.purge_closed_leads, _cutoff(older_than_days), restart)
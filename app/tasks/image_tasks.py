@@ -0,0 +1,106 @@
+import io
+import os
+
+from loguru import logger
+from PIL import Image, ImageOps, UnidentifiedImageError, features
+
+from app.configs.celery_config import celery
+from app.configs.db_config import new_mysql_session
+from app.core.storage import content_hash, get_storage
+from app.repo import realty as realty_repo
+
+IMAGE_VARIANT_WIDTHS = [int(w) for w in os.getenv("IMAGE_VARIANT_WIDTHS", "320,640,1280").split(",") if w.strip()]
+IMAGE_VARIANT_FORMATS = [f.strip().lower() for f in os.getenv("IMAGE_VARIANT_FORMATS", "webp,avif").split(",") if f.strip()]
+IMAGE_VARIANT_QUALITY = int(os.getenv("IMAGE_VARIANT_QUALITY", "75"))
+
+_PIL_FORMATS = {"webp": "WEBP", "avif": "AVIF"}
+
+
+def render_variants(original: bytes) -> dict:
+    """
+    Encode ``original`` at every configured width and format.
+
+    Returns ``{format: {width: bytes}}``. Images are never upscaled, and
+    formats this Pillow build cannot encode are skipped.
+    """
+    with Image.open(io.BytesIO(original)) as source:
+        source = ImageOps.exif_transpose(source)
+        if source.mode not in ("RGB", "RGBA"):
+            source = source.convert("RGBA" if "transparency" in source.info else "RGB")
+        rendered = {}
+        for fmt in IMAGE_VARIANT_FORMATS:
+            if fmt not in _PIL_FORMATS or not features.check(fmt):
+                logger.warning(f"Skipping {fmt} variants: not supported by this Pillow build")
+                continue
+            rendered[fmt] = {}
+            for width in sorted(set(IMAGE_VARIANT_WIDTHS)):
+                width = min(width, source.width)
+                if str(width) in rendered[fmt]:
+                    continue
+                height = max(1, round(source.height * width / source.width))
+                buffer = io.BytesIO()
+                source.resize((width, height), Image.LANCZOS).save(
+                    buffer, _PIL_FORMATS[fmt], quality=IMAGE_VARIANT_QUALITY
+                )
+                rendered[fmt][str(width)] = buffer.getvalue()
+    return rendered
+
+
+@celery.task(name="generate_image_variants", bind=True, max_retries=3, default_retry_delay=30)
+def generate_image_variants(self, image_id: int):
+    """Store resized WebP/AVIF copies of an uploaded image and record their URLs."""
+    storage = get_storage()
+    db = new_mysql_session()
+    try:
+        image = realty_repo.get_property_image_by_id(db, image_id)
+        if image is None or image.content_hash is None:
+            logger.warning(f"Image {image_id} is gone or was not uploaded; no variants generated")
+            return None
+
+        # Another upload of the same bytes may have finished in the meantime
+        variants = realty_repo.get_variants_by_content_hash(db, image.content_hash)
+        if variants is None:
+            original = storage.open(storage.key_from_url(image.image_url))
+            variants = {
+                fmt: {width: storage.url(storage.save(data, fmt, content_hash(data))) for width, data in widths.items()}
+                for fmt, widths in render_variants(original).items()
+            }
+        realty_repo.update_property_image(db, image, {"variants": variants})
+        logger.info(f"Generated variants for image {image_id}")
+        return variants
+    except UnidentifiedImageError:
+        logger.error(f"Image {image_id} is not a decodable image; no variants generated")
+        return None
+    except Exception as e:
+        logger.error(f"Variant generation failed for image {image_id}: {e}")
+        raise self.retry(exc=e)
+    finally:
+        db.close()
+
+
+@celery.task(name="backfill_image_summary")
+def backfill_image_summary(batch_size: int = 1000, start_id: int = 0):
+    """
+    Recompute ``image_count``/``primary_image_url`` for every property, one id range per transaction.
+
+    Short transactions keep row locks brief on a live table; rerun with
+    ``start_id`` to resume after an interruption.
+    """
+    db = new_mysql_session()
+    updated = 0
+    try:
+        last_id = start_id
+        while True:
+            ids = realty_repo.get_property_ids_after(db, last_id, batch_size)
+            if not ids:
+                break
+            updated += realty_repo.refresh_image_summary(db, ids)
+            db.commit()
+            last_id = ids[-1]
+            logger.info(f"Image summary backfilled up to property {last_id}")
+        return updated
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
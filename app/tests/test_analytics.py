@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.api import realty as realty_api
+from app.configs.db_config import MySQLBase
+from app.core.analytics import PriceAnalytics
+from app.core.catalog import PropertyCatalog
+from app.core.exceptions import ServiceUnavailableError
+from app.repo import realty as realty_repo
+
+engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+MySQLBase.metadata.create_all(bind=engine)
+Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+SINGLE = [7000, 9000, 8000, 12000, 10000]
+
+
+def _seed(db):
+    for price in SINGLE:
+        realty_repo.create_property(db, dict(
+            property_name=f"PG {price}", location="Bellandur", phone="9876543210",
+            property_type="PG", listing_type="rent",
+            single_price=price, double_price=price - 2000 if price > 8000 else None,
+        ))
+    realty_repo.create_property(db, dict(
+        property_name="Flat", location="HSR Layout", phone="9876543210",
+        property_type="1BHK", listing_type="rent", private_price=20000,
+    ))
+
+
+def _group(analytics, location, property_type):
+    (group,) = analytics.stats(location, property_type)
+    return group
+
+
+def test_percentiles_match_numpy_and_follow_price_changes():
+    with Session() as db:
+        _seed(db)
+        catalog = PropertyCatalog()
+        analytics = PriceAnalytics(catalog)
+        assert not analytics.loaded
+        catalog.refresh(db)
+        assert analytics.loaded
+
+        pg = _group(analytics, "Bellandur", "PG")
+        assert pg["listings"] == 5
+        single = pg["prices"]["single_price"]
+        assert single["count"] == 5
+        assert [single["p25"], single["median"], single["p75"]] == np.percentile(SINGLE, [25, 50, 75]).tolist()
+        assert pg["prices"]["double_price"]["count"] == 3
+        assert "private_price" not in pg["prices"]
+        assert [g["location"] for g in analytics.stats()] == ["Bellandur", "HSR Layout"]
+
+        flat = _group(analytics, "HSR Layout", "1BHK")
+        realty_repo.update_property(db, realty_repo.get_property_by_id(db, 1), {"single_price": 30000})
+        catalog.refresh(db)
+        expected = np.percentile([30000, *SINGLE[1:]], [25, 50, 75]).tolist()
+        single = _group(analytics, "Bellandur", "PG")["prices"]["single_price"]
+        assert [single["p25"], single["median"], single["p75"]] == expected
+        # Untouched groups keep their cached entry
+        assert _group(analytics, "HSR Layout", "1BHK")["prices"] is flat["prices"]
+
+        realty_repo.update_property(db, realty_repo.get_property_by_id(db, 6), {"location": "Koramangala"})
+        catalog.refresh(db)
+        assert analytics.stats("HSR Layout") == []
+        assert _group(analytics, "Koramangala", "1BHK")["prices"]["private_price"]["median"] == 20000
+
+
+def test_endpoint_sheds_until_the_background_load_finishes(monkeypatch):
+    monkeypatch.setattr(realty_api, "price_analytics", PriceAnalytics(PropertyCatalog()))
+    with pytest.raises(ServiceUnavailableError) as rejected:
+        realty_api.price_analytics_by_location(location=None, property_type=None)
+    assert rejected.value.status_code == 503
@@ -0,0 +1,61 @@
+import datetime
+
+from sqlalchemy import create_engine, update
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.configs.db_config import MySQLBase
+from app.core.catalog import PropertyCatalog
+from app.models.realty import ArchivedPropertyImage, Property
+from app.repo import realty as realty_repo
+
+engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+MySQLBase.metadata.create_all(bind=engine)
+Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+LONG_AGO = datetime.datetime(2020, 1, 1)
+
+
+def _seed(db):
+    for i, available in enumerate([True, False, False, True]):
+        prop = realty_repo.create_property(db, dict(
+            property_name=f"Listing {i}", location="Bellandur", phone="9876543210",
+            property_type="PG", listing_type="rent", single_price=9000, is_available=available,
+        ))
+        image = {"image_url": f"https://img.example.com/{i}.jpg", "is_primary": True}
+        realty_repo.create_property_image(db, image, prop.id)
+    # Listing 2 is unavailable but recently touched, so it stays
+    db.execute(update(Property).where(Property.id.in_([1, 2, 4])).values(updated_at=LONG_AGO))
+    db.commit()
+
+
+def test_archive_moves_old_unavailable_listings_and_restore_brings_them_back():
+    with Session() as db:
+        _seed(db)
+        catalog = PropertyCatalog()
+        catalog.refresh(db)
+
+        before = datetime.datetime.now() - datetime.timedelta(days=30)
+        assert realty_repo.archive_properties(db, before, 10) == [2]
+        db.commit()
+        assert realty_repo.archive_properties(db, before, 10) == []
+        assert realty_repo.get_property_by_id(db, 2) is None
+        assert realty_repo.get_property_images(db, 2) == []
+
+        archived = realty_repo.get_archived_property(db, 2)
+        assert archived.property_name == "Listing 1"
+        assert [image.image_url for image in archived.images] == ["https://img.example.com/1.jpg"]
+        assert archived.primary_image_url == "https://img.example.com/1.jpg"
+        catalog.refresh(db)
+        assert [row["id"] for row in catalog.query()] == [1, 3, 4]
+
+        assert realty_repo.restore_property(db, 2) is True
+        assert realty_repo.restore_property(db, 2) is False
+        restored = realty_repo.get_property_by_id(db, 2)
+        assert [image.image_url for image in restored.images] == ["https://img.example.com/1.jpg"]
+        assert restored.updated_at > LONG_AGO
+        assert db.query(ArchivedPropertyImage).count() == 0
+        # The restore outlives the archive event still inside the catalog's outbox overlap
+        catalog.refresh(db)
+        catalog.refresh(db)
+        assert [row["id"] for row in catalog.query()] == [1, 2, 3, 4]
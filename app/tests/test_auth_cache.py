@@ -0,0 +1,83 @@
+import asyncio
+
+import fakeredis
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.configs.db_config import MySQLBase
+from app.core import auth_cache
+from app.core.auth_cache import (
+    AUTH_INVALIDATION_CHANNEL, AuthInvalidationListener, cache_payload, cache_user, get_cached_payload,
+    get_cached_user,
+)
+from app.models.user import User
+
+engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+MySQLBase.metadata.create_all(bind=engine)
+Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+@pytest.fixture
+def server(monkeypatch):
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(auth_cache, "get_redis_client", lambda: fakeredis.FakeRedis(server=server, decode_responses=True))
+    monkeypatch.setattr(
+        auth_cache, "get_async_redis_client", lambda: fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+    )
+    auth_cache.clear_caches()
+    yield server
+    auth_cache.clear_caches()
+
+
+def _cached_user(db, email: str) -> User:
+    user = User(email=email, hashed_password="old-hash")
+    db.add(user)
+    db.commit()
+    cache_user(user)
+    cache_payload(f"token-{email}", {"sub": email})
+    return user
+
+
+@pytest.mark.parametrize("field, value", [("is_active", False), ("hashed_password", "new-hash")])
+def test_credential_change_is_dropped_locally_and_broadcast(server, field, value):
+    pubsub = fakeredis.FakeRedis(server=server, decode_responses=True).pubsub()
+    pubsub.subscribe(AUTH_INVALIDATION_CHANNEL)
+    assert pubsub.get_message(timeout=1)["type"] == "subscribe"
+    email = f"{field}@example.com"
+    with Session() as db:
+        user = _cached_user(db, email)
+        assert get_cached_user(db, email) is not None
+
+        setattr(user, field, value)
+        db.commit()
+        assert get_cached_user(db, email) is None
+        assert get_cached_payload(f"token-{email}") is None
+    assert pubsub.get_message(timeout=1)["data"] == email
+
+
+def test_listener_applies_invalidations_from_other_workers(server, monkeypatch):
+    listener = AuthInvalidationListener(retry=0.01)
+    monkeypatch.setattr(auth_cache, "auth_invalidation", listener)
+
+    async def scenario():
+        listener.start()
+        # Not subscribed yet: caches are bypassed rather than possibly stale
+        assert not listener.trusted
+        while not listener.subscribed:
+            await asyncio.sleep(0.01)
+        with Session() as db:
+            _cached_user(db, "other@example.com")
+            assert get_cached_user(db, "other@example.com") is not None
+            # Another worker commits a deactivation and publishes it
+            fakeredis.FakeRedis(server=server).publish(AUTH_INVALIDATION_CHANNEL, "other@example.com")
+            for _ in range(100):
+                if get_cached_payload("token-other@example.com") is None:
+                    break
+                await asyncio.sleep(0.01)
+            assert get_cached_user(db, "other@example.com") is None
+            assert get_cached_payload("token-other@example.com") is None
+        await listener.stop()
+
+    asyncio.run(scenario())
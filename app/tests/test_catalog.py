@@ -0,0 +1,84 @@
+import itertools
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.configs.db_config import MySQLBase
+from app.api.realty import _sparse_catalog_page
+from app.core.catalog import CATALOG_COLUMNS, PropertyCatalog
+from app.repo import realty as realty_repo
+
+engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+MySQLBase.metadata.create_all(bind=engine)
+Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def _seed(db):
+    for i, (property_type, listing_type, available) in enumerate(
+        itertools.product(["PG", "1BHK", "2BHK"], ["rent", "buy"], [True, False, None])
+    ):
+        realty_repo.create_property(db, dict(
+            property_name=f"Listing {i}", location="Bellandur", phone="9876543210", description=f"Long text {i}",
+            property_type=property_type, listing_type=listing_type, is_available=available,
+            single_price=8000 + 1000 * i if property_type == "PG" else None,
+            private_price=None if property_type == "PG" else 15000 + 1000 * i,
+        ))
+
+
+def _sql_ids(db, **filters):
+    return [p.id for p in realty_repo.get_properties(db, include="none", **filters)]
+
+
+def _catalog_ids(catalog, **filters):
+    return [row["id"] for row in catalog.query(**filters)]
+
+
+def test_catalog_matches_sql_and_follows_changes():
+    with Session() as db:
+        _seed(db)
+        catalog = PropertyCatalog()
+        catalog.refresh(db)
+        cases = [
+            {}, {"property_type": "PG"}, {"listing_type": "buy", "is_available": True},
+            {"is_available": False}, {"min_price": 10000, "max_price": 20000}, {"skip": 3, "limit": 4},
+        ]
+        for filters in cases:
+            assert _catalog_ids(catalog, **filters) == _sql_ids(db, **filters), filters
+
+        realty_repo.update_property(db, realty_repo.get_property_by_id(db, 1), {"property_type": "2BHK"})
+        realty_repo.delete_property(db, realty_repo.get_property_by_id(db, 2))
+        realty_repo.create_property(db, dict(
+            property_name="New", location="HSR Layout", phone="9876543210",
+            property_type="PG", listing_type="rent", single_price=9000,
+        ))
+        catalog.refresh(db)
+        for filters in cases:
+            assert _catalog_ids(catalog, **filters) == _sql_ids(db, **filters), filters
+        assert 2 not in _catalog_ids(catalog)
+
+
+def test_catalog_defers_to_sql_until_loaded_or_when_stale():
+    catalog = PropertyCatalog(max_staleness=0)
+    assert catalog.query() is None
+    with Session() as db:
+        catalog.refresh(db)
+    catalog.max_staleness = -1
+    assert catalog.query() is None
+
+
+def test_catalog_keeps_card_columns_and_reads_the_rest_per_page():
+    with Session() as db:
+        catalog = PropertyCatalog()
+        catalog.refresh(db)
+        rows = catalog.query(property_type="PG", limit=2)
+        assert all(set(row) == set(CATALOG_COLUMNS) for row in rows)
+
+        card = _sparse_catalog_page(db, rows, ["property_name", "single_price"])
+        assert [(p.property_name, p.single_price) for p in card] == [
+            (row["property_name"], row["single_price"]) for row in rows
+        ]
+        full = _sparse_catalog_page(db, rows, None)
+        assert [p.id for p in full] == [row["id"] for row in rows]
+        assert [p.description for p in full] == [row["property_name"].replace("Listing", "Long text") for row in rows]
+        assert {p.phone for p in full} == {"9876543210"}
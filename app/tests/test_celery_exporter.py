@@ -0,0 +1,37 @@
+from app.configs.celery_config import QUEUE_MAINTENANCE, QUEUE_MODERATION, celery
+from app.monitoring.celery_exporter import TaskEventMetrics, queue_keys
+from app.monitoring.prometheus import CELERY_TASK_RETRIES, CELERY_TASK_WAIT, CELERY_TASKS
+
+
+def _sample(metric, suffix, **labels):
+    for family in metric.collect():
+        for sample in family.samples:
+            if sample.name.endswith(suffix) and sample.labels.items() >= labels.items():
+                return sample.value
+    return 0.0
+
+
+def test_tasks_are_routed_to_their_queues():
+    router = celery.amqp.router
+    assert router.route({}, "moderate_text_task")["queue"].name == QUEUE_MODERATION
+    assert router.route({}, "purge_closed_leads")["queue"].name == QUEUE_MAINTENANCE
+    assert queue_keys("moderation") == [(0, "moderation"), (3, "moderation:3"), (6, "moderation:6"), (9, "moderation:9")]
+
+
+def test_event_metrics_track_wait_outcome_and_retries():
+    metrics = TaskEventMetrics()
+    handlers = metrics.handlers()
+    labels = dict(task="export_test_task", queue="moderation")
+    waits = _sample(CELERY_TASK_WAIT, "_count", **labels)
+
+    handlers["task-sent"]({"uuid": "a", "name": "export_test_task", "queue": "moderation", "timestamp": 100.0})
+    handlers["task-received"]({"uuid": "a", "name": "export_test_task", "timestamp": 101.0})
+    handlers["task-started"]({"uuid": "a", "timestamp": 102.5})
+    handlers["task-retried"]({"uuid": "a", "timestamp": 103.0})
+    handlers["task-started"]({"uuid": "a", "timestamp": 104.0})
+    handlers["task-succeeded"]({"uuid": "a", "timestamp": 105.0, "runtime": 1.0})
+
+    assert _sample(CELERY_TASK_WAIT, "_count", **labels) == waits + 2
+    assert _sample(CELERY_TASK_WAIT, "_sum", **labels) >= 3.5
+    assert _sample(CELERY_TASK_RETRIES, "_total", task="export_test_task") == 1
+    assert _sample(CELERY_TASKS, "_total", task="export_test_task", state="succeeded") == 1
@@ -0,0 +1,69 @@
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.configs.db_config import MySQLBase
+from app.core import response_cache
+from app.middleware.compression import CompressionMiddleware, skip_compression
+from app.repo import realty as realty_repo
+from app.utils.cache import TTLCache
+from app.utils.compression import negotiate_encoding
+
+app = FastAPI()
+app.add_middleware(CompressionMiddleware, minimum_size=100)
+
+
+@app.get("/large")
+def large():
+    return {"data": "x" * 1000}
+
+
+@app.get("/small")
+def small():
+    return {"ok": True}
+
+
+@app.get("/opted-out", dependencies=[Depends(skip_compression)])
+def opted_out():
+    return {"data": "x" * 1000}
+
+
+client = TestClient(app)
+
+
+def test_negotiation_honours_quality_values():
+    assert negotiate_encoding("gzip, deflate") == "gzip"
+    assert negotiate_encoding("gzip;q=0, identity") is None
+    assert negotiate_encoding("*") is not None
+    assert negotiate_encoding("") is None
+
+
+def test_large_json_is_gzipped():
+    response = client.get("/large", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert int(response.headers["content-length"]) < 1000
+    assert response.json() == {"data": "x" * 1000}
+
+
+def test_small_and_opted_out_responses_are_not_compressed():
+    assert "content-encoding" not in client.get("/small", headers={"Accept-Encoding": "gzip"}).headers
+    assert "content-encoding" not in client.get("/opted-out", headers={"Accept-Encoding": "gzip"}).headers
+
+
+def test_set_based_listing_writes_clear_the_page_cache(monkeypatch):
+    monkeypatch.setattr(response_cache, "_cache", TTLCache(maxsize=10, ttl=60))
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    MySQLBase.metadata.create_all(bind=engine)
+    with sessionmaker(bind=engine)() as db:
+        response_cache._cache.set("/properties?", b"[]")
+        realty_repo.get_properties_by_ids(db, [1])
+        assert response_cache._cache.get("/properties?") == b"[]"
+
+        realty_repo.refresh_image_summary(db)
+        assert response_cache._cache.get("/properties?") is None
+        response_cache._cache.set("/properties?", b"[]")
+        db.commit()
+        assert response_cache._cache.get("/properties?") is None
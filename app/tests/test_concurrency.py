@@ -0,0 +1,78 @@
+import asyncio
+
+import pytest
+from starlette.requests import Request
+
+from app.core.exceptions import ServiceUnavailableError
+from app.dependencies import concurrency
+from app.dependencies.concurrency import ConcurrencyLimiter
+
+
+@pytest.fixture(autouse=True)
+def enabled(monkeypatch):
+    monkeypatch.setattr(concurrency, "ADMISSION_ENABLED", True)
+
+
+def _request(path: str) -> Request:
+    return Request({"type": "http", "method": "GET", "path": path, "query_string": b"", "headers": []})
+
+
+async def _enter(limiter: ConcurrencyLimiter, path: str):
+    admission = limiter(_request(path))
+    await admission.__anext__()
+    return admission
+
+
+async def _leave(admission) -> None:
+    with pytest.raises(StopAsyncIteration):
+        await admission.__anext__()
+
+
+def test_route_cap_sheds_with_503_and_retry_after():
+    limiter = ConcurrencyLimiter(limit=1, deadline=0.05)
+
+    async def scenario():
+        first = await _enter(limiter, "/properties")
+        with pytest.raises(ServiceUnavailableError) as rejected:
+            await _enter(limiter, "/properties")
+        assert rejected.value.status_code == 503
+        assert rejected.value.headers["Retry-After"] == "1"
+        # Other routes have their own cap
+        await _leave(await _enter(limiter, "/contacts"))
+        await _leave(first)
+        await _leave(await _enter(limiter, "/properties"))
+
+    asyncio.run(scenario())
+
+
+def test_queue_full_is_shed_without_waiting(monkeypatch):
+    monkeypatch.setattr(concurrency, "ADMISSION_QUEUE_MAX", 1)
+    limiter = ConcurrencyLimiter(limit=1, deadline=5)
+
+    async def scenario():
+        first = await _enter(limiter, "/properties")
+        waiter = asyncio.create_task(_enter(limiter, "/properties"))
+        await asyncio.sleep(0.01)
+        with pytest.raises(ServiceUnavailableError):
+            await asyncio.wait_for(_enter(limiter, "/properties"), timeout=1)
+        await _leave(first)
+        await _leave(await waiter)
+
+    asyncio.run(scenario())
+
+
+def test_global_cap_spans_routes(monkeypatch):
+    monkeypatch.setattr(concurrency, "ADMISSION_GLOBAL_LIMIT", 2)
+    limiter = ConcurrencyLimiter(limit=10, deadline=0.05)
+
+    async def scenario():
+        held = [await _enter(limiter, "/properties"), await _enter(limiter, "/contacts")]
+        with pytest.raises(ServiceUnavailableError):
+            await _enter(limiter, "/similar")
+        # The rejected request gave back its route slot
+        assert limiter._gates["GET /similar"].semaphore._value == 10
+        await _leave(held.pop())
+        await _leave(await _enter(limiter, "/similar"))
+        await _leave(held.pop())
+
+    asyncio.run(scenario())
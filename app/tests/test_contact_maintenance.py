@@ -0,0 +1,140 @@
+import datetime
+
+import fakeredis
+import pytest
+from sqlalchemy import create_engine, update
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.configs.db_config import MySQLBase
+from app.models.realty import Contact, OutboxEvent
+from app.monitoring.prometheus import ContactMaintenanceCollector
+from app.repo import realty as realty_repo
+from app.tasks import contact_tasks
+
+engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+MySQLBase.metadata.create_all(bind=engine)
+Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+LONG_AGO = datetime.datetime(2020, 1, 1)
+
+
+def _seed(db):
+    for i, status in enumerate(["new", "new", "closed", "contacted", "closed", "new"]):
+        realty_repo.create_contact(db, dict(
+            name_=f"Lead {i}", phone="9876543210", email=f"lead{i}@example.com",
+            message="Is this still available?", status=status,
+        ))
+    db.execute(update(Contact).where(Contact.id != 6).values(created_at=LONG_AGO, updated_at=LONG_AGO))
+    db.commit()
+
+
+def _statuses(db):
+    return [c.status for c in db.query(Contact).order_by(Contact.id)]
+
+
+def test_maintenance_only_touches_its_id_range_and_matching_rows():
+    with Session() as db:
+        _seed(db)
+        before = datetime.datetime.now() - datetime.timedelta(days=1)
+
+        # A range covering only ids 1-2
+        assert realty_repo.close_stale_leads(db, 0, 2, before) == 1
+        db.commit()
+        assert _statuses(db) == ["closed", "new", "closed", "contacted", "closed", "new"]
+        assert realty_repo.close_stale_leads(db, 2, 7, before) == 1
+        db.commit()
+        assert _statuses(db) == ["closed", "closed", "closed", "contacted", "closed", "new"]
+
+        # Only 3 and 5 were closed long ago; 1 and 2 were just closed
+        assert realty_repo.anonymize_closed_leads(db, 0, 7, before) == 2
+        db.commit()
+        assert realty_repo.anonymize_closed_leads(db, 0, 7, before) == 0
+        anonymized = realty_repo.get_contact_by_id(db, 3)
+        assert (anonymized.name_, anonymized.email, anonymized.message) == ("Anonymized", "anonymized@example.com", "")
+        assert anonymized.anonymized_at is not None
+        assert realty_repo.get_contact_by_id(db, 1).email == "lead0@example.com"
+
+        db.execute(update(Contact).where(Contact.id == 3).values(updated_at=LONG_AGO))
+        assert realty_repo.purge_closed_leads(db, 0, 7, before) == 1
+        db.commit()
+        assert [c.id for c in db.query(Contact).order_by(Contact.id)] == [1, 2, 4, 5, 6]
+        events = db.query(OutboxEvent).filter(OutboxEvent.event_type != "created").order_by(OutboxEvent.id).all()
+        assert [(e.aggregate_id, e.event_type) for e in events] == [
+            (1, "updated"), (2, "updated"), (3, "updated"), (5, "updated"), (3, "deleted"),
+        ]
+        assert events[2].payload == {"id": 3, "changed": ["anonymized_at", "email", "message", "name_", "phone"]}
+
+
+def test_anonymize_scrubs_personal_data_from_older_events():
+    with Session() as db:
+        contact = realty_repo.create_contact(db, dict(
+            name_="Ravi", phone="9876543210", email="ravi@example.com", message="Still free?", status="closed",
+        ))
+        # Events written before they were trimmed to field names
+        db.add_all([
+            OutboxEvent(aggregate="contact", aggregate_id=contact.id, event_type="created",
+                        payload={"id": contact.id, "name_": "Ravi", "email": "ravi@example.com"}),
+            OutboxEvent(aggregate="contact", aggregate_id=contact.id, event_type="updated",
+                        payload={"id": contact.id, "phone": "9876543210"}),
+        ])
+        db.execute(update(Contact).where(Contact.id == contact.id).values(updated_at=LONG_AGO))
+        db.commit()
+
+        assert realty_repo.anonymize_closed_leads(db, contact.id, contact.id + 1, datetime.datetime.now()) == 1
+        db.commit()
+        payloads = [e.payload for e in db.query(OutboxEvent).filter(
+            OutboxEvent.aggregate == "contact", OutboxEvent.aggregate_id == contact.id
+        ).order_by(OutboxEvent.id)]
+        assert payloads == [
+            {"id": contact.id},
+            {"id": contact.id},
+            {"id": contact.id, "changed": ["phone"]},
+            {"id": contact.id, "changed": ["anonymized_at", "email", "message", "name_", "phone"]},
+        ]
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    client = fakeredis.FakeRedis(decode_responses=True)
+    monkeypatch.setattr(contact_tasks, "get_redis_client", lambda: client)
+    monkeypatch.setattr(contact_tasks, "new_mysql_session", Session)
+    monkeypatch.setattr(contact_tasks, "CONTACT_MAINTENANCE_CHUNK", 2)
+    monkeypatch.setattr(contact_tasks, "CONTACT_MAINTENANCE_PAUSE", 0)
+    monkeypatch.setattr(contact_tasks.realty_repo, "get_max_contact_id", lambda db: 5)
+    return client
+
+
+def test_progress_is_exported_from_redis(redis):
+    ranges = []
+
+    def apply(db, start_id, end_id, before):
+        ranges.append((start_id, end_id))
+        return 1
+
+    assert contact_tasks.run_in_chunks("purge", apply, LONG_AGO) == 3
+    assert ranges == [(0, 2), (2, 4), (4, 6)]
+    assert not redis.exists("maintenance:contacts:purge:lock")
+    samples = {
+        (sample.name, sample.labels["job"]): sample.value
+        for family in ContactMaintenanceCollector(lambda: redis).collect() for sample in family.samples
+    }
+    assert samples[("contact_maintenance_rows_total", "purge")] == 3
+    assert samples[("contact_maintenance_chunk_seconds_count", "purge")] == 3
+    # Finished runs have no position
+    assert ("contact_maintenance_position", "purge") not in samples
+
+
+def test_run_stops_and_keeps_the_lock_of_a_run_that_took_over(redis):
+    ranges = []
+
+    def apply(db, start_id, end_id, before):
+        ranges.append((start_id, end_id))
+        # Our lock expired and another run claimed the job
+        redis.set("maintenance:contacts:purge:lock", "other-run")
+        return 0
+
+    assert contact_tasks.run_in_chunks("purge", apply, LONG_AGO) == 0
+    assert ranges == [(0, 2)]
+    assert redis.get("maintenance:contacts:purge:lock") == "other-run"
+    assert contact_tasks.read_progress(redis)["purge"]["position"] == 2
@@ -0,0 +1,106 @@
+import json
+
+import fakeredis
+import pytest
+from fastapi import APIRouter, FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from starlette.requests import Request
+
+from app.core import idempotency
+from app.core.idempotency import IdempotentRoute, _redis_key, request_fingerprint
+
+
+def _request(path: str, content_type: str, query: str = "") -> Request:
+    return Request({
+        "type": "http", "method": "POST", "path": path, "query_string": query.encode(),
+        "headers": [(b"content-type", content_type.encode())],
+    })
+
+
+def _multipart(boundary: str) -> bytes:
+    return (
+        f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"a.png\"\r\n\r\n"
+        f"PNGDATA\r\n--{boundary}--\r\n"
+    ).encode()
+
+
+def test_fingerprint_ignores_multipart_boundary_but_not_content():
+    first = request_fingerprint(_request("/upload", "multipart/form-data; boundary=aaa111"), _multipart("aaa111"))
+    retry = request_fingerprint(_request("/upload", "multipart/form-data; boundary=bbb222"), _multipart("bbb222"))
+    assert first == retry
+
+    other = _multipart("ccc333").replace(b"PNGDATA", b"GIFDATA")
+    assert request_fingerprint(_request("/upload", "multipart/form-data; boundary=ccc333"), other) != first
+
+
+def test_fingerprint_covers_path_query_and_body():
+    body = b'{"property_name": "Sunrise PG"}'
+    base = request_fingerprint(_request("/realty/properties", "application/json"), body)
+    assert request_fingerprint(_request("/realty/contacts", "application/json"), body) != base
+    assert request_fingerprint(_request("/realty/properties", "application/json", "x=1"), body) != base
+    assert request_fingerprint(_request("/realty/properties", "application/json"), body + b" ") != base
+
+
+BODY = b'{"property_name": "Sunrise PG"}'
+
+
+@pytest.fixture
+def api(monkeypatch):
+    redis = fakeredis.FakeAsyncRedis(decode_responses=True)
+    monkeypatch.setattr(idempotency, "IDEMPOTENCY_ENABLED", True)
+    monkeypatch.setattr(idempotency, "IDEMPOTENCY_LOCK_WAIT", 0.1)
+    monkeypatch.setattr(idempotency, "get_async_redis_client", lambda: redis)
+    calls = []
+    router = APIRouter(route_class=IdempotentRoute)
+
+    @router.post("/properties", status_code=201)
+    async def create(payload: dict):
+        calls.append(payload)
+        if payload.get("property_name") == "bad":
+            raise HTTPException(status_code=400, detail="bad")
+        return {"id": len(calls), **payload}
+
+    app = FastAPI()
+    app.include_router(router)
+    with TestClient(app) as client:
+        yield client, calls, redis
+
+
+def _post(client, key: str, body: bytes = BODY):
+    return client.post("/properties", content=body, headers={"Idempotency-Key": key, "Content-Type": "application/json"})
+
+
+def test_first_request_runs_and_retries_replay_its_response(api):
+    client, calls, _ = api
+    first = _post(client, "key-1")
+    assert first.status_code == 201 and "Idempotent-Replayed" not in first.headers
+    retry = _post(client, "key-1")
+    assert retry.status_code == 201
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert retry.json() == first.json() == {"id": 1, "property_name": "Sunrise PG"}
+    assert len(calls) == 1
+    # A new key is a new request
+    assert _post(client, "key-2").json()["id"] == 2
+
+
+def test_key_reused_for_a_different_request_is_422(api):
+    client, calls, _ = api
+    _post(client, "key-1")
+    assert _post(client, "key-1", b'{"property_name": "Other PG"}').status_code == 422
+    assert len(calls) == 1
+
+
+def test_duplicate_of_a_request_still_running_is_409(api):
+    client, calls, redis = api
+    # The first request is mid-flight in another worker: its claim holds the key
+    fingerprint = request_fingerprint(_request("/properties", "application/json"), BODY)
+    client.portal.call(redis.set, _redis_key("key-1"), json.dumps({"fingerprint": fingerprint, "claim": "other"}))
+    assert _post(client, "key-1").status_code == 409
+    assert calls == []
+
+
+def test_errors_are_not_stored_so_the_key_can_be_retried(api):
+    client, calls, _ = api
+    assert _post(client, "key-1", b'{"property_name": "bad"}').status_code == 400
+    assert _post(client, "key-1", b'{"property_name": "bad"}').status_code == 400
+    assert len(calls) == 2
@@ -0,0 +1,86 @@
+import fakeredis
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.configs.db_config import MySQLBase
+from app.core import outbox
+from app.models.realty import OutboxEvent
+from app.repo import realty as realty_repo
+
+engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+MySQLBase.metadata.create_all(bind=engine)
+Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+PROPERTY = dict(property_name="Sunrise PG", location="Bellandur", phone="9876543210",
+                property_type="PG", single_price=9000, listing_type="rent")
+
+
+def test_every_write_adds_an_outbox_row_in_its_transaction():
+    with Session() as db:
+        prop = realty_repo.create_property(db, PROPERTY)
+        image = realty_repo.create_property_image(db, {"image_url": "https://img.example.com/0.jpg"}, prop.id)
+        realty_repo.update_property(db, prop, {"single_price": 9500})
+        realty_repo.delete_property_image(db, image)
+
+        events = realty_repo.get_events_after(db, 0, 100)
+        assert [(e.aggregate, e.event_type) for e in events] == [
+            ("property", "created"), ("property_image", "created"),
+            ("property", "updated"), ("property_image", "deleted"),
+        ]
+        assert events[0].payload["single_price"] == 9000
+        assert events[2].payload == {"id": prop.id, "single_price": 9500}
+        assert events[3].payload == {"id": image.id, "property_id": prop.id}
+
+        pending = realty_repo.get_unpublished_events(db, 2)
+        realty_repo.mark_events_published(db, [e.id for e in pending])
+        db.commit()
+        assert [e.id for e in realty_repo.get_unpublished_events(db, 10)] == [events[2].id, events[3].id]
+        assert db.query(OutboxEvent).count() == 4
+
+
+def test_contact_events_carry_no_personal_data():
+    with Session() as db:
+        contact = realty_repo.create_contact(db, dict(
+            name_="Asha", phone="9876543210", email="asha@example.com", message="Call me after 6",
+        ))
+        realty_repo.update_contact(db, contact, {"phone": "9123456780", "status": "contacted"})
+        realty_repo.delete_contact(db, contact)
+
+        events = db.query(OutboxEvent).filter(OutboxEvent.aggregate == "contact").order_by(OutboxEvent.id).all()
+        assert [(e.event_type, e.payload) for e in events] == [
+            ("created", {"id": contact.id}),
+            ("updated", {"id": contact.id, "changed": ["phone", "status"]}),
+            ("deleted", {"id": contact.id}),
+        ]
+
+
+def test_scrub_contacts_trims_outbox_rows_and_drops_stream_entries():
+    redis = fakeredis.FakeRedis(decode_responses=True)
+    with Session() as db:
+        legacy = OutboxEvent(aggregate="contact", aggregate_id=41, event_type="updated",
+                             payload={"id": 41, "email": "old@example.com"})
+        db.add(legacy)
+        realty_repo.create_contact(db, dict(
+            name_="Meera", phone="9876543210", email="meera@example.com", message="Is parking included?",
+        ))
+        db.commit()
+        while outbox.relay_once(db, redis):
+            pass
+
+        assert outbox.scrub_contact_outbox(db, batch_size=1) == 1
+        db.refresh(legacy)
+        assert legacy.payload == {"id": 41, "changed": ["email"]}
+        assert outbox.scrub_contact_stream(redis) == 1
+        events = [event for batch in outbox.read_stream(redis) for _, event in batch if event["aggregate"] == "contact"]
+        assert legacy.id not in [event["event_id"] for event in events]
+        assert events and not any(realty_repo.contact_payload_has_personal_data(event["payload"]) for event in events)
+
+
+def test_relay_lag_drops_to_zero_once_drained():
+    redis = fakeredis.FakeRedis(decode_responses=True)
+    with Session() as db:
+        while outbox.relay_once(db, redis):
+            pass
+    assert REGISTRY.get_sample_value("outbox_relay_lag_seconds") == 0
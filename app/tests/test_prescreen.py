@@ -0,0 +1,70 @@
+import fakeredis
+from prometheus_client import CollectorRegistry
+
+from app.core.prescreen import (
+    ALLOW, DEFER, DENY, Prescreener, TermMatcher, is_disagreement, read_shadow_counts, record_shadow_check
+)
+from app.monitoring.prometheus import PrescreenShadowCollector
+
+prescreener = Prescreener(["scam", "wire money", "he", "hers"], ["Is the room still available?"])
+
+
+def test_matcher_reports_whole_word_matches_only():
+    matcher = TermMatcher(["he", "hers", "she"])
+    assert matcher.find("ushers") == []
+    assert matcher.find("she said hers") == [(0, "she"), (9, "hers")]
+
+
+def test_banned_term_is_denied():
+    verdict = prescreener.screen("Please WIRE   money to this account, not a SCAM")
+    assert verdict.decision == DENY
+    assert verdict.matched_terms == ["scam", "wire money"]
+    assert verdict.to_result()["results"][0]["flagged"] is True
+
+
+def test_only_allow_listed_phrases_are_allowed():
+    verdict = prescreener.screen("is the room   still available")
+    assert verdict.decision == ALLOW
+    assert verdict.flagged is False
+    assert prescreener.screen("I will kill you").decision == DEFER
+    assert prescreener.screen("Is the room still available? Call me").decision == DEFER
+    assert Prescreener([]).screen("hi").decision == DEFER
+
+
+def test_deny_threshold_defers_single_match():
+    strict = Prescreener(["scam", "fraud"], deny_min_matches=2)
+    assert strict.screen("is this a scam").decision == DEFER
+    assert strict.screen("scam and fraud").decision == DENY
+
+
+def test_disagreement_against_model_response():
+    assert is_disagreement(DENY, {"results": [{"flagged": False}]}) is True
+    assert is_disagreement(ALLOW, {"results": [{"flagged": False}]}) is False
+    assert is_disagreement(ALLOW, {}) is None
+
+
+def test_shadow_disagreement_is_counted_and_exported():
+    redis = fakeredis.FakeRedis(decode_responses=True)
+    assert record_shadow_check(redis, DENY, {"results": [{"flagged": False}]}) is True
+    assert record_shadow_check(redis, DENY, {"results": [{"flagged": True}]}) is False
+    assert record_shadow_check(redis, ALLOW, {}) is None
+    assert read_shadow_counts(redis) == {"checked": {DENY: 2}, "disagreed": {DENY: 1}}
+
+    samples = {
+        (sample.name, sample.labels["decision"]): sample.value
+        for family in PrescreenShadowCollector(lambda: redis).collect() for sample in family.samples
+    }
+    assert samples == {
+        ("moderation_prescreen_shadow_checks_total", DENY): 2,
+        ("moderation_prescreen_disagreements_total", DENY): 1,
+    }
+
+
+def test_shadow_collector_reads_redis_only_when_scraped():
+    redis = fakeredis.FakeRedis(decode_responses=True)
+    reads = []
+    registry = CollectorRegistry(auto_describe=True)  # as the default REGISTRY
+    registry.register(PrescreenShadowCollector(lambda: reads.append(1) or redis))
+    assert reads == []
+    list(registry.collect())
+    assert reads == [1]
@@ -0,0 +1,71 @@
+import asyncio
+import time
+
+import fakeredis
+import pytest
+from starlette.requests import Request
+
+from app.core.exceptions import RateLimitExceededError
+from app.dependencies import rate_limit
+from app.dependencies.rate_limit import RateLimiter
+
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+
+@pytest.fixture
+def redis(server, monkeypatch):
+    client = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+    monkeypatch.setattr(rate_limit, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(rate_limit, "get_async_redis_client", lambda: client)
+    return client
+
+
+def _request(host: str = "10.0.0.1") -> Request:
+    return Request({
+        "type": "http", "method": "GET", "path": "/realty/properties", "query_string": b"",
+        "headers": [], "client": (host, 1234),
+    })
+
+
+def _admitted(limiter: RateLimiter, host: str = "10.0.0.1") -> bool:
+    try:
+        asyncio.run(limiter(_request(host)))
+        return True
+    except RateLimitExceededError:
+        return False
+
+
+def test_bucket_rejects_when_empty_and_refills(redis):
+    limiter = RateLimiter("5/second", scope="test")
+    assert [_admitted(limiter) for _ in range(6)] == [True] * 5 + [False]
+    # Buckets are per client
+    assert _admitted(limiter, "10.0.0.2")
+    time.sleep(0.25)
+    assert _admitted(limiter)
+    assert not _admitted(limiter)
+
+
+def test_hot_key_leases_tokens_locally(redis, monkeypatch):
+    monkeypatch.setattr(rate_limit, "RATE_LIMIT_HOT_THRESHOLD", 2)
+    monkeypatch.setattr(rate_limit, "RATE_LIMIT_LEASE_SIZE", 10)
+    limiter = RateLimiter("100/minute", scope="test")
+    assert _admitted(limiter) and _admitted(limiter)
+    tokens = float(asyncio.run(redis.hget("ratelimit:test:ip:10.0.0.1", "tokens")))
+    # The second request took a batch of ten; the next nine never reach Redis
+    assert [_admitted(limiter) for _ in range(9)] == [True] * 9
+    assert float(asyncio.run(redis.hget("ratelimit:test:ip:10.0.0.1", "tokens"))) == tokens
+
+
+def test_fails_open_and_backs_off_when_redis_errors(redis, server):
+    server.connected = False
+    limiter = RateLimiter("1/minute", scope="test")
+    assert [_admitted(limiter) for _ in range(3)] == [True] * 3
+    assert limiter._redis_down_until > time.monotonic()
+
+    server.connected = True
+    # Still inside the backoff window, so Redis is not consulted yet
+    assert _admitted(limiter)
+    assert not asyncio.run(redis.exists("ratelimit:test:ip:10.0.0.1"))
@@ -0,0 +1,32 @@
+from kombu.serialization import dumps, loads
+
+from app.core.result_codec import ZLIB_JSON, compact_moderation_result, register_zlib_json
+
+RESPONSE = {
+    "id": "modr-1",
+    "model": "omni-moderation-latest",
+    "results": [{
+        "flagged": True,
+        "categories": {"harassment": True, "violence": False, "illicit": None},
+        "category_scores": {"harassment": 0.912345678, "violence": 0.000012345, "illicit": None},
+        "category_applied_input_types": {"harassment": ["text"], "violence": ["text"]},
+    }],
+}
+
+
+def test_zlib_json_round_trips_through_kombu():
+    register_zlib_json()
+    content_type, encoding, data = dumps(RESPONSE, serializer=ZLIB_JSON)
+    assert encoding == "binary"
+    assert len(data) < len(dumps(RESPONSE, serializer="json")[2])
+    assert loads(data, content_type, encoding, accept=[content_type]) == RESPONSE
+
+
+def test_compact_projection_keeps_flags_and_rounded_scores():
+    (item,) = compact_moderation_result(RESPONSE)["results"]
+    assert item == {
+        "flagged": True,
+        "categories": {"harassment": True, "violence": False},
+        "category_scores": {"harassment": 0.9123, "violence": 0.0},
+    }
+    assert compact_moderation_result({"error": "boom"}) == {"error": "boom"}
@@ -0,0 +1,37 @@
+from app.core.similar import SimilarityIndex
+
+
+def _row(property_id, location="Bellandur", property_type="PG", price=9000, listing_type="rent", **extra):
+    row = dict(id=property_id, location=location, property_type=property_type, furnishing="semi_furnished",
+               listing_type=listing_type, is_available=True, private_price=None, single_price=price,
+               double_price=None, triple_price=None)
+    row.update(extra)
+    return row
+
+
+def test_ranks_by_location_type_and_price_and_filters_candidates():
+    index = SimilarityIndex()
+    index.rebuild([
+        _row(1),
+        _row(2, price=9500),
+        _row(3, price=30000),
+        _row(4, location="Whitefield", price=9000),
+        _row(5, property_type="2BHK", price=9000),
+        _row(6, listing_type="buy"),
+        _row(7, is_available=False),
+    ])
+    # Weights: location 3 > property type 2; a 3x price gap outweighs both
+    assert index.similar(1, k=4) == [2, 5, 4, 3]
+    assert index.similar(99) is None
+    assert index.similar(99, k=1, row=_row(99, price=29000)) == [3]
+
+
+def test_incremental_upsert_and_remove():
+    index = SimilarityIndex()
+    index.rebuild([_row(1), _row(2, location="Whitefield")])
+    index.upsert(_row(3))
+    assert index.similar(1, k=1) == [3]
+    index.upsert(_row(3, location="Hebbal", property_type="1BHK"))
+    assert index.similar(1, k=1) == [2]
+    index.remove(2)
+    assert index.similar(1) == [3]
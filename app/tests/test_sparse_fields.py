@@ -0,0 +1,96 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.api.realty import realty_router
+from app.configs.db_config import MySQLBase, get_mysql_db
+from app.core.response_cache import invalidate_responses
+from app.models.realty import Property, PropertyImage
+
+engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+MySQLBase.metadata.create_all(bind=engine)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+statements = []
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _capture(conn, cursor, statement, parameters, context, executemany):
+    statements.append(statement)
+
+
+def override_get_mysql_db():
+    db = TestingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+app = FastAPI()
+app.include_router(realty_router, prefix="/api/v1")
+app.dependency_overrides[get_mysql_db] = override_get_mysql_db
+client = TestClient(app)
+
+with TestingSessionLocal() as db:
+    db.add(Property(
+        property_name="Sunrise PG", location="Bellandur", phone="9876543210", description="x" * 500,
+        property_type="PG", single_price=9000, listing_type="rent", is_available=True,
+        images=[
+            PropertyImage(image_url="https://img.example.com/1.jpg", is_primary=False, sort_order=1),
+            PropertyImage(image_url="https://img.example.com/0.jpg", is_primary=True, sort_order=0),
+        ],
+    ))
+    db.commit()
+
+
+def get(url):
+    invalidate_responses()
+    statements.clear()
+    return client.get(url)
+
+
+def test_fields_are_pushed_into_the_select():
+    response = get("/api/v1/realty/properties?fields=property_name,prices&include=none")
+    assert response.status_code == 200
+    assert response.json() == [{
+        "id": 1, "property_name": "Sunrise PG",
+        "private_price": None, "single_price": 9000.0, "double_price": None, "triple_price": None,
+    }]
+    assert len(statements) == 1
+    assert "description" not in statements[0] and "property_images" not in statements[0]
+
+
+def test_primary_image_only():
+    body = get("/api/v1/realty/properties/1?fields=location&include=primary_image").json()
+    assert body["location"] == "Bellandur"
+    assert body["primary_image"]["image_url"].endswith("/0.jpg")
+    assert "images" not in body and "description" not in body
+
+
+def test_default_response_is_unchanged_and_unknown_fields_are_rejected():
+    body = get("/api/v1/realty/properties/1").json()
+    assert len(body["images"]) == 2 and body["description"] == "x" * 500
+    assert get("/api/v1/realty/properties?fields=secret").status_code == 422
+
+
+def test_card_fields_follow_image_writes_without_reading_images():
+    created = client.post("/api/v1/realty/properties/1/images", json={
+        "image_url": "https://img.example.com/2.jpg", "is_primary": False, "sort_order": 2,
+    })
+    assert created.status_code == 201
+    card = get("/api/v1/realty/properties?fields=card&include=none").json()[0]
+    assert card["primary_image_url"].endswith("/0.jpg") and card["image_count"] == 3
+    assert not any("property_images" in statement for statement in statements)
+
+    # Deleting the primary image promotes the next one by sort order
+    assert client.delete("/api/v1/realty/images/2").status_code == 204
+    card = get("/api/v1/realty/properties?fields=card&include=none").json()[0]
+    assert card["primary_image_url"].endswith("/1.jpg") and card["image_count"] == 2
+    # The embedded primary image agrees with primary_image_url, on both read paths
+    detail = get("/api/v1/realty/properties/1?fields=primary_image_url&include=primary_image").json()
+    (listed,) = get("/api/v1/realty/properties?fields=primary_image_url&include=primary_image").json()
+    for body in (detail, listed):
+        assert body["primary_image"]["image_url"] == body["primary_image_url"] == card["primary_image_url"]
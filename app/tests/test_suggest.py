@@ -0,0 +1,35 @@
+from app.core.suggest import SuggestIndex, normalize
+
+
+def _texts(results):
+    return [result["text"] for result in results]
+
+
+def test_normalization_folds_case_spacing_and_spelling_variants():
+    assert normalize("  HSR   Layout ") == normalize("hsr-layout") == normalize("hsrlayout")
+    assert normalize("Whitefeild") == normalize("Whitefield")
+    assert normalize("Kormangala") == normalize("Koramangala")
+    assert normalize("Munnekollal").startswith(normalize("Munne"))
+
+
+def test_prefix_matches_any_word_ranked_by_listing_count():
+    index = SuggestIndex()
+    index.rebuild({
+        ("location", "Munnekollal"): 3,
+        ("location", "HSR Layout"): 5,
+        ("location", "BTM Layout"): 9,
+        ("property", "Munne Residency"): 1,
+    })
+    assert _texts(index.suggest("munne")) == ["Munnekollal", "Munne Residency"]
+    assert _texts(index.suggest("Lay")) == ["BTM Layout", "HSR Layout"]
+    assert _texts(index.suggest("hsr lay")) == ["HSR Layout"]
+    assert index.suggest("   ") == []
+
+
+def test_incremental_updates_add_rerank_and_remove_terms():
+    index = SuggestIndex()
+    index.rebuild({("location", "Bellandur"): 1})
+    index.apply({("location", "Bannerghatta"): 2})
+    assert _texts(index.suggest("b")) == ["Bannerghatta", "Bellandur"]
+    index.apply({("location", "Bellandur"): 2, ("location", "Bannerghatta"): -2})
+    assert index.suggest("b") == [{"text": "Bellandur", "kind": "location", "listing_count": 3}]
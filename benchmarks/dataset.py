@@ -0,0 +1,274 @@
+"""
+Deterministic synthetic realty data for benchmarks and load tests.
+
+The same seed and profile always produce the same rows, so plans and
+latencies measured on one machine can be reproduced on another.
+
+    python -m benchmarks.dataset --url sqlite:///scale.db --properties 1000000 --images-mean 10
+    python -m benchmarks.dataset --url "$MYSQL_DATABASE_URL" --location-skew 1.3 --types "PG=60,1BHK=40"
+
+Without --url the target is MYSQL_DATABASE_URL (or the DB_* settings).
+"""
+import argparse
+import math
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional
+
+from sqlalchemy import insert, text
+from sqlalchemy.engine import Connection, Engine
+
+from app.models.realty import ArchivedProperty, ArchivedPropertyImage, Contact, Property, PropertyImage
+from app.repo.realty import refresh_image_summary
+
+# Created (and with --recreate dropped) together; the archive tables are empty but queried
+REALTY_TABLES = [
+    Property.__table__, PropertyImage.__table__, Contact.__table__,
+    ArchivedProperty.__table__, ArchivedPropertyImage.__table__,
+]
+LOCATIONS = [
+    "Munnekollal", "Bellandur", "Kundanahalli", "Kadubeesanahalli", "Btm 1st stage",
+    "Nallurahalli", "Sarjapur", "Marathahalli", "Whitefield", "HSR Layout",
+    "Koramangala", "Indiranagar", "Electronic City", "Hebbal", "Jayanagar",
+    "Banashankari", "Yelahanka", "Domlur", "Brookefield", "Mahadevapura",
+]
+PROPERTY_TYPES = ["PG", "1RK", "1BHK", "2BHK"]
+FURNISHINGS = ["fully_furnished", "semi_furnished", "unfurnished"]
+LISTING_TYPES = ["rent", "buy"]
+CONTACT_STATUSES = ["new", "contacted", "closed"]
+
+# Median monthly rent per type; "buy" listings are priced at BUY_MULTIPLIER x rent
+MEDIAN_PRICES = {"PG": 9000, "1RK": 11000, "1BHK": 18000, "2BHK": 28000}
+BUY_MULTIPLIER = 250
+
+
+def parse_weights(spec: str, allowed: List[str]) -> Dict[str, float]:
+    """Parse ``"PG=40,1BHK=30"`` into a weight mapping over ``allowed``."""
+    weights = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, weight = item.partition("=")
+        if name.strip() not in allowed:
+            raise ValueError(f"Unknown value '{name}' (expected one of {', '.join(allowed)})")
+        weights[name.strip()] = float(weight)
+    return weights
+
+
+@dataclass
+class DatasetProfile:
+    """Shape of the generated data."""
+    properties: int = 1000
+    contacts: int = 1000
+    # Zipf exponent over LOCATIONS: 0 is uniform, higher concentrates listings in a few areas
+    location_skew: float = 1.0
+    type_weights: Dict[str, float] = field(
+        default_factory=lambda: {"PG": 40, "1RK": 15, "1BHK": 30, "2BHK": 15}
+    )
+    rent_share: float = 0.85
+    available_share: float = 0.8
+    # Log-normal sigma around MEDIAN_PRICES
+    price_spread: float = 0.35
+    images_mean: float = 3.0
+    images_max: int = 30
+    seed: int = 42
+
+
+class DatasetGenerator:
+    """Yields rows for each table from a seeded RNG per table."""
+
+    def __init__(self, profile: DatasetProfile):
+        self.profile = profile
+        self._location_weights = [1 / (rank ** profile.location_skew) for rank in range(1, len(LOCATIONS) + 1)]
+        self._types = list(profile.type_weights)
+        self._type_weights = [profile.type_weights[t] for t in self._types]
+
+    def _price(self, rng: random.Random, property_type: str, listing_type: str) -> int:
+        price = MEDIAN_PRICES[property_type] * math.exp(rng.gauss(0, self.profile.price_spread))
+        if listing_type == "buy":
+            price *= BUY_MULTIPLIER
+        return int(round(price, -2))
+
+    def properties(self) -> Iterator[dict]:
+        rng = random.Random(self.profile.seed)
+        for i in range(1, self.profile.properties + 1):
+            property_type = rng.choices(self._types, self._type_weights)[0]
+            location = rng.choices(LOCATIONS, self._location_weights)[0]
+            listing_type = "rent" if rng.random() < self.profile.rent_share else "buy"
+            price = self._price(rng, property_type, listing_type)
+            is_pg = property_type == "PG"
+            yield {
+                "id": i,
+                "property_name": f"Synthetic {property_type} {i}",
+                "location": location,
+                "phone": f"9{rng.randint(100000000, 999999999)}",
+                "map_link": f"https://maps.example.com/{i}",
+                "description": f"Synthetic listing {i} in {location}.",
+                "property_type": property_type,
+                "furnishing": rng.choice(FURNISHINGS),
+                "private_price": None if is_pg else price,
+                "single_price": price if is_pg else None,
+                "double_price": int(price * 0.7) if is_pg else None,
+                "triple_price": int(price * 0.55) if is_pg and rng.random() < 0.5 else None,
+                "listing_type": listing_type,
+                "is_available": rng.random() < self.profile.available_share,
+            }
+
+    def images_for(self, rng: random.Random) -> int:
+        # Geometric distribution with the configured mean, capped
+        if self.profile.images_mean <= 0:
+            return 0
+        p = 1 / (1 + self.profile.images_mean)
+        count = int(math.log(1 - rng.random()) / math.log(1 - p))
+        return min(count, self.profile.images_max)
+
+    def images(self) -> Iterator[dict]:
+        rng = random.Random(self.profile.seed + 1)
+        for property_id in range(1, self.profile.properties + 1):
+            for order in range(self.images_for(rng)):
+                yield {
+                    "property_id": property_id,
+                    "image_url": f"https://img.example.com/{property_id}/{order}.jpg",
+                    "is_primary": order == 0,
+                    "sort_order": order,
+                }
+
+    def contacts(self) -> Iterator[dict]:
+        rng = random.Random(self.profile.seed + 2)
+        for i in range(1, self.profile.contacts + 1):
+            yield {
+                "id": i,
+                "name_": f"Lead {i}",
+                "phone": f"8{rng.randint(100000000, 999999999)}",
+                "email": f"lead{i}@example.com",
+                "message": "Is this still available?",
+                "status": rng.choices(CONTACT_STATUSES, (60, 25, 15))[0],
+            }
+
+
+def _insert_batches(connection: Connection, table, rows: Iterator[dict], batch_size: int) -> int:
+    total = 0
+    batch: List[dict] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            connection.execute(insert(table), batch)
+            total += len(batch)
+            batch = []
+    if batch:
+        connection.execute(insert(table), batch)
+        total += len(batch)
+    return total
+
+
+def seed_database(
+    engine: Engine,
+    properties: int = 1000,
+    contacts: int = 1000,
+    seed: int = 42,
+    profile: Optional[DatasetProfile] = None,
+    batch_size: int = 5000,
+) -> Dict[str, int]:
+    """
+    Bulk-insert a synthetic dataset with executemany batches.
+
+    Everything is loaded in one transaction. On MySQL, foreign key and unique
+    checks are switched off for the loading connection and restored on exit.
+    """
+    profile = profile or DatasetProfile(properties=properties, contacts=contacts, seed=seed)
+    generator = DatasetGenerator(profile)
+    dialect = engine.dialect.name
+    counts = {}
+    with engine.begin() as connection:
+        if dialect == "mysql":
+            connection.execute(text("SET foreign_key_checks = 0, unique_checks = 0"))
+        try:
+            counts["properties"] = _insert_batches(connection, Property.__table__, generator.properties(), batch_size)
+            counts["property_images"] = _insert_batches(
+                connection, PropertyImage.__table__, generator.images(), batch_size
+            )
+            refresh_image_summary(connection)
+            counts["contacts"] = _insert_batches(connection, Contact.__table__, generator.contacts(), batch_size)
+        finally:
+            if dialect == "mysql":
+                connection.execute(text("SET foreign_key_checks = 1, unique_checks = 1"))
+    analyze_tables(engine)
+    return counts
+
+
+def analyze_tables(engine: Engine) -> None:
+    """Refresh planner statistics so EXPLAIN reflects the loaded data."""
+    tables = [Property.__tablename__, PropertyImage.__tablename__, Contact.__tablename__]
+    with engine.begin() as connection:
+        if engine.dialect.name == "mysql":
+            connection.execute(text(f"ANALYZE TABLE {', '.join(tables)}"))
+        elif engine.dialect.name == "sqlite":
+            connection.execute(text("ANALYZE"))
+
+
+def build_engine(url: Optional[str]) -> Engine:
+    if not url:
+        from app.configs.db_config import get_mysql_engine
+        return get_mysql_engine()
+    from sqlalchemy import create_engine
+    return create_engine(url)
+
+
+def profile_from_args(args: argparse.Namespace) -> DatasetProfile:
+    profile = DatasetProfile(
+        properties=args.properties,
+        contacts=args.contacts,
+        location_skew=args.location_skew,
+        rent_share=args.rent_share,
+        available_share=args.available_share,
+        price_spread=args.price_spread,
+        images_mean=args.images_mean,
+        images_max=args.images_max,
+        seed=args.seed,
+    )
+    if args.types:
+        profile.type_weights = parse_weights(args.types, PROPERTY_TYPES)
+    return profile
+
+
+def add_profile_arguments(parser: argparse.ArgumentParser, properties: int = 1000) -> None:
+    defaults = DatasetProfile()
+    parser.add_argument("--properties", type=int, default=properties)
+    parser.add_argument("--contacts", type=int, default=None, help="Defaults to --properties")
+    parser.add_argument("--location-skew", type=float, default=defaults.location_skew)
+    parser.add_argument("--types", help="Property type weights, e.g. 'PG=40,1RK=15,1BHK=30,2BHK=15'")
+    parser.add_argument("--rent-share", type=float, default=defaults.rent_share)
+    parser.add_argument("--available-share", type=float, default=defaults.available_share)
+    parser.add_argument("--price-spread", type=float, default=defaults.price_spread)
+    parser.add_argument("--images-mean", type=float, default=defaults.images_mean)
+    parser.add_argument("--images-max", type=int, default=defaults.images_max)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--batch-size", type=int, default=5000)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Target database URL (default: MYSQL_DATABASE_URL / DB_* settings)")
+    parser.add_argument("--recreate", action="store_true", help="Drop and recreate the realty tables first")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    if args.contacts is None:
+        args.contacts = args.properties
+
+    from app.configs.db_config import MySQLBase
+
+    engine = build_engine(args.url)
+    tables = REALTY_TABLES
+    if args.recreate:
+        MySQLBase.metadata.drop_all(engine, tables=tables)
+    MySQLBase.metadata.create_all(engine, tables=tables)
+
+    start = time.perf_counter()
+    counts = seed_database(engine, profile=profile_from_args(args), batch_size=args.batch_size)
+    elapsed = time.perf_counter() - start
+    rows = sum(counts.values())
+    print(", ".join(f"{table}: {count}" for table, count in counts.items()))
+    print(f"loaded {rows} rows in {elapsed:.1f}s ({rows / elapsed:,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
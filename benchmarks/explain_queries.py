@@ -0,0 +1,167 @@
+"""
+Query-plan regression checks for the realty repository.
+
+Runs every read query in app/repo/realty.py against a database loaded with
+benchmarks.dataset, captures the SQL each call emits and prints its EXPLAIN.
+Plans that fall back to a full table scan or a filesort are flagged and the
+run exits with status 1.
+
+    python -m benchmarks.explain_queries                                   # temp SQLite, 100k properties
+    python -m benchmarks.explain_queries --url "$MYSQL_DATABASE_URL" --no-seed
+    python -m benchmarks.explain_queries --properties 1000000 --images-mean 10
+
+MySQL plans are read from EXPLAIN (type=ALL, "Using filesort"); SQLite plans
+from EXPLAIN QUERY PLAN ("SCAN <table>", "USE TEMP B-TREE FOR ORDER BY").
+"""
+import argparse
+import sys
+import tempfile
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.repo import realty as realty_repo
+from benchmarks.dataset import (
+    REALTY_TABLES, add_profile_arguments, build_engine, profile_from_args, seed_database
+)
+
+
+@dataclass
+class QueryCase:
+    name: str
+    call: Callable[[Session], object]
+    # Pages are ordered by id: unfiltered or weakly filtered pagination reads the
+    # table in primary-key order and stops at LIMIT instead of sorting index matches
+    allow_scan: bool = False
+
+
+@dataclass
+class PlanReport:
+    case: str
+    statement: str
+    plan: List[str]
+    problems: List[str] = field(default_factory=list)
+
+
+def query_cases(sample_id: int) -> List[QueryCase]:
+    return [
+        QueryCase("get_properties", lambda db: realty_repo.get_properties(db, limit=20), allow_scan=True),
+        QueryCase("get_properties(property_type)",
+                  lambda db: realty_repo.get_properties(db, limit=20, property_type="1BHK"), allow_scan=True),
+        QueryCase("get_properties(listing_type)",
+                  lambda db: realty_repo.get_properties(db, limit=20, listing_type="buy"), allow_scan=True),
+        QueryCase("get_properties(all filters)", lambda db: realty_repo.get_properties(
+            db, limit=20, property_type="2BHK", listing_type="rent", is_available=True)),
+        QueryCase("get_property_by_id", lambda db: realty_repo.get_property_by_id(db, sample_id)),
+        QueryCase("get_archived_property", lambda db: realty_repo.get_archived_property(db, sample_id)),
+        QueryCase("get_property_images", lambda db: realty_repo.get_property_images(db, sample_id)),
+        QueryCase("get_property_image_by_id", lambda db: realty_repo.get_property_image_by_id(db, sample_id)),
+        QueryCase("get_contacts", lambda db: realty_repo.get_contacts(db, limit=20), allow_scan=True),
+        QueryCase("get_contacts(status)", lambda db: realty_repo.get_contacts(db, limit=20, status="closed")),
+        QueryCase("get_contact_by_id", lambda db: realty_repo.get_contact_by_id(db, sample_id)),
+    ]
+
+
+def capture_statements(engine: Engine, call: Callable[[Session], object]) -> List[Tuple[str, object]]:
+    """Run ``call`` in a fresh session and return every (statement, parameters) it executed."""
+    captured = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        captured.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        with sessionmaker(bind=engine)() as db:
+            call(db)
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    return captured
+
+
+def explain(engine: Engine, statement: str, parameters) -> Tuple[List[str], List[str]]:
+    """Return (plan lines, problems) for one statement."""
+    problems = []
+    with engine.connect() as connection:
+        if engine.dialect.name == "sqlite":
+            rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+            plan = [row[-1] for row in rows]
+            for detail in plan:
+                # Subqueries materialised by the query itself (anon_N) are already bounded
+                if detail.startswith("SCAN ") and " USING " not in detail and not detail.startswith("SCAN anon_"):
+                    problems.append(f"full scan: {detail}")
+                if "TEMP B-TREE FOR ORDER BY" in detail:
+                    problems.append(f"filesort: {detail}")
+        else:
+            result = connection.exec_driver_sql(f"EXPLAIN {statement}", parameters)
+            rows = [dict(row._mapping) for row in result]
+            plan = [
+                f"{row.get('table')}: type={row.get('type')} key={row.get('key')} "
+                f"rows={row.get('rows')} extra={row.get('Extra')}"
+                for row in rows
+            ]
+            for row in rows:
+                if row.get("type") == "ALL":
+                    problems.append(f"full scan of {row.get('table')} (~{row.get('rows')} rows)")
+                if "Using filesort" in (row.get("Extra") or ""):
+                    problems.append(f"filesort on {row.get('table')}")
+    return plan, problems
+
+
+def run_suite(engine: Engine, sample_id: int) -> List[PlanReport]:
+    reports = []
+    for case in query_cases(sample_id):
+        for statement, parameters in capture_statements(engine, case.call):
+            plan, problems = explain(engine, statement, parameters)
+            if case.allow_scan:
+                problems = [problem for problem in problems if not problem.startswith("full scan")]
+            reports.append(PlanReport(case.name, " ".join(statement.split()), plan, problems))
+    return reports
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Database to explain against (default: a temporary SQLite file)")
+    parser.add_argument("--no-seed", dest="seed_data", action="store_false", help="Use the data already loaded")
+    parser.add_argument("--sample-id", type=int, default=None, help="ID used for by-id lookups")
+    parser.add_argument("--verbose", action="store_true", help="Print the SQL of every statement")
+    add_profile_arguments(parser, properties=100_000)
+    args = parser.parse_args()
+    if args.contacts is None:
+        args.contacts = args.properties
+
+    url: Optional[str] = args.url
+    if url is None:
+        url = f"sqlite:///{Path(tempfile.mkdtemp(prefix='realty-explain-')) / 'realty.db'}"
+    engine = build_engine(url)
+
+    if args.seed_data:
+        from app.configs.db_config import MySQLBase
+
+        MySQLBase.metadata.drop_all(engine, tables=REALTY_TABLES)
+        MySQLBase.metadata.create_all(engine, tables=REALTY_TABLES)
+        print(f"seeding {args.properties} properties into {engine.url!r} ...")
+        seed_database(engine, profile=profile_from_args(args), batch_size=args.batch_size)
+
+    reports = run_suite(engine, args.sample_id or max(1, args.properties // 2))
+    flagged = 0
+    for report in reports:
+        status = "FLAG" if report.problems else "ok"
+        print(f"[{status:>4}] {report.case}")
+        if args.verbose or report.problems:
+            print(f"        {report.statement}")
+        for line in report.plan:
+            print(f"        plan: {line}")
+        for problem in report.problems:
+            print(f"        !! {problem}")
+        flagged += bool(report.problems)
+
+    print(f"{len(reports)} statements explained, {flagged} flagged")
+    return 1 if flagged else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
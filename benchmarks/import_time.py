@@ -0,0 +1,68 @@
+"""
+Import-time budget for the API entry point.
+
+Runs ``python -X importtime -c "import app.main"`` in fresh interpreters,
+takes the median cumulative time of ``app.main`` and exits non-zero when it
+exceeds the budget, listing the slowest imports so the regression is easy
+to find.
+
+    python -m benchmarks.import_time --budget-ms 1200
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+IMPORT_TIME_BUDGET_MS = float(os.getenv("IMPORT_TIME_BUDGET_MS", "1200"))
+
+
+def measure(module: str) -> tuple:
+    """Return (cumulative_us, {module: self_us}) for one cold import."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True,
+    )
+    total = None
+    self_times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        try:
+            self_us, cumulative_us, name = (part.strip() for part in line[len("import time:"):].split("|"))
+            self_us, cumulative_us = int(self_us), int(cumulative_us)
+        except ValueError:
+            continue  # header line
+        self_times[name] = self_us
+        if name == module:
+            total = cumulative_us
+    if total is None:
+        raise RuntimeError(f"{module} not found in -X importtime output")
+    return total, self_times
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--budget-ms", type=float, default=IMPORT_TIME_BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    runs = [measure(args.module) for _ in range(args.runs)]
+    median_ms = statistics.median(total for total, _ in runs) / 1000
+    slowest = sorted(runs[-1][1].items(), key=lambda item: item[1], reverse=True)[:args.top]
+
+    print(f"import {args.module}: {median_ms:.0f} ms (median of {args.runs}, budget {args.budget_ms:.0f} ms)")
+    print("slowest modules (self time):")
+    for name, self_us in slowest:
+        print(f"  {self_us / 1000:8.1f} ms  {name}")
+
+    if median_ms > args.budget_ms:
+        print(f"FAIL: startup import time exceeds budget by {median_ms - args.budget_ms:.0f} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,245 @@
+"""
+Endpoint load test with per-route latency budgets.
+
+Seeds a synthetic dataset, replays a weighted mix of list/detail/search/create
+calls against the realty router and reports p50/p95/p99 and RPS per route.
+Results are compared with benchmarks/baselines/load_test.json; the run exits
+with status 1 when any route is slower than its baseline allows.
+
+    python -m benchmarks.load_test                              # in-process, SQLite stand-in
+    python -m benchmarks.load_test --requests 5000 --concurrency 50
+    python -m benchmarks.load_test --base-url http://localhost:8000 --no-seed
+    python -m benchmarks.load_test --update-baseline            # record new budgets
+
+In-process runs set MYSQL_DATABASE_URL to a temporary SQLite file and disable
+rate limiting; point MYSQL_DATABASE_URL at a scratch MySQL database to test
+against the real engine instead.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+
+BASELINE_PATH = Path(__file__).parent / "baselines" / "load_test.json"
+API_PREFIX = "/api/v1/realty"
+
+# route name -> weight in the request mix
+DEFAULT_MIX = {"list": 40, "detail": 35, "search": 20, "create": 5}
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def build_request(route: str, rng: random.Random, property_count: int) -> dict:
+    from benchmarks.dataset import LISTING_TYPES, PROPERTY_TYPES
+
+    if route == "list":
+        return {"method": "GET", "url": f"{API_PREFIX}/properties",
+                "params": {"skip": rng.randrange(0, max(1, property_count - 20)), "limit": 20}}
+    if route == "detail":
+        return {"method": "GET", "url": f"{API_PREFIX}/properties/{rng.randint(1, property_count)}"}
+    if route == "search":
+        return {"method": "GET", "url": f"{API_PREFIX}/properties", "params": {
+            "property_type": rng.choice(PROPERTY_TYPES),
+            "listing_type": rng.choice(LISTING_TYPES),
+            "is_available": "true",
+            "limit": 20,
+        }}
+    if route == "create":
+        n = rng.randint(0, 10**6)
+        return {"method": "POST", "url": f"{API_PREFIX}/contacts", "json": {
+            "name": f"Load {n}",
+            "phone": f"9{n:09d}",
+            "email": f"load{n}@example.com",
+            "message": "Load test enquiry",
+        }}
+    raise ValueError(f"Unknown route '{route}'")
+
+
+async def replay(
+    client: httpx.AsyncClient,
+    mix: Dict[str, int],
+    total: int,
+    concurrency: int,
+    property_count: int,
+    seed: int,
+) -> dict:
+    rng = random.Random(seed)
+    routes = rng.choices(list(mix), weights=list(mix.values()), k=total)
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+    queue: asyncio.Queue = asyncio.Queue()
+    for route in routes:
+        queue.put_nowait((route, build_request(route, rng, property_count)))
+
+    async def worker():
+        while not queue.empty():
+            route, request = queue.get_nowait()
+            start = time.perf_counter()
+            try:
+                response = await client.request(**request)
+                ok = response.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            latencies[route].append((time.perf_counter() - start) * 1000)
+            if not ok:
+                errors[route] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    report = {}
+    for route in mix:
+        samples = latencies.get(route)
+        if not samples:
+            continue
+        report[route] = {
+            "requests": len(samples),
+            "errors": errors.get(route, 0),
+            "rps": round(len(samples) / elapsed, 1),
+            "p50_ms": round(statistics.median(samples), 2),
+            "p95_ms": round(percentile(samples, 95), 2),
+            "p99_ms": round(percentile(samples, 99), 2),
+        }
+    report["_total"] = {"requests": total, "elapsed_s": round(elapsed, 2), "rps": round(total / elapsed, 1)}
+    return report
+
+
+def check_budgets(report: dict, baseline: dict, tolerance: float) -> List[str]:
+    """Return one message per route/metric that exceeded its baseline."""
+    failures = []
+    for route, budget in baseline.get("routes", {}).items():
+        result = report.get(route)
+        if result is None:
+            continue
+        if result["errors"]:
+            failures.append(f"{route}: {result['errors']} failed requests")
+        for metric in ("p50_ms", "p95_ms", "p99_ms"):
+            if metric in budget and result[metric] > budget[metric] * (1 + tolerance):
+                failures.append(
+                    f"{route}: {metric} {result[metric]:.1f} exceeds budget {budget[metric]:.1f} (+{tolerance:.0%})"
+                )
+        if "rps" in budget and result["rps"] < budget["rps"] * (1 - tolerance):
+            failures.append(f"{route}: rps {result['rps']:.1f} below budget {budget['rps']:.1f} (-{tolerance:.0%})")
+    return failures
+
+
+def print_report(report: dict) -> None:
+    print(f"{'route':<8} {'reqs':>6} {'err':>4} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8}")
+    for route, result in report.items():
+        if route.startswith("_"):
+            continue
+        print(
+            f"{route:<8} {result['requests']:>6} {result['errors']:>4} {result['rps']:>8.1f} "
+            f"{result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f} {result['p99_ms']:>8.2f}"
+        )
+    total = report["_total"]
+    print(f"total: {total['requests']} requests in {total['elapsed_s']}s ({total['rps']} req/s)")
+
+
+def prepare_local_database(args: argparse.Namespace) -> None:
+    """Point the app at a SQLite stand-in (unless a URL was given) and seed it."""
+    if not os.getenv("MYSQL_DATABASE_URL"):
+        path = Path(tempfile.mkdtemp(prefix="realty-load-")) / "realty.db"
+        os.environ["MYSQL_DATABASE_URL"] = f"sqlite:///{path}"
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+    os.environ.setdefault("LOG_DISABLED", "true")
+
+    # Imported after the environment is prepared: these read it at import time
+    from app.configs.db_config import MySQLBase, get_mysql_engine
+    from benchmarks.dataset import seed_database
+    import app.models.realty  # noqa: F401  (registers the tables)
+
+    engine = get_mysql_engine()
+    if args.seed_data:
+        MySQLBase.metadata.drop_all(engine)
+        MySQLBase.metadata.create_all(engine)
+        seed_database(engine, properties=args.properties, contacts=args.contacts, seed=args.seed)
+
+
+async def run(args: argparse.Namespace, mix: Dict[str, int]) -> dict:
+    if args.base_url:
+        async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout) as client:
+            return await replay(client, mix, args.requests, args.concurrency, args.properties, args.seed)
+
+    prepare_local_database(args)
+    from app.main import create_app
+
+    app = create_app()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=args.timeout) as client:
+        if args.warmup:
+            await replay(client, mix, args.warmup, args.concurrency, args.properties, args.seed + 1)
+        return await replay(client, mix, args.requests, args.concurrency, args.properties, args.seed)
+
+
+def parse_mix(spec: Optional[str]) -> Dict[str, int]:
+    if not spec:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for item in spec.split(","):
+        route, _, weight = item.partition("=")
+        if route.strip() not in DEFAULT_MIX:
+            raise SystemExit(f"Unknown route '{route}' in --mix (expected {', '.join(DEFAULT_MIX)})")
+        mix[route.strip()] = int(weight)
+    return mix
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", help="Target a running server instead of the in-process app")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=100)
+    parser.add_argument("--properties", type=int, default=2000, help="Synthetic properties to seed")
+    parser.add_argument("--contacts", type=int, default=2000, help="Synthetic contacts to seed")
+    parser.add_argument("--no-seed", dest="seed_data", action="store_false", help="Reuse existing data")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--mix", help="Route weights, e.g. 'list=40,detail=35,search=20,create=5'")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--tolerance", type=float, default=float(os.getenv("LOAD_TEST_TOLERANCE", "0.25")),
+                        help="Allowed regression over the baseline as a fraction (default 0.25)")
+    parser.add_argument("--update-baseline", action="store_true", help="Write this run's results as the new baseline")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args, parse_mix(args.mix)))
+    print_report(report)
+
+    if args.update_baseline:
+        routes = {
+            route: {metric: result[metric] for metric in ("p50_ms", "p95_ms", "p99_ms", "rps")}
+            for route, result in report.items() if not route.startswith("_")
+        }
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps({"routes": routes}, indent=2) + "\n")
+        print(f"baseline written to {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print(f"no baseline at {args.baseline}; run with --update-baseline to record one")
+        return 0
+    failures = check_budgets(report, json.loads(args.baseline.read_text()), args.tolerance)
+    for failure in failures:
+        print(f"FAIL {failure}")
+    if not failures:
+        print("all routes within budget")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""
+Request latency with logging off, synchronous sinks and queued JSON sinks.
+
+Each mode runs in a fresh interpreter (logging is configured from env at
+startup) against a small app whose handler logs like the moderation path:
+a handful of info lines per request plus request-ID correlation.
+
+    python -m benchmarks.logging_latency --requests 2000
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+MODES = {
+    "off": {"LOG_DISABLED": "true"},
+    "sync-text": {"LOG_ENQUEUE": "false", "LOG_JSON": "false", "LOG_SAMPLE_PER_SECOND": "1000000"},
+    "sync-json": {"LOG_ENQUEUE": "false", "LOG_JSON": "true", "LOG_SAMPLE_PER_SECOND": "1000000"},
+    "queued-json": {"LOG_ENQUEUE": "true", "LOG_JSON": "true", "LOG_SAMPLE_PER_SECOND": "1000000"},
+    "queued-json-sampled": {"LOG_ENQUEUE": "true", "LOG_JSON": "true", "LOG_SAMPLE_PER_SECOND": "5"},
+}
+
+
+async def run_child(requests: int, concurrency: int) -> dict:
+    import httpx
+    from fastapi import FastAPI
+
+    from app.configs.log_config import flush_logger, redact_text, sampled_logger, setup_logger
+    from app.middleware.request_id import RequestIDMiddleware
+
+    setup_logger()
+    app = FastAPI()
+    app.add_middleware(RequestIDMiddleware)
+
+    @app.post("/moderate")
+    async def moderate(payload: dict):
+        text = payload["text"]
+        sampled_logger.info(f"Received text for moderation: {redact_text(text)}")
+        sampled_logger.info("Moderation result saving...")
+        sampled_logger.info("Moderation result saved successfully")
+        sampled_logger.info(f"Task {len(text)} enqueued for moderation")
+        return {"task_id": "bench"}
+
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def call(i: int) -> None:
+            async with semaphore:
+                start = time.perf_counter()
+                await client.post("/moderate", json={"text": f"is room {i} still available?" * 20})
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(call(i) for i in range(requests)))
+        elapsed = time.perf_counter() - start
+    flush_logger()
+
+    latencies.sort()
+    return {
+        "rps": requests / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(asyncio.run(run_child(args.requests, args.concurrency))))
+        return
+
+    repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    print(f"{'mode':<22}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for mode, env in MODES.items():
+        with tempfile.TemporaryDirectory() as workdir:  # log files land here, not in the repo
+            proc = subprocess.run(
+                [sys.executable, "-m", "benchmarks.logging_latency", "--child",
+                 "--requests", str(args.requests), "--concurrency", str(args.concurrency)],
+                cwd=workdir, capture_output=True, text=True, check=True,
+                env={**os.environ, **env, "PYTHONPATH": repo_root},
+            )
+        stats = json.loads(proc.stdout.strip().splitlines()[-1])
+        print(f"{mode:<22}{stats['rps']:>10.0f}{stats['p50_ms']:>10.2f}{stats['p99_ms']:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
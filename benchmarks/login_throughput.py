@@ -0,0 +1,107 @@
+"""
+Login throughput benchmark.
+
+Fires concurrent logins at the auth router (backed by in-memory SQLite)
+while a lightweight endpoint is polled, to show whether bcrypt work stalls
+unrelated requests on the same worker.
+
+    PASSWORD_HASH_WORKERS=0 python -m benchmarks.login_throughput   # inline hashing
+    PASSWORD_HASH_WORKERS=4 python -m benchmarks.login_throughput   # process pool
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.api.auth import auth_router
+from app.configs.db_config import MySQLBase, get_db
+from app.core.security import PASSWORD_HASH_WORKERS, get_password_hash
+from app.models.user import User
+
+
+def build_app(users: int) -> FastAPI:
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    MySQLBase.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    hashed = get_password_hash("password123")
+    with session_factory() as db:
+        db.add_all(User(email=f"user{i}@example.com", hashed_password=hashed) for i in range(users))
+        db.commit()
+
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    app.include_router(auth_router, prefix="/api/v1")
+    app.dependency_overrides[get_db] = override_get_db
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    return app
+
+
+async def run(logins: int, concurrency: int, users: int) -> None:
+    app = build_app(users)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        semaphore = asyncio.Semaphore(concurrency)
+        done = asyncio.Event()
+        ping_latencies = []
+
+        async def login(i: int) -> float:
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.post(
+                    "/api/v1/auth/login",
+                    data={"username": f"user{i % users}@example.com", "password": "password123"},
+                )
+                response.raise_for_status()
+                return time.perf_counter() - start
+
+        async def poll_ping() -> None:
+            while not done.is_set():
+                start = time.perf_counter()
+                await client.get("/ping")
+                ping_latencies.append(time.perf_counter() - start)
+                await asyncio.sleep(0.01)
+
+        poller = asyncio.create_task(poll_ping())
+        start = time.perf_counter()
+        latencies = await asyncio.gather(*(login(i) for i in range(logins)))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await poller
+
+    latencies.sort()
+    ping_latencies.sort()
+    print(f"hash workers:      {PASSWORD_HASH_WORKERS or 'inline'}")
+    print(f"logins/sec:        {logins / elapsed:.1f}")
+    print(f"login p50/p95 ms:  {statistics.median(latencies) * 1000:.1f} / "
+          f"{latencies[int(len(latencies) * 0.95) - 1] * 1000:.1f}")
+    if ping_latencies:
+        print(f"/ping p50/max ms:  {statistics.median(ping_latencies) * 1000:.1f} / "
+              f"{ping_latencies[-1] * 1000:.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--users", type=int, default=8)
+    args = parser.parse_args()
+    asyncio.run(run(args.logins, args.concurrency, args.users))
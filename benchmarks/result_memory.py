@@ -0,0 +1,94 @@
+"""
+Size of a stored moderation result in the Celery result backend.
+
+Encodes synthetic moderation responses the way the Redis backend stores them
+(task meta: status, result, traceback, children, date_done) and reports the
+average bytes per result for plain JSON, ``zlib-json``, and both again for the
+compact projection. With ``--redis-url`` the results are also written to Redis
+and ``MEMORY USAGE`` is reported, which includes the key and allocator
+overhead.
+
+    python -m benchmarks.result_memory
+    python -m benchmarks.result_memory --results 10000 --redis-url redis://localhost:6379/15
+"""
+import argparse
+import json
+import random
+import statistics
+import uuid
+from datetime import datetime, timezone
+
+from app.core.result_codec import compact_moderation_result, zlib_json_dumps
+
+CATEGORIES = [
+    "harassment", "harassment/threatening", "hate", "hate/threatening", "illicit", "illicit/violent",
+    "self-harm", "self-harm/instructions", "self-harm/intent", "sexual", "sexual/minors",
+    "violence", "violence/graphic",
+]
+
+
+def moderation_response(rng: random.Random) -> dict:
+    """A response shaped like the moderations endpoint's, with random scores."""
+    scores = {category: rng.random() ** 8 for category in CATEGORIES}
+    return {
+        "id": f"modr-{uuid.UUID(int=rng.getrandbits(128)).hex}",
+        "model": "omni-moderation-latest",
+        "results": [{
+            "flagged": any(score > 0.5 for score in scores.values()),
+            "categories": {category: score > 0.5 for category, score in scores.items()},
+            "category_scores": scores,
+            "category_applied_input_types": {category: ["text"] for category in CATEGORIES},
+        }],
+    }
+
+
+def task_meta(result: dict) -> dict:
+    return {
+        "status": "SUCCESS", "result": result, "traceback": None, "children": [],
+        "date_done": datetime.now(timezone.utc).isoformat(), "task_id": str(uuid.uuid4()),
+    }
+
+
+def json_dumps(value) -> bytes:
+    return json.dumps(value).encode()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--results", type=int, default=2000)
+    parser.add_argument("--redis-url", help="also store the results here and report MEMORY USAGE")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    metas = [task_meta(moderation_response(rng)) for _ in range(args.results)]
+    variants = {
+        "json": [json_dumps(meta) for meta in metas],
+        "zlib-json": [zlib_json_dumps(meta) for meta in metas],
+        "compact json": [json_dumps(dict(meta, result=compact_moderation_result(meta["result"]))) for meta in metas],
+        "compact zlib-json": [
+            zlib_json_dumps(dict(meta, result=compact_moderation_result(meta["result"]))) for meta in metas
+        ],
+    }
+
+    client = None
+    if args.redis_url:
+        import redis
+
+        client = redis.Redis.from_url(args.redis_url)
+
+    baseline = statistics.mean(len(value) for value in variants["json"])
+    for name, values in variants.items():
+        size = statistics.mean(len(value) for value in values)
+        line = f"{name:>18}: {size:7.0f} bytes per result ({size / baseline:4.0%})"
+        if client is not None:
+            keys = [f"benchmark:result-memory:{i}" for i in range(len(values))]
+            client.mset(dict(zip(keys, values)))
+            usage = statistics.mean(client.memory_usage(key) for key in keys)
+            client.delete(*keys)
+            line += f", {usage:7.0f} bytes in Redis"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
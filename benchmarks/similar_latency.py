@@ -0,0 +1,54 @@
+"""
+Latency of the "similar properties" index at scale.
+
+Builds the in-memory feature matrix from a synthetic dataset (no database)
+and reports build time, per-query latency for random targets, and the cost of
+incremental upserts.
+
+    python -m benchmarks.similar_latency
+    python -m benchmarks.similar_latency --properties 1000000 --queries 200 --k 10
+"""
+import argparse
+import random
+import statistics
+import time
+
+from benchmarks.dataset import DatasetGenerator, DatasetProfile
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--properties", type=int, default=1000000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    from app.core.similar import SimilarityIndex
+
+    rows = list(DatasetGenerator(DatasetProfile(properties=args.properties, contacts=0, seed=args.seed)).properties())
+    index = SimilarityIndex()
+    start = time.perf_counter()
+    index.rebuild(rows)
+    print(f"feature matrix for {len(rows)} properties built in {time.perf_counter() - start:.2f} s "
+          f"({index.features.nbytes / 2**20:.0f} MiB)")
+
+    rng = random.Random(args.seed)
+    samples = []
+    for _ in range(args.queries):
+        target = rng.randint(1, args.properties)
+        start = time.perf_counter()
+        index.similar(target, args.k)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    print(f"similar(k={args.k}): p50 {statistics.median(samples):.2f} ms, "
+          f"p99 {samples[min(len(samples) - 1, int(len(samples) * 0.99))]:.2f} ms")
+
+    start = time.perf_counter()
+    for i in range(1000):
+        index.upsert(dict(rows[rng.randrange(len(rows))], single_price=rng.randint(5000, 20000)))
+    print(f"upsert: {(time.perf_counter() - start) * 1000:.1f} us per write")
+
+
+if __name__ == "__main__":
+    main()
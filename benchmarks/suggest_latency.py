@@ -0,0 +1,79 @@
+"""
+Per-keystroke latency of the location/property typeahead index.
+
+Builds the in-memory suggest index from a synthetic dataset (no database),
+then "types" locations and property names one character at a time and
+reports per-keystroke latency in microseconds, with the result cache off (cold)
+and on (warm), plus the cost of an incremental update.
+
+    python -m benchmarks.suggest_latency
+    python -m benchmarks.suggest_latency --properties 1000000 --queries 2000
+"""
+import argparse
+import random
+import statistics
+import time
+from collections import Counter
+
+from benchmarks.dataset import LOCATIONS, DatasetGenerator, DatasetProfile
+
+
+def percentile(samples, fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def keystrokes(words, queries: int, seed: int):
+    rng = random.Random(seed)
+    for _ in range(queries):
+        word = rng.choice(words)
+        for end in range(1, min(len(word), 12) + 1):
+            yield word[:end]
+
+
+def measure(index, prefixes, clear_cache: bool) -> list:
+    samples = []
+    for prefix in prefixes:
+        if clear_cache:
+            index._cache.clear()
+        start = time.perf_counter()
+        index.suggest(prefix, 10)
+        samples.append((time.perf_counter() - start) * 1e6)
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--properties", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=1000, help="Words typed out character by character")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    from app.core.suggest import SuggestIndex
+
+    counts = Counter()
+    for row in DatasetGenerator(DatasetProfile(properties=args.properties, contacts=0, seed=args.seed)).properties():
+        counts[("location", row["location"])] += 1
+        counts[("property", row["property_name"])] += 1
+
+    index = SuggestIndex()
+    start = time.perf_counter()
+    index.rebuild(counts)
+    print(f"index of {len(counts)} terms built in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    words = LOCATIONS + [text for kind, text in random.Random(args.seed).sample(sorted(counts), 200)]
+    prefixes = list(keystrokes(words, args.queries, args.seed))
+    print(f"{'mode':<8} {'keystrokes':>10} {'p50 us':>8} {'p99 us':>8} {'max us':>9}")
+    for mode, clear_cache in (("cold", True), ("warm", False)):
+        samples = measure(index, prefixes, clear_cache)
+        print(f"{mode:<8} {len(samples):>10} {statistics.median(samples):>8.1f} "
+              f"{percentile(samples, 0.99):>8.1f} {max(samples):>9.1f}")
+
+    start = time.perf_counter()
+    for i in range(1000):
+        index.apply({("property", f"Benchmark Residency {i}"): 1, ("location", LOCATIONS[i % len(LOCATIONS)]): 1})
+    print(f"incremental update: {(time.perf_counter() - start) * 1000:.1f} us per write")
+
+
+if __name__ == "__main__":
+    main()
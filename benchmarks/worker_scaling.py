@@ -0,0 +1,130 @@
+"""
+Worker scaling benchmark.
+
+Starts the API under gunicorn.conf.py with 1, 2, 4... workers against the same
+seeded SQLite stand-in, replays the load-test mix against each and reports
+throughput and tail latency per worker count.
+
+    python -m benchmarks.worker_scaling
+    python -m benchmarks.worker_scaling --workers 1,2,4,8 --requests 5000 --concurrency 64
+
+The response cache is disabled so every request does its own query and JSON
+encoding. The load generator shares the machine with the server, so results
+flatten out once the client itself saturates a core.
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+from sqlalchemy import create_engine
+
+from benchmarks.dataset import seed_database
+from benchmarks.load_test import DEFAULT_MIX, replay
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def prepare_database(properties: int) -> str:
+    from app.configs.db_config import MySQLBase
+    import app.models.realty  # noqa: F401  (registers the tables)
+
+    url = f"sqlite:///{Path(tempfile.mkdtemp(prefix='realty-workers-')) / 'realty.db'}"
+    engine = create_engine(url)
+    MySQLBase.metadata.create_all(engine)
+    seed_database(engine, properties=properties, contacts=properties)
+    engine.dispose()
+    return url
+
+
+def start_server(workers: int, port: int, database_url: str) -> subprocess.Popen:
+    env = dict(
+        os.environ,
+        WEB_CONCURRENCY=str(workers),
+        GUNICORN_BIND=f"127.0.0.1:{port}",
+        GUNICORN_LOG_LEVEL="warning",
+        MYSQL_DATABASE_URL=database_url,
+        RATE_LIMIT_ENABLED="false",
+        RESPONSE_CACHE_ENABLED="false",
+        LOG_DISABLED="true",
+    )
+    return subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app.main:app"],
+        cwd=ROOT, env=env,
+    )
+
+
+async def wait_until_ready(base_url: str, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get("/")).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"server at {base_url} did not start within {timeout}s")
+
+
+async def measure(base_url: str, args: argparse.Namespace) -> dict:
+    await wait_until_ready(base_url, args.startup_timeout)
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=30, limits=limits) as client:
+        await replay(client, DEFAULT_MIX, args.warmup, args.concurrency, args.properties, args.seed + 1)
+        return await replay(client, DEFAULT_MIX, args.requests, args.concurrency, args.properties, args.seed)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", default=None, help="Comma separated worker counts (default: 1,2,4.. up to CPUs)")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--warmup", type=int, default=200)
+    parser.add_argument("--properties", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--startup-timeout", type=float, default=30.0)
+    args = parser.parse_args()
+
+    if args.workers:
+        counts = [int(count) for count in args.workers.split(",")]
+    else:
+        cpus = os.cpu_count() or 1
+        counts = [1]
+        while counts[-1] * 2 <= cpus:
+            counts.append(counts[-1] * 2)
+
+    database_url = prepare_database(args.properties)
+    rows = []
+    for workers in counts:
+        port = free_port()
+        server = start_server(workers, port, database_url)
+        try:
+            report = asyncio.run(measure(f"http://127.0.0.1:{port}", args))
+        finally:
+            server.terminate()
+            server.wait(timeout=60)
+        errors = sum(result["errors"] for route, result in report.items() if not route.startswith("_"))
+        p99 = max(result["p99_ms"] for route, result in report.items() if not route.startswith("_"))
+        rows.append((workers, report["_total"]["rps"], p99, errors))
+
+    base_rps = rows[0][1]
+    print(f"{'workers':>7} {'req/s':>9} {'speedup':>8} {'worst p99':>10} {'errors':>7}")
+    for workers, rps, p99, errors in rows:
+        print(f"{workers:>7} {rps:>9.1f} {rps / base_rps:>7.2f}x {p99:>9.1f}ms {errors:>7}")
+
+
+if __name__ == "__main__":
+    main()
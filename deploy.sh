@@ -12,13 +12,21 @@ VENV_DIR="$REMOTE_DIR/venv"
 
 APP_MODULE="app.main:app"
 PORT=8000
+PID_FILE="$REMOTE_DIR/gunicorn.pid"
+RELEASE_DIR="$REMOTE_DIR/release"
+# Seconds to wait for a new master to bring its workers up before giving up
+BOOT_TIMEOUT=60
+# Set FULL_RESTART=1 when .env.production changed: a reloaded master keeps the old environment
+FULL_RESTART="${FULL_RESTART:-0}"
 
 # ===== CLEANUP & PREPARE =====
-echo "🧹 Cleaning up old deployment..."
+# The running server keeps serving from $REMOTE_DIR/app until the reload below
+echo "🧹 Preparing release directory..."
 ssh -i "$PEM_KEY" $EC2_USER@$EC2_HOST << EOF
 mkdir -p $REMOTE_DIR
 cd $REMOTE_DIR
-rm -rf app dist build *.spec app.log
+rm -rf $RELEASE_DIR dist build *.spec
+mkdir -p $RELEASE_DIR
 EOF
 
 # ===== UPLOAD SOURCE =====
@@ -26,8 +34,9 @@ echo "📦 Uploading source files..."
 scp -i "$PEM_KEY" -r \
   app \
   requirements.txt \
+  gunicorn.conf.py \
   .env.production \
-  $EC2_USER@$EC2_HOST:$REMOTE_DIR/
+  $EC2_USER@$EC2_HOST:$RELEASE_DIR/
 
 # ===== SETUP & RUN ON EC2 =====
 echo "🚀 Setting up & running FastAPI on EC2..."
@@ -49,22 +58,64 @@ source venv/bin/activate
 
 echo "📦 Installing Python dependencies..."
 pip install --upgrade pip
-pip install -r requirements.txt
-
-echo "♻️ Stopping existing app..."
-pkill -f "uvicorn $APP_MODULE" || true
-
-echo "🌱 Loading production envs..."
-set -a
-source .env.production
-set +a
-
-echo "▶️ Starting FastAPI (background)..."
-nohup uvicorn $APP_MODULE \
-  --host 0.0.0.0 \
-  --port $PORT \
-  --workers 1 \
-  > app.log 2>&1 &
+pip install -r $RELEASE_DIR/requirements.txt
+
+echo "🔀 Switching to the new release..."
+rm -rf app.previous
+if [ -d app ]; then mv app app.previous; fi
+mv $RELEASE_DIR/app app
+mv -f $RELEASE_DIR/requirements.txt $RELEASE_DIR/gunicorn.conf.py $RELEASE_DIR/.env.production .
+rm -rf $RELEASE_DIR
+
+start_gunicorn() {
+  set -a
+  source .env.production
+  set +a
+  GUNICORN_BIND="0.0.0.0:$PORT" nohup gunicorn $APP_MODULE \
+    -c gunicorn.conf.py \
+    --pid $PID_FILE \
+    >> app.log 2>&1 &
+}
+
+OLD_PID=""
+if [ -f "$PID_FILE" ] && kill -0 "\$(cat $PID_FILE)" 2>/dev/null; then
+  OLD_PID="\$(cat $PID_FILE)"
+fi
+
+if [ -z "\$OLD_PID" ]; then
+  pkill -f "uvicorn $APP_MODULE" || true
+  echo "▶️ Starting FastAPI under gunicorn (background)..."
+  start_gunicorn
+elif [ "$FULL_RESTART" = "1" ]; then
+  # Picks up a changed .env.production, at the cost of a short gap in service
+  echo "♻️ Restarting gunicorn (workers finish in-flight requests)..."
+  kill -TERM "\$OLD_PID"
+  while kill -0 "\$OLD_PID" 2>/dev/null; do sleep 1; done
+  start_gunicorn
+else
+  # USR2 starts a new master on the same listening socket; the old one keeps
+  # serving until the new workers are up, then drains
+  echo "♻️ Reloading gunicorn without downtime..."
+  kill -USR2 "\$OLD_PID"
+  NEW_PID=""
+  for i in \$(seq $BOOT_TIMEOUT); do
+    sleep 1
+    if [ -f "$PID_FILE" ] && [ "\$(cat $PID_FILE)" != "\$OLD_PID" ] \
+        && pgrep -P "\$(cat $PID_FILE)" > /dev/null; then
+      NEW_PID="\$(cat $PID_FILE)"
+      break
+    fi
+  done
+  if [ -z "\$NEW_PID" ]; then
+    echo "❌ New gunicorn master did not come up; the old one (\$OLD_PID) keeps serving. See app.log."
+    exit 1
+  fi
+  echo "🛑 Draining old master \$OLD_PID (new master \$NEW_PID)..."
+  # WINCH stops the old workers gracefully; QUIT then ends the idle master
+  kill -WINCH "\$OLD_PID"
+  while pgrep -P "\$OLD_PID" > /dev/null; do sleep 1; done
+  kill -QUIT "\$OLD_PID"
+fi
 
 deactivate
 exit
@@ -0,0 +1,41 @@
+"""
+Gunicorn settings for running the API with several Uvicorn worker processes.
+
+    gunicorn -c gunicorn.conf.py app.main:app
+
+Every value can be overridden from the environment (see envexample.txt).
+"""
+import os
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+worker_class = "uvicorn.workers.UvicornWorker"
+# One worker per core: sync routes and JSON encoding are CPU bound under the GIL
+workers = int(os.getenv("WEB_CONCURRENCY", "0")) or (os.cpu_count() or 1)
+
+# Import the app once in the master so workers fork with it already loaded
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() == "true"
+
+# Recycle workers periodically; the jitter keeps them from restarting together
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "10000"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "1000"))
+
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+
+accesslog = os.getenv("GUNICORN_ACCESS_LOG") or None
+errorlog = "-"
+loglevel = os.getenv("GUNICORN_LOG_LEVEL", "info")
+
+
+def post_fork(server, worker):
+    """Give each worker its own connections instead of the master's."""
+    from app.configs.db_config import dispose_mysql_engine
+    from app.configs.log_config import setup_logger
+    from app.configs.redis_config import reset_redis_clients
+
+    dispose_mysql_engine(close=False)
+    reset_redis_clients()
+    # The enqueue thread of the log sinks does not survive fork
+    setup_logger(force=True)
+    server.log.info(f"Worker {worker.pid} initialised")
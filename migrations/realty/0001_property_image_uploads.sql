@@ -0,0 +1,6 @@
+-- Uploaded property images: content hash of the original and generated variants.
+-- The realty MySQL schema is not managed by Alembic (alembic/ targets the moderation DB).
+ALTER TABLE property_images
+    ADD COLUMN content_hash VARCHAR(64) NULL AFTER sort_order,
+    ADD COLUMN variants JSON NULL AFTER content_hash,
+    ADD INDEX ix_property_images_content_hash (content_hash);
@@ -0,0 +1,16 @@
+-- Denormalized image summary on properties, so listing pages need not read property_images.
+-- Kept current by the image repo functions in the same transaction as the image write.
+ALTER TABLE properties
+    ADD COLUMN primary_image_url VARCHAR(500) NULL AFTER is_available,
+    ADD COLUMN image_count INT NOT NULL DEFAULT 0 AFTER primary_image_url;
+
+-- Backfill. On large tables run the chunked Celery task instead:
+--   celery -A app.configs.celery_config call backfill_image_summary
+UPDATE properties p
+SET p.image_count = (SELECT COUNT(*) FROM property_images i WHERE i.property_id = p.id),
+    p.primary_image_url = (
+        SELECT i.image_url FROM property_images i
+        WHERE i.property_id = p.id
+        ORDER BY i.is_primary DESC, i.sort_order, i.id
+        LIMIT 1
+    );
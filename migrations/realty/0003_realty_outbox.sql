@@ -0,0 +1,13 @@
+-- Transactional outbox for realty writes, relayed to the Redis change stream by
+-- `python -m app.core.outbox relay`.
+CREATE TABLE realty_outbox (
+    id BIGINT NOT NULL AUTO_INCREMENT,
+    aggregate VARCHAR(32) NOT NULL,
+    aggregate_id INT NOT NULL,
+    event_type VARCHAR(16) NOT NULL,
+    payload JSON NULL,
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    published_at DATETIME NULL,
+    PRIMARY KEY (id),
+    INDEX ix_realty_outbox_published_id (published_at, id)
+);
@@ -0,0 +1,2 @@
+-- The in-memory property catalog (CATALOG_ENABLED) polls for recently updated rows.
+CREATE INDEX ix_properties_updated_at ON properties (updated_at);
@@ -0,0 +1,41 @@
+-- Cold storage for unavailable listings, filled in batches by the
+-- archive_stale_properties Celery task. Rows keep their original ids.
+CREATE TABLE properties_archive (
+    id INT NOT NULL,
+    archived_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    property_name VARCHAR(150) NOT NULL,
+    location VARCHAR(150) NOT NULL,
+    phone VARCHAR(15) NOT NULL,
+    map_link VARCHAR(500) NULL,
+    description TEXT NULL,
+    property_type ENUM('PG','1RK','1BHK','2BHK') NOT NULL,
+    furnishing ENUM('fully_furnished','semi_furnished','unfurnished') NULL,
+    private_price DECIMAL(10, 2) NULL,
+    single_price DECIMAL(10, 2) NULL,
+    double_price DECIMAL(10, 2) NULL,
+    triple_price DECIMAL(10, 2) NULL,
+    listing_type ENUM('buy','rent') NOT NULL,
+    is_available BOOL NULL,
+    primary_image_url VARCHAR(500) NULL,
+    image_count INT NOT NULL DEFAULT 0,
+    created_at DATETIME NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id)
+);
+
+CREATE TABLE property_images_archive (
+    id INT NOT NULL,
+    property_id INT NOT NULL,
+    image_url VARCHAR(500) NOT NULL,
+    is_primary BOOL NOT NULL,
+    sort_order INT NOT NULL,
+    content_hash VARCHAR(64) NULL,
+    variants JSON NULL,
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id),
+    INDEX ix_property_images_archive_content_hash (content_hash),
+    INDEX ix_property_images_archive_property_sort (property_id, sort_order)
+);
+
+-- Finds archival candidates without walking available listings.
+CREATE INDEX ix_properties_available_updated ON properties (is_available, updated_at);
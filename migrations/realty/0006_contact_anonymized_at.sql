@@ -0,0 +1,2 @@
+-- Marks contacts whose personal data the anonymize_closed_leads task has overwritten.
+ALTER TABLE contacts ADD COLUMN anonymized_at DATETIME NULL;
@@ -0,0 +1,6 @@
+-- Indexes behind the property list/search filters, property images in display
+-- order, and contacts by status (see benchmarks/explain_queries.py). Skip any
+-- that an existing schema already has.
+CREATE INDEX ix_properties_type_listing_available ON properties (property_type, listing_type, is_available);
+CREATE INDEX ix_property_images_property_sort ON property_images (property_id, sort_order);
+CREATE INDEX ix_contacts_status ON contacts (status);
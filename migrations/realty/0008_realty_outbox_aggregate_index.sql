@@ -0,0 +1,3 @@
+-- Lets the contact anonymize and purge jobs find a contact's outbox rows and
+-- scrub the personal data that older events carried.
+CREATE INDEX ix_realty_outbox_aggregate ON realty_outbox (aggregate, aggregate_id);